@@ -9,7 +9,8 @@ from alembic import context
 # Alembic Config object
 config = context.config
 
-if config.config_file_name is not None:
+# The app runs migrations itself on startup and keeps its own logging setup
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Import models so Alembic can detect them
@@ -18,11 +19,15 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+from app.config import settings
 from app.database import Base
-from app.models import User, Form, Submission  # noqa: F401
+from app import models  # noqa: F401
 
 target_metadata = Base.metadata
 
+# FORMFORGE_DATABASE_URL wins over alembic.ini, so the CLI and the app agree
+config.set_main_option("sqlalchemy.url", settings.database_url)
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -31,13 +36,15 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
     )
     with context.begin_transaction():
         context.run_migrations()
 
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # render_as_batch lets ALTERs work on SQLite (table copy and swap)
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
     with context.begin_transaction():
         context.run_migrations()
 
@@ -54,6 +61,11 @@ async def run_async_migrations() -> None:
 
 
 def run_migrations_online() -> None:
+    # app.migrations passes the connection it is already holding
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
     asyncio.run(run_async_migrations())
 
 
@@ -0,0 +1,136 @@
+"""Size/throughput tradeoff of submission data compression.
+
+    PYTHONPATH=src python -m benchmarks.compression [--rows 5000]
+
+Encodes synthetic submissions of several shapes with every supported
+setting and prints one JSON object per (shape, setting) with the average
+stored size, ratio against plain JSON and encode/decode throughput.
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+
+from app.compression import compress_data, decompress_data, remember_dictionary, train_dictionary
+from app.config import settings
+
+_WORDS = [
+    "the",
+    "quick",
+    "brown",
+    "fox",
+    "jumps",
+    "over",
+    "lazy",
+    "dog",
+    "please",
+    "call",
+    "me",
+    "back",
+    "about",
+    "pricing",
+    "order",
+    "delivery",
+    "support",
+    "account",
+    "invoice",
+    "refund",
+    "thanks",
+    "regards",
+    "hello",
+    "team",
+    "question",
+    "issue",
+]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _contact(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"{rng.choice(string.ascii_uppercase)}. Person {i}",
+        "email": f"person{i}@example.com",
+        "message": _sentence(rng, rng.randint(5, 25)),
+    }
+
+
+def _long_text(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"Applicant {i}",
+        "email": f"applicant{i}@example.org",
+        "cover_letter": " ".join(_sentence(rng, 20) for _ in range(rng.randint(10, 40))),
+    }
+
+
+def _survey(rng: random.Random, i: int) -> dict:
+    answers = {f"question_{q:02d}": rng.choice(["yes", "no", "maybe"]) for q in range(30)}
+    return {"respondent": f"r-{i}", "utm_source": "newsletter", **answers}
+
+
+SHAPES = {"contact": _contact, "long_text": _long_text, "survey": _survey}
+
+
+def _measure(texts: list[str], dict_id: str | None) -> dict:
+    start = time.perf_counter()
+    encoded = [compress_data(t, dict_id) for t in texts]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for e in encoded:
+        decompress_data(e)
+    decode_s = time.perf_counter() - start
+
+    raw_bytes = sum(len(t.encode()) for t in texts)
+    stored = sum(len(e.encode()) if isinstance(e, str) else len(e) for e in encoded)
+    mb = raw_bytes / 1_000_000
+    return {
+        "avg_raw_bytes": round(raw_bytes / len(texts), 1),
+        "avg_stored_bytes": round(stored / len(texts), 1),
+        "ratio": round(stored / raw_bytes, 3),
+        "encode_mb_s": round(mb / encode_s, 1),
+        "decode_mb_s": round(mb / decode_s, 1),
+    }
+
+
+def run(rows: int, seed: int = 1) -> list[dict]:
+    results = []
+    original = settings.submission_compression, settings.compression_level
+    try:
+        for shape, make in SHAPES.items():
+            rng = random.Random(seed)
+            texts = [json.dumps(make(rng, i)) for i in range(rows)]
+            dict_id = remember_dictionary(train_dictionary(texts[:500]))
+
+            settings.submission_compression = "none"
+            results.append({"shape": shape, "mode": "none", **_measure(texts, None)})
+            settings.submission_compression = "zlib"
+            for level in (1, 6, 9):
+                settings.compression_level = level
+                for mode, zdict in (("zlib", None), ("zlib+dict", dict_id)):
+                    results.append(
+                        {
+                            "shape": shape,
+                            "mode": mode,
+                            "level": level,
+                            **_measure(texts, zdict),
+                        }
+                    )
+    finally:
+        settings.submission_compression, settings.compression_level = original
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    for result in run(args.rows):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Side-by-side ingest numbers for the raw ASGI ``/f/{uuid}`` handler and ``submit_form``.
+
+    PYTHONPATH=src python -m benchmarks.fast_path [--mode inprocess|uvicorn]
+        [--requests 2000] [--concurrency 32] [--scenario json ...] [--output run.json]
+
+Runs ``benchmarks.ingest`` once per route, each in its own process (settings
+are read at import), and reports both plus the change in req/s and p50/p99
+for every scenario.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import ROOT, subprocess_env, write_report
+
+ROUTES = ("fastapi", "fast")
+
+
+def _ingest(route: str, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        output = Path(workdir) / "run.json"
+        command = [
+            sys.executable,
+            "-m",
+            "benchmarks.ingest",
+            "--route",
+            route,
+            "--mode",
+            args.mode,
+            "--requests",
+            str(args.requests),
+            "--concurrency",
+            str(args.concurrency),
+            "--output",
+            str(output),
+        ]
+        for scenario in args.scenario or []:
+            command += ["--scenario", scenario]
+        subprocess.run(
+            command, cwd=ROOT, env=subprocess_env(), check=True, stdout=subprocess.DEVNULL
+        )
+        return json.loads(output.read_text())
+
+
+def _change(old: float, new: float) -> str:
+    return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenario", action="append")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    runs = {route: _ingest(route, args) for route in ROUTES}
+    before, after = runs["fastapi"]["scenarios"], runs["fast"]["scenarios"]
+    report = {
+        "benchmark": "fast_path",
+        "meta": runs["fast"]["meta"],
+        "change": {
+            name: {
+                metric: _change(before[name][metric], after[name][metric])
+                for metric in ("rps", "p50_ms", "p99_ms")
+            }
+            for name in after
+            if name in before
+        },
+        "runs": runs,
+    }
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Shared plumbing for the HTTP benchmarks.
+
+Runs the app either in-process (httpx ``ASGITransport``, no network) or as a
+real ``uvicorn`` subprocess, against a throwaway database. Settings are read
+from the environment when ``app`` is first imported, so ``isolated_env`` must
+run before anything imports ``app.config``.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def isolated_env(workdir: str, **overrides) -> dict[str, str]:
+    """Point every on-disk setting at ``workdir`` and apply ``overrides``.
+
+    Updates ``os.environ`` (for the in-process app) and returns the full
+    environment for a subprocess.
+    """
+    values = {
+        "FORMFORGE_DATABASE_URL": f"sqlite+aiosqlite:///{workdir}/bench.db",
+        "FORMFORGE_ARCHIVE_DIR": f"{workdir}/archive",
+        "FORMFORGE_SLOW_QUERY_LOG_FILE": f"{workdir}/slow_queries.log",
+        "FORMFORGE_PROFILING_DIR": f"{workdir}/profiles",
+        "FORMFORGE_RETENTION_ENABLED": "false",
+        "FORMFORGE_SMTP_HOST": "",
+    }
+    values.update({f"FORMFORGE_{k.upper()}": str(v) for k, v in overrides.items()})
+    os.environ.update(values)
+    return subprocess_env()
+
+
+def subprocess_env() -> dict[str, str]:
+    """The current environment with ``src/`` on ``PYTHONPATH``."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    return env
+
+
+def memory_mb(field: str = "VmRSS") -> float:
+    """A memory figure of this process from ``/proc/self/status`` (Linux), in MB.
+
+    ``VmHWM`` is the peak RSS. Unlike ``ru_maxrss`` it resets on exec, so a
+    subprocess does not inherit the peak of the parent that forked it.
+    """
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) * 1024 / 1_000_000
+    return 0.0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@asynccontextmanager
+async def app_client(mode: str, env: dict[str, str], timeout: float = 30):
+    """Yield an ``httpx.AsyncClient`` talking to a fresh app instance."""
+    if mode == "inprocess":
+        from app.database import engine
+        from app.main import app
+        from app.migrations import ensure_schema
+
+        # ASGITransport does not run the lifespan, so migrate here
+        await ensure_schema(engine)
+        # Report unhandled errors as 500 responses, like a server would, instead of raising
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+        await engine.dispose()
+        return
+
+    port = _free_port()
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        env=env,
+        cwd=ROOT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if proc.returncode is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.1)
+            yield client
+    finally:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), 10)
+
+
+async def create_account(client: httpx.AsyncClient, email: str = "bench@example.com") -> None:
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": "Bench", "email": email, "password": "benchmark-pass"},
+    )
+    response.raise_for_status()
+    client.cookies.set("access_token", response.cookies["access_token"])
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    """req/s and latency percentiles (milliseconds) for one scenario."""
+    ms = sorted(x * 1000 for x in latencies)
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ms[0] if ms else 0.0
+    return {
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(ms[-1], 2) if ms else 0.0,
+    }
+
+
+# Metric -> True when higher is better
+COMPARED_METRICS = {
+    "rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return one message per metric that regressed by more than ``threshold``.
+
+    Both arguments are ``{"scenarios": {name: summary}}`` documents; scenarios
+    missing from either side are ignored.
+    """
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        now = current.get("scenarios", {}).get(name)
+        if now is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = base.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def write_report(report: dict, output: str | None) -> None:
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+    print(text)
+
+
+def check_baseline(report: dict, baseline_path: str | None, threshold: float) -> int:
+    """Compare against a stored report; returns the process exit code."""
+    if not baseline_path:
+        return 0
+    baseline = json.loads(Path(baseline_path).read_text())
+    if baseline.get("meta", {}).get("mode") != report.get("meta", {}).get("mode"):
+        print("warning: baseline was recorded in a different --mode", file=sys.stderr)
+    regressions = compare(baseline, report, threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%} against {baseline_path}", file=sys.stderr)
+    return 1 if regressions else 0
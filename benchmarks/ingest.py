@@ -0,0 +1,168 @@
+"""Throughput and latency of the public ingest endpoint ``/f/{uuid}``.
+
+    PYTHONPATH=src python -m benchmarks.ingest [--mode inprocess|uvicorn]
+        [--route fast|fastapi] [--requests 2000] [--concurrency 32] [--scenario json ...]
+        [--output run.json] [--baseline baseline.json --threshold 0.15]
+
+Each scenario sends ``--requests`` requests from ``--concurrency`` workers and
+reports req/s and p50/p95/p99 latency as JSON. With ``--baseline`` the run is
+compared against a stored report and the exit code is 1 if any scenario's
+throughput or latency regressed by more than ``--threshold``.
+
+Submissions come from distinct synthetic client IPs (``X-Forwarded-For``) so
+they stay under the rate limit, except in ``rate_limited``, where a single IP
+is throttled after its first few requests.
+
+``--route fastapi`` turns off the raw ASGI handler (``FORMFORGE_FAST_INGEST``)
+so ``/f/{uuid}`` is served by ``submit_form``; ``benchmarks.fast_path`` runs
+both and reports the difference.
+"""
+
+import argparse
+import asyncio
+import platform
+import tempfile
+import time
+
+from benchmarks.harness import (
+    app_client,
+    check_baseline,
+    create_account,
+    isolated_env,
+    summarize,
+    write_report,
+)
+
+_MESSAGE = "Hello, I would like to hear more about your pricing for teams of about 20 people."
+
+
+def _ip(i: int) -> str:
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def _json(i: int) -> dict:
+    return {
+        "json": {"name": f"Person {i}", "email": f"p{i}@example.com", "message": _MESSAGE},
+        "headers": {"X-Forwarded-For": _ip(i), "Accept": "application/json"},
+    }
+
+
+def _urlencoded(i: int) -> dict:
+    return {
+        "data": {"name": f"Person {i}", "email": f"p{i}@example.com", "message": _MESSAGE},
+        "headers": {"X-Forwarded-For": _ip(i), "Accept": "application/json"},
+    }
+
+
+def _multipart(i: int) -> dict:
+    return {
+        "data": {"name": f"Person {i}", "email": f"p{i}@example.com"},
+        "files": {"message": (None, _MESSAGE)},
+        "headers": {"X-Forwarded-For": _ip(i), "Accept": "application/json"},
+    }
+
+
+def _rate_limited(i: int) -> dict:
+    return {
+        "json": {"email": f"p{i}@example.com"},
+        "headers": {"X-Forwarded-For": "192.0.2.1", "Accept": "application/json"},
+    }
+
+
+# name -> (HTTP method, request kwargs factory)
+SCENARIOS = {
+    "json": ("POST", _json),
+    "urlencoded": ("POST", _urlencoded),
+    "multipart": ("POST", _multipart),
+    "preflight": ("OPTIONS", lambda i: {"headers": {"Origin": "https://site.example"}}),
+    "rate_limited": ("POST", _rate_limited),
+}
+
+
+async def _drive(client, method: str, url: str, make, requests: int, concurrency: int):
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            response = await client.request(method, url, **make(i))
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**summarize(latencies, time.perf_counter() - start), "status": statuses}
+
+
+async def run(
+    mode: str, requests: int, concurrency: int, scenarios: list[str], route: str = "fast"
+) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        env = isolated_env(workdir, fast_ingest=str(route == "fast").lower())
+        async with app_client(mode, env) as client:
+            await create_account(client)
+            response = await client.post("/api/forms/", json={"name": "Bench"})
+            response.raise_for_status()
+            url = f"/f/{response.json()['uuid']}"
+
+            # Warm up imports, connection pool and statement caches
+            method, make = SCENARIOS["json"]
+            await _drive(client, method, url, make, min(requests, 50), concurrency)
+
+            results = {}
+            for offset, name in enumerate(scenarios, start=1):
+                method, make = SCENARIOS[name]
+                # Distinct IP ranges per scenario so earlier ones do not throttle later ones
+                base = offset * 1_000_000
+
+                def shifted(i, make=make, base=base):
+                    return make(base + i)
+
+                results[name] = await _drive(client, method, url, shifted, requests, concurrency)
+
+    return {
+        "benchmark": "ingest",
+        "meta": {
+            "mode": mode,
+            "route": route,
+            "requests": requests,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--route", choices=["fast", "fastapi"], default="fast")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run(
+            args.mode,
+            args.requests,
+            args.concurrency,
+            args.scenario or list(SCENARIOS),
+            args.route,
+        )
+    )
+    write_report(report, args.output)
+    raise SystemExit(check_baseline(report, args.baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
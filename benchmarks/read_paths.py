@@ -0,0 +1,177 @@
+"""Latency and peak memory of the read endpoints at several data sizes.
+
+    PYTHONPATH=src python -m benchmarks.read_paths [--sizes 10000,100000,1000000]
+        [--data-dir .bench-data] [--repeat 5] [--endpoint list_deep_page ...]
+        [--output run.json] [--baseline baseline.json --threshold 0.25]
+
+For each size a database is seeded with ``benchmarks.seed`` (and reused on
+later runs from ``--data-dir``). Every (size, endpoint) pair is then measured
+in a fresh subprocess, so its peak RSS belongs to that endpoint alone, after
+one unmeasured warm-up request. All requests are made as the seeded bench user
+against the largest form.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import (
+    ROOT,
+    app_client,
+    check_baseline,
+    isolated_env,
+    memory_mb,
+    subprocess_env,
+    summarize,
+    write_report,
+)
+
+PER_PAGE = 20
+
+
+def _endpoints(meta: dict) -> dict[str, str]:
+    form_id = meta["largest_form_id"]
+    last_page = max(1, -(-meta["largest_form_rows"] // PER_PAGE))
+    base = f"/api/forms/{form_id}/submissions"
+    return {
+        "list_first_page": f"{base}?page=1&per_page={PER_PAGE}",
+        "list_deep_page": f"{base}?page={last_page}&per_page={PER_PAGE}",
+        "search_common": f"{base}?page=1&per_page={PER_PAGE}&search=pricing",
+        "search_miss": f"{base}?page=1&per_page={PER_PAGE}&search=no-such-ref",
+        "dashboard": "/dashboard",
+        "form_detail_page": f"/dashboard/forms/{form_id}?page={last_page}",
+        "export_csv": f"/api/forms/{form_id}/export/csv",
+    }
+
+
+ENDPOINTS = list(_endpoints({"largest_form_id": 1, "largest_form_rows": 1}))
+
+
+async def _measure(db: Path, endpoint: str, repeat: int) -> dict:
+    meta = json.loads(db.with_suffix(db.suffix + ".json").read_text())
+    with tempfile.TemporaryDirectory() as workdir:
+        env = isolated_env(workdir, database_url=f"sqlite+aiosqlite:///{db}")
+        # Imported only now so settings pick up the environment above
+        from app.auth import create_access_token
+
+        async with app_client("inprocess", env) as client:
+            client.cookies.set("access_token", create_access_token({"sub": "1"}))
+            url = _endpoints(meta)[endpoint]
+            # One unmeasured request warms imports, templates and the page cache
+            (await client.get(url, headers={"Accept": "text/html"})).raise_for_status()
+            start_rss = memory_mb("VmRSS")
+            latencies = []
+            size = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = await client.get(url, headers={"Accept": "text/html"})
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+                size = len(response.content)
+    return {
+        **summarize(latencies, sum(latencies)),
+        "response_bytes": size,
+        "start_rss_mb": round(start_rss, 1),
+        "peak_rss_mb": round(memory_mb("VmHWM"), 1),
+    }
+
+
+def _worker(db: Path, endpoint: str, repeat: int, timeout: float) -> dict:
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.read_paths",
+            "--worker",
+            str(db),
+            "--endpoint",
+            endpoint,
+            "--repeat",
+            str(repeat),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        cwd=ROOT,
+        env=subprocess_env(),
+        timeout=timeout,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+    return json.loads(proc.stdout)
+
+
+def run(
+    sizes: list[int],
+    data_dir: Path,
+    endpoints: list[str],
+    repeat: int,
+    max_export_rows: int,
+    timeout: float,
+) -> dict:
+    from benchmarks.seed import seed
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    scenarios = {}
+    seeding = {}
+    for size in sizes:
+        db = data_dir / f"seed-{size}.db"
+        if not db.with_suffix(".db.json").exists():
+            seeding[size] = seed(db, size)
+        meta = json.loads(db.with_suffix(".db.json").read_text())
+        for endpoint in endpoints:
+            name = f"{endpoint}@{size}"
+            if endpoint == "export_csv" and meta["largest_form_rows"] > max_export_rows:
+                scenarios[name] = {"skipped": f"form has more than {max_export_rows} rows"}
+                continue
+            try:
+                scenarios[name] = _worker(db, endpoint, repeat, timeout)
+            except subprocess.TimeoutExpired:
+                scenarios[name] = {"error": f"timed out after {timeout}s"}
+            print(f"{name}: {scenarios[name]}", file=sys.stderr)
+
+    return {
+        "benchmark": "read_paths",
+        "meta": {"mode": "inprocess", "sizes": sizes, "repeat": repeat, "seeding": seeding},
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--data-dir", default=".bench-data")
+    parser.add_argument("--endpoint", action="append", choices=ENDPOINTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-export-rows", type=int, default=1_000_000)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(_measure(Path(args.worker), args.endpoint[0], args.repeat))
+        print(json.dumps(result))
+        return
+
+    report = run(
+        [int(s) for s in args.sizes.split(",")],
+        Path(args.data_dir),
+        args.endpoint or ENDPOINTS,
+        args.repeat,
+        args.max_export_rows,
+        args.timeout,
+    )
+    write_report(report, args.output)
+    raise SystemExit(check_baseline(report, args.baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
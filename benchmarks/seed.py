@@ -0,0 +1,200 @@
+"""Bulk-generate a large synthetic FormForge database.
+
+    PYTHONPATH=src python -m benchmarks.seed --db bench.db --submissions 10000000
+        [--users 1000] [--owner-forms 100] [--days 730] [--seed 1]
+
+Writes straight to SQLite through ``sqlite3`` (journal and fsync off, secondary
+indexes built after the load), so tens of millions of rows take minutes rather
+than hours. The schema comes from the ORM metadata, stamped as the newest
+migration.
+
+User 1 (``bench@example.com`` / ``benchmark-pass``, pro plan) owns
+``--owner-forms`` forms, the other users one to three each. Submissions are
+spread over forms with a Zipf distribution, so form 1 is by far the largest,
+and over the last ``--days`` days in id order. Payloads mix the shapes from
+``benchmarks.compression`` plus a short signup, and each carries a unique
+``ref`` so single rows can be searched for.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from app.auth import hash_password
+from app.database import Base
+from app.migrations import SCHEMA_REVISION, alembic_config
+from app.models import Submission
+from benchmarks.compression import SHAPES
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "benchmark-pass"
+_BATCH = 50_000
+_POOL_SIZE = 20_000
+
+
+def _signup(rng: random.Random, i: int) -> dict:
+    return {"email": f"reader{i}@example.net", "list": rng.choice(["weekly", "product", "events"])}
+
+
+# Shape factory -> share of submissions
+_MIX = [
+    (SHAPES["contact"], 0.65),
+    (_signup, 0.20),
+    (SHAPES["survey"], 0.14),
+    (SHAPES["long_text"], 0.01),
+]
+
+
+def _payload_pool(rng: random.Random) -> list[str]:
+    """JSON bodies without their opening brace, ready for a ``ref`` prefix."""
+    makers = rng.choices([m for m, _ in _MIX], weights=[w for _, w in _MIX], k=_POOL_SIZE)
+    return [json.dumps(make(rng, i))[1:] for i, make in enumerate(makers)]
+
+
+def _create_schema(path: Path) -> None:
+    from alembic import command
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        # Otherwise ensure_schema takes the database for a pre-Alembic one and migrates it
+        command.stamp(alembic_config(conn), SCHEMA_REVISION)
+    engine.dispose()
+
+
+def _secondary_indexes():
+    return [index for index in Submission.__table__.indexes]
+
+
+def seed(
+    path: Path,
+    submissions: int,
+    users: int = 1000,
+    owner_forms: int = 100,
+    days: int = 730,
+    seed: int = 1,
+) -> dict:
+    """Create ``path`` from scratch and return a summary (also written to ``<db>.json``)."""
+    rng = random.Random(seed)
+    path.unlink(missing_ok=True)
+    _create_schema(path)
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+    for index in _secondary_indexes():
+        conn.execute(f"DROP INDEX {index.name}")
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    start = now - timedelta(days=days)
+    stamp = (start - timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    hashed = hash_password(BENCH_PASSWORD)
+
+    user_rows = [(1, BENCH_EMAIL, hashed, "Bench Owner", "pro", 1, stamp)]
+    user_rows += [
+        (i, f"user{i}@example.com", hashed, f"User {i}", rng.choice(["free", "starter"]), 1, stamp)
+        for i in range(2, users + 1)
+    ]
+    conn.executemany(
+        "INSERT INTO users (id, email, hashed_password, name, plan, is_active, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        user_rows,
+    )
+
+    owners = [1] * owner_forms
+    for user_id in range(2, users + 1):
+        owners += [user_id] * rng.randint(1, 3)
+    conn.executemany(
+        "INSERT INTO forms (id, uuid, name, owner_id, allowed_origins, email_notifications, "
+        "notification_email, is_active, created_at) VALUES (?, ?, ?, ?, '*', 0, NULL, 1, ?)",
+        [
+            (form_id, str(uuid.UUID(int=rng.getrandbits(128))), f"Form {form_id}", owner, stamp)
+            for form_id, owner in enumerate(owners, start=1)
+        ],
+    )
+    form_ids = list(range(1, len(owners) + 1))
+    cum_weights = list(itertools.accumulate(1 / rank for rank in form_ids))
+
+    pool = _payload_pool(rng)
+    span = days * 86400 / max(submissions, 1)
+    counts: dict[int, int] = {}
+    inserted = 0
+    while inserted < submissions:
+        batch = min(_BATCH, submissions - inserted)
+        forms_for_batch = rng.choices(form_ids, cum_weights=cum_weights, k=batch)
+        rows = []
+        for offset, form_id in enumerate(forms_for_batch):
+            n = inserted + offset
+            created = start + timedelta(seconds=n * span)
+            rows.append(
+                (
+                    n + 1,
+                    form_id,
+                    f'{{"ref": "r{n + 1}", {pool[n % _POOL_SIZE]}',
+                    f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}",
+                    created.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                )
+            )
+            counts[form_id] = counts.get(form_id, 0) + 1
+        conn.executemany(
+            "INSERT INTO submissions (id, form_id, data, ip_address, is_spam, created_at) "
+            "VALUES (?, ?, ?, ?, 0, ?)",
+            rows,
+        )
+        inserted += batch
+        conn.commit()
+    loaded = time.perf_counter() - started
+
+    for index in _secondary_indexes():
+        columns = ", ".join(column.name for column in index.columns)
+        conn.execute(f"CREATE INDEX {index.name} ON submissions ({columns})")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    summary = {
+        "db": str(path),
+        "users": users,
+        "forms": len(owners),
+        "submissions": submissions,
+        "bench_user_id": 1,
+        "bench_email": BENCH_EMAIL,
+        "bench_forms": owner_forms,
+        "largest_form_id": 1,
+        "largest_form_rows": counts.get(1, 0),
+        "load_seconds": round(loaded, 1),
+        "total_seconds": round(time.perf_counter() - started, 1),
+        "rows_per_second": round(submissions / loaded) if loaded else 0,
+        "size_mb": round(path.stat().st_size / 1_000_000, 1),
+    }
+    path.with_suffix(path.suffix + ".json").write_text(json.dumps(summary, indent=2) + "\n")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bench.db")
+    parser.add_argument("--submissions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--owner-forms", type=int, default=100)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    summary = seed(
+        Path(args.db), args.submissions, args.users, args.owner_forms, args.days, args.seed
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
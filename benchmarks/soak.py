@@ -0,0 +1,206 @@
+"""Sustained-traffic soak test that fails on memory growth.
+
+    PYTHONPATH=src python -m benchmarks.soak [--duration 600] [--concurrency 8]
+        [--forms 20] [--smtp] [--max-slope 1.0] [--output soak.json]
+
+Submits continuously to ``--forms`` forms, each request from a new synthetic
+client IP, like real internet traffic. With ``--smtp`` notifications are
+delivered to a local SMTP sink so the notification task path runs too.
+
+Every ``--interval`` seconds it samples RSS, tracemalloc's traced total, the
+rate-limiter size and pending background tasks. After the first
+``--warmup`` fraction of the run (caches and pools filling up), a linear fit
+of RSS and of traced memory must stay under ``--max-slope`` MB per minute,
+otherwise the exit code is 1. The report lists the allocation sites that grew
+most between the end of warm-up and the end of the run.
+"""
+
+import argparse
+import asyncio
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.harness import app_client, create_account, isolated_env, memory_mb, write_report
+
+
+async def _smtp_sink(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Just enough SMTP for aiosmtplib to deliver a message, which is discarded."""
+    writer.write(b"220 sink ESMTP\r\n")
+    in_data = False
+    while line := await reader.readline():
+        if in_data:
+            if line == b".\r\n":
+                in_data = False
+                writer.write(b"250 queued\r\n")
+            continue
+        verb = line[:4].upper()
+        if verb == b"DATA":
+            in_data = True
+            writer.write(b"354 go ahead\r\n")
+        elif verb == b"QUIT":
+            writer.write(b"221 bye\r\n")
+            await writer.drain()
+            break
+        else:
+            writer.write(b"250 ok\r\n")
+        await writer.drain()
+    writer.close()
+
+
+def _slope(points: list[tuple[float, float]]) -> float:
+    """Least-squares slope of (minutes, MB) points, in MB per minute."""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def _top_growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int = 10):
+    return [
+        {
+            "where": str(stat.traceback),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+        }
+        for stat in after.compare_to(before, "lineno")[:limit]
+    ]
+
+
+async def run(
+    duration: float,
+    concurrency: int,
+    forms: int,
+    interval: float,
+    warmup: float,
+    smtp: bool,
+) -> dict:
+    sink = None
+    overrides = {"submissions_per_minute": 10}
+    if smtp:
+        sink = await asyncio.start_server(_smtp_sink, "127.0.0.1", 0)
+        overrides.update(
+            smtp_host="127.0.0.1",
+            smtp_port=sink.sockets[0].getsockname()[1],
+            smtp_use_tls="false",
+        )
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = isolated_env(workdir, **overrides)
+        async with app_client("inprocess", env) as client:
+            from app.routers.submissions import _rate_limit_entries
+            from app.tasks import pending_tasks
+
+            urls = []
+            for i in range(forms):
+                client.cookies.clear()
+                await create_account(client, email=f"soak{i}@example.com")
+                response = await client.post("/api/forms/", json={"name": f"Soak {i}"})
+                response.raise_for_status()
+                urls.append(f"/f/{response.json()['uuid']}")
+            client.cookies.clear()
+
+            sent = 0
+            errors: dict[str, int] = {}
+            deadline = time.monotonic() + duration
+
+            async def worker():
+                nonlocal sent
+                while time.monotonic() < deadline:
+                    n = sent
+                    sent += 1
+                    ip = f"{(n >> 24) & 255 or 1}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+                    response = await client.post(
+                        urls[n % len(urls)],
+                        json={"email": f"visitor{n}@example.com", "message": "soak"},
+                        headers={"X-Forwarded-For": ip, "Accept": "application/json"},
+                    )
+                    if response.status_code != 200:
+                        status = str(response.status_code)
+                        errors[status] = errors.get(status, 0) + 1
+
+            tracemalloc.start()
+            started = time.monotonic()
+            samples = []
+            baseline_snapshot = None
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            while time.monotonic() < deadline:
+                await asyncio.sleep(interval)
+                elapsed = time.monotonic() - started
+                samples.append(
+                    {
+                        "t_s": round(elapsed, 1),
+                        "requests": sent,
+                        "rss_mb": round(memory_mb("VmRSS"), 2),
+                        "traced_mb": round(tracemalloc.get_traced_memory()[0] / 1_000_000, 2),
+                        "rate_limit_entries": _rate_limit_entries(),
+                        "pending_tasks": pending_tasks(),
+                    }
+                )
+                if baseline_snapshot is None and elapsed >= duration * warmup:
+                    baseline_snapshot = tracemalloc.take_snapshot()
+            await asyncio.gather(*workers)
+            final_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    if sink is not None:
+        sink.close()
+        await sink.wait_closed()
+
+    steady = [s for s in samples if s["t_s"] >= duration * warmup]
+    rss_slope = _slope([(s["t_s"] / 60, s["rss_mb"]) for s in steady])
+    traced_slope = _slope([(s["t_s"] / 60, s["traced_mb"]) for s in steady])
+    return {
+        "benchmark": "soak",
+        "meta": {
+            "mode": "inprocess",
+            "duration_s": duration,
+            "concurrency": concurrency,
+            "forms": forms,
+            "smtp": smtp,
+            "python": platform.python_version(),
+        },
+        "requests": sent,
+        "errors": errors,
+        "rss_slope_mb_per_min": round(rss_slope, 3),
+        "traced_slope_mb_per_min": round(traced_slope, 3),
+        "top_growth": _top_growth(baseline_snapshot or final_snapshot, final_snapshot),
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=600, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--forms", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=5, help="seconds between samples")
+    parser.add_argument("--warmup", type=float, default=0.25, help="fraction of the run ignored")
+    parser.add_argument("--smtp", action="store_true", help="deliver notifications to a sink")
+    parser.add_argument("--max-slope", type=float, default=1.0, help="MB per minute")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run(args.duration, args.concurrency, args.forms, args.interval, args.warmup, args.smtp)
+    )
+    write_report(report, args.output)
+    failed = [
+        name
+        for name in ("rss_slope_mb_per_min", "traced_slope_mb_per_min")
+        if report[name] > args.max_slope
+    ]
+    for name in failed:
+        print(f"FAIL {name}={report[name]} exceeds {args.max_slope}", file=sys.stderr)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Cold-start cost: import time of ``app.main`` and time to the first ``/health``.
+
+    PYTHONPATH=src python -m benchmarks.startup [--runs 5] [--top 15]
+        [--output run.json] [--baseline baseline.json --threshold 0.25]
+
+Each run is a fresh interpreter. ``python -X importtime -c "import app.main"``
+gives the import breakdown; the report keeps the median total and the slowest
+top-level packages of the last run. Then ``uvicorn app.main:app`` is started
+against an empty database (so the first boot also runs the migrations, and a
+second boot only the version check) and polled until ``/health`` answers.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.harness import ROOT, _free_port, check_baseline, isolated_env, write_report
+
+
+def _import_times(env: dict[str, str]) -> dict[str, float]:
+    """Cumulative import time in ms of ``app.main`` and of each module it imports directly."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+        env=env,
+        check=True,
+    )
+    times = {}
+    children = {}
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        # Depth is encoded as indentation: one space at the top, two more per level.
+        # Children are printed before their parent.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        ms = int(parts[1]) / 1000
+        if depth == 1:
+            children[name.strip()] = ms
+        elif depth == 0:
+            if name.strip() == "app.main":
+                times = {"app.main": ms, **children}
+            children = {}
+    return times
+
+
+def _time_to_health(env: dict[str, str], timeout: float = 60) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        cwd=ROOT,
+    )
+    try:
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"/health did not answer within {timeout}s")
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def run(runs: int, top: int) -> dict:
+    imports = []
+    first_boot = []
+    warm_boot = []
+    modules: dict[str, float] = {}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            env = isolated_env(workdir)
+            modules = _import_times(env)
+            imports.append(modules.get("app.main", 0.0))
+            first_boot.append(_time_to_health(env) * 1000)
+            warm_boot.append(_time_to_health(env) * 1000)
+
+    def scenario(values: list[float]) -> dict:
+        return {
+            "runs": len(values),
+            "p50_ms": round(statistics.median(values), 1),
+            "max_ms": round(max(values), 1),
+        }
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "benchmark": "startup",
+        "meta": {"mode": "subprocess", "runs": runs},
+        "scenarios": {
+            "import_app_main": scenario(imports),
+            "health_empty_db": scenario(first_boot),
+            "health_migrated_db": scenario(warm_boot),
+        },
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest[1 : top + 1]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = run(args.runs, args.top)
+    write_report(report, args.output)
+    raise SystemExit(check_baseline(report, args.baseline, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Admission control for the public submission endpoints.
+
+Each worker caps the submissions it processes at once, overall and per form.
+A request over either cap is refused immediately with ``503`` and
+``Retry-After`` rather than queueing behind a slow database. A flood aimed at
+one form then fills only that form's share.
+
+With ``FORMFORGE_ADMISSION_ADAPTIVE`` the worker-wide cap follows commit
+latency (AIMD). While the moving average stays above
+``FORMFORGE_ADMISSION_TARGET_COMMIT_MS``, the cap drops by a quarter once
+per window of commits. While it stays below, the cap grows by one per window,
+back up to ``FORMFORGE_MAX_INFLIGHT_SUBMISSIONS``.
+
+Refusals are counted in ``formforge_submissions_shed_total`` by reason
+(``worker`` or ``form``). Rate limiting counts per-IP abuse; these count
+overload.
+"""
+
+from app.config import settings
+from app.metrics import Counter, register_gauge, registry
+
+shed_total = registry.register(
+    Counter(
+        "formforge_submissions_shed_total",
+        "Submissions refused with 503 by admission control, by reason (worker, form).",
+        ("reason",),
+    )
+)
+
+# Weight of the newest commit in the moving average
+_EWMA_ALPHA = 0.2
+# Adaptive mode never goes below this many concurrent submissions
+_MIN_LIMIT = 2
+
+
+class AdmissionController:
+    def __init__(self):
+        self.inflight = 0
+        self.per_form: dict[str, int] = {}
+        self.commit_ewma: float | None = None
+        self._adaptive_limit: int | None = None
+        self._since_change = 0
+
+    @property
+    def limit(self) -> int:
+        """The current worker-wide cap; 0 means unlimited."""
+        configured = settings.max_inflight_submissions
+        if not configured or not settings.admission_adaptive or self._adaptive_limit is None:
+            return configured
+        return min(self._adaptive_limit, configured)
+
+    def try_enter(self, form_uuid: str) -> str | None:
+        """Take a slot; returns the refusal reason instead when over a cap."""
+        limit = self.limit
+        if limit and self.inflight >= limit:
+            shed_total.inc("worker")
+            return "worker"
+        per_form = settings.max_inflight_per_form
+        if per_form and self.per_form.get(form_uuid, 0) >= per_form:
+            shed_total.inc("form")
+            return "form"
+        self.inflight += 1
+        self.per_form[form_uuid] = self.per_form.get(form_uuid, 0) + 1
+        return None
+
+    def leave(self, form_uuid: str) -> None:
+        self.inflight -= 1
+        remaining = self.per_form[form_uuid] - 1
+        if remaining:
+            self.per_form[form_uuid] = remaining
+        else:
+            del self.per_form[form_uuid]
+
+    def observe_commit(self, seconds: float) -> None:
+        if not settings.admission_adaptive or not settings.max_inflight_submissions:
+            return
+        if self.commit_ewma is None:
+            self.commit_ewma = seconds
+        else:
+            self.commit_ewma += _EWMA_ALPHA * (seconds - self.commit_ewma)
+
+        limit = self.limit
+        self._since_change += 1
+        # One adjustment per window of commits, i.e. roughly once per round trip
+        if self._since_change < limit:
+            return
+        self._since_change = 0
+        if self.commit_ewma * 1000 > settings.admission_target_commit_ms:
+            self._adaptive_limit = max(_MIN_LIMIT, limit - max(1, limit // 4))
+        else:
+            self._adaptive_limit = min(settings.max_inflight_submissions, limit + 1)
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+admission = AdmissionController()
+
+register_gauge(
+    "formforge_submissions_inflight",
+    "Public submissions being processed by this worker.",
+    lambda: admission.inflight,
+)
+register_gauge(
+    "formforge_admission_limit",
+    "Current worker-wide cap on concurrent submissions (0 means unlimited).",
+    lambda: admission.limit,
+)
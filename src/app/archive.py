@@ -0,0 +1,301 @@
+import asyncio
+import gzip
+import io
+import itertools
+import json
+import logging
+import os
+import shutil
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models import ArchiveSegment, Form, Submission
+from app.recent import recent
+
+logger = logging.getLogger(__name__)
+
+# Archived rows handed from the reader thread to the event loop at a time
+_ITER_BATCH = 500
+
+
+def segment_path(form_id: int, month: str) -> Path:
+    return Path(settings.archive_dir) / str(form_id) / f"{month}.jsonl.gz"
+
+
+def _append_segment(path: Path, committed_size: int, lines: list[bytes]) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as fh:
+        # Drop any tail left by an append whose DB commit never happened
+        fh.truncate(committed_size)
+        with gzip.GzipFile(fileobj=fh, mode="wb") as gz:
+            gz.writelines(lines)
+        fh.flush()
+        os.fsync(fh.fileno())
+        return fh.tell()
+
+
+class _Committed(io.RawIOBase):
+    """The first ``size`` bytes of a segment file; anything after is an append never committed."""
+
+    def __init__(self, fh, size: int):
+        self._fh = fh
+        self._left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._fh.read(min(len(buffer), self._left))
+        buffer[: len(data)] = data
+        self._left -= len(data)
+        return len(data)
+
+
+def _segment_lines(path: str, size_bytes: int) -> Iterator[bytes]:
+    """A segment's JSON lines in the order they were appended, decompressed as read."""
+    with open(path, "rb") as fh, gzip.GzipFile(fileobj=_Committed(fh, size_bytes)) as gz:
+        for line in gz:
+            if line.strip():
+                yield line
+
+
+@lru_cache(maxsize=64)
+def _segment_order(path: str, size_bytes: int) -> tuple[int, ...]:
+    """Line numbers of a segment's rows, newest first.
+
+    Only the positions are cached; pages re-read the segment for their rows.
+    """
+    keys = []
+    for number, line in enumerate(_segment_lines(path, size_bytes)):
+        row = json.loads(line)
+        keys.append((row["created_at"], row["id"], number))
+    keys.sort(reverse=True)
+    return tuple(number for _, _, number in keys)
+
+
+def _matching_lines(path: str, size_bytes: int, needle: str) -> set[int]:
+    return {
+        number
+        for number, line in enumerate(_segment_lines(path, size_bytes))
+        if needle in json.loads(line)["data"].lower()
+    }
+
+
+def _read_lines(path: str, size_bytes: int, numbers: list[int]) -> list[dict]:
+    """The rows at ``numbers``, in that order, stopping once the last one is read."""
+    wanted = {number: i for i, number in enumerate(numbers)}
+    rows: list[dict] = [{}] * len(numbers)
+    found = 0
+    for number, line in enumerate(_segment_lines(path, size_bytes)):
+        i = wanted.get(number)
+        if i is not None:
+            rows[i] = json.loads(line)
+            found += 1
+            if found == len(numbers):
+                break
+    return rows
+
+
+def _to_submission(row: dict, form_id: int) -> Submission:
+    # Transient object so routers can treat archived rows like hot ones
+    return Submission(
+        id=row["id"],
+        form_id=form_id,
+        data=row["data"],
+        ip_address=row["ip_address"],
+        is_spam=False,
+        created_at=datetime.fromisoformat(row["created_at"]),
+    )
+
+
+async def archive_form(db: AsyncSession, form_id: int, cutoff: datetime) -> int:
+    """Move a form's submissions created before ``cutoff`` into monthly segments."""
+    archived = 0
+    while True:
+        result = await db.execute(
+            select(Submission)
+            .where(Submission.form_id == form_id, Submission.created_at < cutoff)
+            .order_by(Submission.id)
+            .limit(settings.archive_batch_size)
+        )
+        rows = result.scalars().all()
+        if not rows:
+            return archived
+
+        by_month: dict[str, list[bytes]] = defaultdict(list)
+        for s in rows:
+            line = json.dumps(
+                {
+                    "id": s.id,
+                    "data": s.data,
+                    "ip_address": s.ip_address,
+                    "created_at": s.created_at.isoformat(),
+                }
+            )
+            by_month[s.created_at.strftime("%Y-%m")].append(line.encode() + b"\n")
+
+        for month, lines in by_month.items():
+            result = await db.execute(
+                select(ArchiveSegment).where(
+                    ArchiveSegment.form_id == form_id, ArchiveSegment.month == month
+                )
+            )
+            segment = result.scalar_one_or_none()
+            if segment is None:
+                segment = ArchiveSegment(form_id=form_id, month=month, row_count=0, size_bytes=0)
+                db.add(segment)
+            segment.size_bytes = await asyncio.to_thread(
+                _append_segment, segment_path(form_id, month), segment.size_bytes, lines
+            )
+            segment.row_count += len(lines)
+
+        await db.execute(delete(Submission).where(Submission.id.in_([s.id for s in rows])))
+        await db.commit()
+        recent.invalidate(form_id)
+        archived += len(rows)
+        await asyncio.sleep(settings.retention_chunk_pause_ms / 1000)
+
+
+async def run_archive(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> int:
+    """Move old submissions of every form to cold storage. Scheduled by ``app.scheduler``."""
+    if not settings.archive_after_days:
+        return 0
+    cutoff = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=settings.archive_after_days)
+    async with session_factory() as db:
+        result = await db.execute(select(Form.id))
+        form_ids = result.scalars().all()
+
+    total = 0
+    for form_id in form_ids:
+        async with session_factory() as db:
+            total += await archive_form(db, form_id, cutoff)
+    if total:
+        logger.info(f"Archived {total} submissions older than {cutoff.date()}")
+    return total
+
+
+async def archived_counts(db: AsyncSession, form_ids: list[int]) -> dict[int, int]:
+    if not form_ids:
+        return {}
+    result = await db.execute(
+        select(ArchiveSegment.form_id, func.sum(ArchiveSegment.row_count))
+        .where(ArchiveSegment.form_id.in_(form_ids))
+        .group_by(ArchiveSegment.form_id)
+    )
+    return {form_id: count for form_id, count in result.all()}
+
+
+async def _segments(db: AsyncSession, form_id: int) -> list[ArchiveSegment]:
+    result = await db.execute(
+        select(ArchiveSegment)
+        .where(ArchiveSegment.form_id == form_id, ArchiveSegment.row_count > 0)
+        .order_by(ArchiveSegment.month.desc())
+    )
+    return list(result.scalars().all())
+
+
+async def _segment_order_matching(segment: ArchiveSegment, search: str) -> tuple[int, ...]:
+    path = str(segment_path(segment.form_id, segment.month))
+    order = await asyncio.to_thread(_segment_order, path, segment.size_bytes)
+    if search:
+        # Mirror SQLite's case-insensitive LIKE used for hot rows
+        matches = await asyncio.to_thread(_matching_lines, path, segment.size_bytes, search.lower())
+        order = tuple(number for number in order if number in matches)
+    return order
+
+
+async def read_archived(
+    db: AsyncSession, form_id: int, offset: int, limit: int, search: str = ""
+) -> tuple[list[Submission], int]:
+    """Return ``(rows, total)`` of archived submissions, newest first.
+
+    Without a search, whole segments are skipped using their row counts; with
+    one, every segment has to be decompressed to count the matches. Segments
+    are streamed, so only the rows on the page are held in memory.
+    """
+    segments = await _segments(db, form_id)
+    rows: list[Submission] = []
+    total = 0
+    for segment in segments:
+        if search:
+            order = await _segment_order_matching(segment, search)
+            count = len(order)
+        else:
+            order = None
+            count = segment.row_count
+
+        start = max(0, offset - total)
+        if len(rows) < limit and start < count:
+            if order is None:
+                order = await _segment_order_matching(segment, search)
+            numbers = list(order[start : start + limit - len(rows)])
+            page = await asyncio.to_thread(
+                _read_lines,
+                str(segment_path(segment.form_id, segment.month)),
+                segment.size_bytes,
+                numbers,
+            )
+            rows.extend(_to_submission(r, form_id) for r in page)
+        total += count
+    return rows, total
+
+
+async def paginate_with_archive(
+    db: AsyncSession,
+    form_id: int,
+    hot_rows: list[Submission],
+    hot_total: int,
+    offset: int,
+    limit: int,
+    search: str = "",
+) -> tuple[list[Submission], int]:
+    """Extend a page of hot rows with archived rows once the hot rows run out."""
+    archive_offset = max(0, offset - hot_total)
+    archive_limit = limit - len(hot_rows)
+    archived, archived_total = await read_archived(
+        db, form_id, archive_offset, archive_limit, search
+    )
+    return list(hot_rows) + archived, hot_total + archived_total
+
+
+async def iter_archived(db: AsyncSession, form_id: int):
+    """Every archived submission of a form, newest segment first, in append order within one."""
+    for segment in await _segments(db, form_id):
+        lines = _segment_lines(str(segment_path(form_id, segment.month)), segment.size_bytes)
+        while batch := await asyncio.to_thread(list, itertools.islice(lines, _ITER_BATCH)):
+            for line in batch:
+                yield _to_submission(json.loads(line), form_id)
+
+
+async def drop_expired_segments(db: AsyncSession, form_id: int, cutoff: datetime) -> int:
+    """Remove whole monthly segments that ended before the retention cutoff."""
+    result = await db.execute(
+        select(ArchiveSegment).where(
+            ArchiveSegment.form_id == form_id, ArchiveSegment.month < cutoff.strftime("%Y-%m")
+        )
+    )
+    dropped = 0
+    for segment in result.scalars().all():
+        segment_path(form_id, segment.month).unlink(missing_ok=True)
+        dropped += segment.row_count
+        await db.delete(segment)
+    await db.commit()
+    _segment_order.cache_clear()
+    return dropped
+
+
+async def delete_form_archive(db: AsyncSession, form_id: int) -> None:
+    await db.execute(delete(ArchiveSegment).where(ArchiveSegment.form_id == form_id))
+    await db.commit()
+    shutil.rmtree(Path(settings.archive_dir) / str(form_id), ignore_errors=True)
+    _segment_order.cache_clear()
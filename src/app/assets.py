@@ -0,0 +1,812 @@
+"""The dashboard stylesheet, built from the templates and served from /static.
+
+    python -m app.assets build [--out DIR]
+
+The build runs in the Dockerfile. It scans the templates for class names the
+way Tailwind's purge does: every token that names a utility gets a rule, and
+nothing else does. Those rules are appended to ``styles/base.css``, which
+holds the reset and the few hand-written components. The result is written
+to ``static/`` as ``app.<hash>.css`` with a gzip sibling, and
+``static/manifest.json`` maps ``app.css`` to that file. Templates link it
+with ``asset_url("app.css")``.
+
+A hashed file never changes, so ``AssetFiles`` serves it with a year-long
+``immutable`` Cache-Control. Clients that accept gzip get the ``.gz`` file.
+Without a build, or when the templates are newer than the manifest (in
+development), the first page render builds the bundle itself.
+
+The utilities are the subset of Tailwind CSS v3 the templates use, with its
+default theme plus the ``brand`` palette. Variants cover ``sm:``/``md:``/
+``lg:``/``xl:``, ``hover:``, ``focus:``, ``active:``, ``disabled:`` and
+``group-hover:``. A class outside that subset gets no CSS, and
+``python -m app.assets build`` lists the ones it did not recognise.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from functools import lru_cache
+from mimetypes import guess_type
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from app.response_compression import negotiate
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = Path(__file__).resolve().parent
+STATIC_DIR = _APP_DIR / "static"
+TEMPLATES_DIR = _APP_DIR / "templates"
+STYLES_DIR = _APP_DIR / "styles"
+MANIFEST = "manifest.json"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+_HASHED = re.compile(r"[\w-]+\.[0-9a-f]{12}\.\w+")
+
+# --- Theme (Tailwind CSS v3 defaults, plus brand) ---
+
+_BLUE = {
+    50: "#eff6ff",
+    100: "#dbeafe",
+    200: "#bfdbfe",
+    300: "#93c5fd",
+    400: "#60a5fa",
+    500: "#3b82f6",
+    600: "#2563eb",
+    700: "#1d4ed8",
+    800: "#1e40af",
+    900: "#1e3a8a",
+}
+_PALETTE = {
+    "gray": {
+        50: "#f9fafb",
+        100: "#f3f4f6",
+        200: "#e5e7eb",
+        300: "#d1d5db",
+        400: "#9ca3af",
+        500: "#6b7280",
+        600: "#4b5563",
+        700: "#374151",
+        800: "#1f2937",
+        900: "#111827",
+    },
+    "red": {
+        50: "#fef2f2",
+        100: "#fee2e2",
+        200: "#fecaca",
+        300: "#fca5a5",
+        400: "#f87171",
+        500: "#ef4444",
+        600: "#dc2626",
+        700: "#b91c1c",
+        800: "#991b1b",
+        900: "#7f1d1d",
+    },
+    "yellow": {
+        50: "#fefce8",
+        100: "#fef9c3",
+        200: "#fef08a",
+        300: "#fde047",
+        400: "#facc15",
+        500: "#eab308",
+        600: "#ca8a04",
+        700: "#a16207",
+        800: "#854d0e",
+        900: "#713f12",
+    },
+    "green": {
+        50: "#f0fdf4",
+        100: "#dcfce7",
+        200: "#bbf7d0",
+        300: "#86efac",
+        400: "#4ade80",
+        500: "#22c55e",
+        600: "#16a34a",
+        700: "#15803d",
+        800: "#166534",
+        900: "#14532d",
+    },
+    "blue": _BLUE,
+    "indigo": {
+        50: "#eef2ff",
+        100: "#e0e7ff",
+        200: "#c7d2fe",
+        300: "#a5b4fc",
+        400: "#818cf8",
+        500: "#6366f1",
+        600: "#4f46e5",
+        700: "#4338ca",
+        800: "#3730a3",
+        900: "#312e81",
+    },
+    "brand": _BLUE,
+}
+_SCREENS = {"sm": "640px", "md": "768px", "lg": "1024px", "xl": "1280px"}
+# Pseudo-class variants, in the order Tailwind emits them
+_PSEUDO = {"hover": ":hover", "focus": ":focus", "active": ":active", "disabled": ":disabled"}
+
+_FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"),
+    "sm": ("0.875rem", "1.25rem"),
+    "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"),
+    "xl": ("1.25rem", "1.75rem"),
+    "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"),
+    "4xl": ("2.25rem", "2.5rem"),
+    "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"),
+    "7xl": ("4.5rem", "1"),
+}
+_MAX_WIDTHS = {
+    "xs": "20rem",
+    "sm": "24rem",
+    "md": "28rem",
+    "lg": "32rem",
+    "xl": "36rem",
+    "2xl": "42rem",
+    "3xl": "48rem",
+    "4xl": "56rem",
+    "5xl": "64rem",
+    "6xl": "72rem",
+    "7xl": "80rem",
+    "full": "100%",
+    "none": "none",
+}
+_RADII = {
+    "none": "0px",
+    "sm": "0.125rem",
+    "": "0.25rem",
+    "md": "0.375rem",
+    "lg": "0.5rem",
+    "xl": "0.75rem",
+    "2xl": "1rem",
+    "3xl": "1.5rem",
+    "full": "9999px",
+}
+_SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "none": "0 0 #0000",
+}
+_FONT_WEIGHTS = {
+    "light": "300",
+    "normal": "400",
+    "medium": "500",
+    "semibold": "600",
+    "bold": "700",
+    "extrabold": "800",
+}
+_TRANSITION = "transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms"
+_CHILDREN = " > :not([hidden]) ~ :not([hidden])"
+
+# Utilities without a value
+_STATIC = {
+    "block": "display:block",
+    "inline-block": "display:inline-block",
+    "inline": "display:inline",
+    "flex": "display:flex",
+    "inline-flex": "display:inline-flex",
+    "grid": "display:grid",
+    "table": "display:table",
+    "hidden": "display:none",
+    "static": "position:static",
+    "fixed": "position:fixed",
+    "absolute": "position:absolute",
+    "relative": "position:relative",
+    "sticky": "position:sticky",
+    "flex-1": "flex:1 1 0%",
+    "flex-auto": "flex:1 1 auto",
+    "flex-none": "flex:none",
+    "flex-shrink-0": "flex-shrink:0",
+    "shrink-0": "flex-shrink:0",
+    "flex-grow": "flex-grow:1",
+    "flex-row": "flex-direction:row",
+    "flex-col": "flex-direction:column",
+    "flex-wrap": "flex-wrap:wrap",
+    "items-start": "align-items:flex-start",
+    "items-end": "align-items:flex-end",
+    "items-center": "align-items:center",
+    "items-baseline": "align-items:baseline",
+    "items-stretch": "align-items:stretch",
+    "justify-start": "justify-content:flex-start",
+    "justify-end": "justify-content:flex-end",
+    "justify-center": "justify-content:center",
+    "justify-between": "justify-content:space-between",
+    "justify-around": "justify-content:space-around",
+    "overflow-auto": "overflow:auto",
+    "overflow-hidden": "overflow:hidden",
+    "overflow-x-auto": "overflow-x:auto",
+    "overflow-y-auto": "overflow-y:auto",
+    "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+    "whitespace-nowrap": "white-space:nowrap",
+    "whitespace-pre": "white-space:pre",
+    "whitespace-pre-wrap": "white-space:pre-wrap",
+    "break-all": "word-break:break-all",
+    "break-words": "overflow-wrap:break-word",
+    "text-left": "text-align:left",
+    "text-center": "text-align:center",
+    "text-right": "text-align:right",
+    "font-sans": "font-family:'Inter',ui-sans-serif,system-ui,sans-serif",
+    "font-mono": (
+        "font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"
+        '"Liberation Mono","Courier New",monospace'
+    ),
+    "uppercase": "text-transform:uppercase",
+    "lowercase": "text-transform:lowercase",
+    "capitalize": "text-transform:capitalize",
+    "italic": "font-style:italic",
+    "underline": "text-decoration-line:underline",
+    "no-underline": "text-decoration-line:none",
+    "tracking-tight": "letter-spacing:-0.025em",
+    "tracking-normal": "letter-spacing:0em",
+    "tracking-wide": "letter-spacing:0.025em",
+    "tracking-wider": "letter-spacing:0.05em",
+    "tracking-widest": "letter-spacing:0.1em",
+    "leading-none": "line-height:1",
+    "leading-tight": "line-height:1.25",
+    "leading-snug": "line-height:1.375",
+    "leading-normal": "line-height:1.5",
+    "leading-relaxed": "line-height:1.625",
+    "bg-gradient-to-r": "background-image:linear-gradient(to right,var(--tw-gradient-stops))",
+    "bg-gradient-to-b": "background-image:linear-gradient(to bottom,var(--tw-gradient-stops))",
+    "bg-gradient-to-br": (
+        "background-image:linear-gradient(to bottom right,var(--tw-gradient-stops))"
+    ),
+    "outline-none": "outline:2px solid transparent;outline-offset:2px",
+    "cursor-pointer": "cursor:pointer",
+    "cursor-not-allowed": "cursor:not-allowed",
+    "select-none": "user-select:none",
+    "select-all": "user-select:all",
+    "pointer-events-none": "pointer-events:none",
+    "resize-none": "resize:none",
+    "list-disc": "list-style-type:disc",
+    "sr-only": (
+        "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;"
+        "clip:rect(0,0,0,0);white-space:nowrap;border-width:0"
+    ),
+    "transition": (
+        "transition-property:color,background-color,border-color,text-decoration-color,"
+        "fill,stroke,opacity,box-shadow,transform,filter,backdrop-filter;" + _TRANSITION
+    ),
+    "transition-colors": (
+        "transition-property:color,background-color,border-color,text-decoration-color,"
+        "fill,stroke;" + _TRANSITION
+    ),
+    "transition-all": "transition-property:all;" + _TRANSITION,
+}
+
+# Property groups, each listed from general to specific so later rules win (p-4 pt-2)
+_SPACING_PROPERTIES = {
+    "m": ("margin",),
+    "mx": ("margin-left", "margin-right"),
+    "my": ("margin-top", "margin-bottom"),
+    "mt": ("margin-top",),
+    "mr": ("margin-right",),
+    "mb": ("margin-bottom",),
+    "ml": ("margin-left",),
+    "p": ("padding",),
+    "px": ("padding-left", "padding-right"),
+    "py": ("padding-top", "padding-bottom"),
+    "pt": ("padding-top",),
+    "pr": ("padding-right",),
+    "pb": ("padding-bottom",),
+    "pl": ("padding-left",),
+}
+_INSET_PROPERTIES = {
+    "inset": ("inset",),
+    "inset-x": ("left", "right"),
+    "inset-y": ("top", "bottom"),
+    "top": ("top",),
+    "right": ("right",),
+    "bottom": ("bottom",),
+    "left": ("left",),
+}
+_SIZE_PROPERTIES = {
+    "w": "width",
+    "min-w": "min-width",
+    "h": "height",
+    "min-h": "min-height",
+    "max-h": "max-height",
+}
+_BORDER_SIDES = {
+    "": ("border-width",),
+    "x": ("border-left-width", "border-right-width"),
+    "y": ("border-top-width", "border-bottom-width"),
+    "t": ("border-top-width",),
+    "r": ("border-right-width",),
+    "b": ("border-bottom-width",),
+    "l": ("border-left-width",),
+}
+# Leading words of the utilities above, for spotting template classes that got no CSS
+_FAMILIES = {
+    "m",
+    "mx",
+    "my",
+    "mt",
+    "mr",
+    "mb",
+    "ml",
+    "p",
+    "px",
+    "py",
+    "pt",
+    "pr",
+    "pb",
+    "pl",
+    "w",
+    "h",
+    "min",
+    "max",
+    "inset",
+    "top",
+    "right",
+    "bottom",
+    "left",
+    "translate",
+    "z",
+    "grid",
+    "col",
+    "gap",
+    "space",
+    "divide",
+    "border",
+    "rounded",
+    "shadow",
+    "ring",
+    "opacity",
+    "text",
+    "font",
+    "bg",
+    "from",
+    "via",
+    "to",
+    "placeholder",
+    "flex",
+    "items",
+    "justify",
+    "overflow",
+    "leading",
+    "tracking",
+    "whitespace",
+    "cursor",
+    "transition",
+}
+
+
+def _rgb(hex_color: str) -> str:
+    return " ".join(str(int(hex_color[i : i + 2], 16)) for i in (1, 3, 5))
+
+
+def _color(name: str) -> str | None:
+    """CSS color for ``gray-500``, ``white/80``, ``[#123456]`` and the like."""
+    name, _, alpha = name.partition("/")
+    if alpha and not alpha.isdigit():
+        return None
+    if name in ("transparent", "current", "inherit"):
+        return None if alpha else {"current": "currentColor"}.get(name, name)
+    if name == "white":
+        channels = "255 255 255"
+    elif name == "black":
+        channels = "0 0 0"
+    else:
+        family, _, shade = name.rpartition("-")
+        if family not in _PALETTE or not shade.isdigit() or int(shade) not in _PALETTE[family]:
+            return None
+        channels = _rgb(_PALETTE[family][int(shade)])
+    if alpha:
+        return f"rgb({channels} / {int(alpha) / 100:g})"
+    return f"rgb({channels})"
+
+
+def _length(value: str, negative: bool = False) -> str | None:
+    """The spacing scale: ``4`` is 1rem, plus ``px``, fractions, ``full``, ``auto``, ``[…]``."""
+    if value.startswith("[") and value.endswith("]") and len(value) > 2:
+        length = value[1:-1].replace("_", " ")
+    elif value == "px":
+        length = "1px"
+    elif value == "0":
+        length = "0px"
+    elif value == "auto":
+        length = "auto"
+    elif value == "full":
+        length = "100%"
+    elif re.fullmatch(r"\d+/\d+", value):
+        numerator, denominator = (int(part) for part in value.split("/"))
+        if not denominator:
+            return None
+        length = f"{numerator / denominator * 100:g}%"
+    elif re.fullmatch(r"\d+(\.5)?", value):
+        length = f"{float(value) / 4:g}rem"
+    else:
+        return None
+    if negative:
+        if length in ("auto", "0px"):
+            return None if length == "auto" else length
+        return f"calc({length} * -1)" if length.startswith("calc") else f"-{length}"
+    return length
+
+
+def _shadow(size: str) -> str:
+    colored = re.sub(r"rgb\([^)]*\)", "var(--tw-shadow-color)", _SHADOWS[size])
+    return (
+        f"--tw-shadow:{_SHADOWS[size]};--tw-shadow-colored:{colored};"
+        "box-shadow:var(--tw-ring-offset-shadow,0 0 #0000),var(--tw-ring-shadow,0 0 #0000),"
+        "var(--tw-shadow)"
+    )
+
+
+def utility(name: str) -> tuple[int, str, str] | None:
+    """``(order, declarations, selector suffix)`` for one utility, without variants.
+
+    ``order`` sorts the rules so that, as in Tailwind, the more specific of two
+    utilities for the same property comes later and wins (``p-4 pt-2``,
+    ``shadow-lg shadow-brand-200``, ``text-sm leading-tight``).
+    """
+    if name in _STATIC:
+        order = 300 if name.startswith(("leading-", "tracking-")) else 100
+        return order, _STATIC[name], ""
+
+    negative = name.startswith("-")
+    body = name[1:] if negative else name
+
+    if match := re.fullmatch(r"(m[xytrbl]?|p[xytrbl]?)-(.+)", body):
+        prefix, value = match.groups()
+        if negative and prefix.startswith("p"):
+            return None
+        length = _length(value, negative)
+        if length is None:
+            return None
+        properties = _SPACING_PROPERTIES[prefix]
+        order = 200 + list(_SPACING_PROPERTIES).index(prefix)
+        return order, ";".join(f"{prop}:{length}" for prop in properties), ""
+
+    if match := re.fullmatch(r"(inset-[xy]|inset|top|right|bottom|left)-(.+)", body):
+        prefix, value = match.groups()
+        length = _length(value, negative)
+        if length is None:
+            return None
+        order = 110 + list(_INSET_PROPERTIES).index(prefix)
+        return order, ";".join(f"{prop}:{length}" for prop in _INSET_PROPERTIES[prefix]), ""
+
+    if match := re.fullmatch(r"translate-([xy])-(.+)", body):
+        axis, value = match.groups()
+        length = _length(value, negative)
+        if length is None or value == "auto":
+            return None
+        return 150, f"transform:translate{axis.upper()}({length})", ""
+
+    if negative:
+        return None
+
+    if match := re.fullmatch(r"z-(\d+)", body):
+        return 120, f"z-index:{match.group(1)}", ""
+
+    if match := re.fullmatch(r"(min-w|min-h|max-h|w|h)-(.+)", body):
+        prefix, value = match.groups()
+        if value == "screen":
+            length = "100vw" if prefix.endswith("w") else "100vh"
+        elif value in ("min", "max", "fit"):
+            length = f"{value}-content"
+        else:
+            length = _length(value)
+        if length is None:
+            return None
+        return 130, f"{_SIZE_PROPERTIES[prefix]}:{length}", ""
+
+    if match := re.fullmatch(r"max-w-(.+)", body):
+        value = match.group(1)
+        if value.startswith("["):
+            width = _length(value)
+        elif value == "screen-xl":
+            width = _SCREENS["xl"]
+        else:
+            width = _MAX_WIDTHS.get(value)
+        if width is None:
+            return None
+        return 131, f"max-width:{width}", ""
+
+    if match := re.fullmatch(r"grid-cols-(\d+)", body):
+        return 140, f"grid-template-columns:repeat({match.group(1)},minmax(0,1fr))", ""
+
+    if match := re.fullmatch(r"col-span-(\d+)", body):
+        span = match.group(1)
+        return 141, f"grid-column:span {span} / span {span}", ""
+
+    if match := re.fullmatch(r"gap(-[xy])?-(.+)", body):
+        axis, value = match.groups()
+        length = _length(value)
+        if length is None or value == "auto":
+            return None
+        prop = {None: "gap", "-x": "column-gap", "-y": "row-gap"}[axis]
+        return 142 + (axis is not None), f"{prop}:{length}", ""
+
+    if match := re.fullmatch(r"space-([xy])-(.+)", body):
+        axis, value = match.groups()
+        length = _length(value)
+        if length is None or value == "auto":
+            return None
+        prop = "margin-left" if axis == "x" else "margin-top"
+        return 145, f"{prop}:{length}", _CHILDREN
+
+    if match := re.fullmatch(r"divide-([xy])(?:-(\d+))?", body):
+        axis, width = match.groups()
+        width = f"{width or 1}px"
+        if axis == "y":
+            return 146, f"border-top-width:{width};border-bottom-width:0", _CHILDREN
+        return 146, f"border-left-width:{width};border-right-width:0", _CHILDREN
+
+    if match := re.fullmatch(r"border(?:-([trblxy]))?(?:-(\d+))?", body):
+        side, width = match.groups()
+        properties = _BORDER_SIDES[side or ""]
+        order = 160 + list(_BORDER_SIDES).index(side or "")
+        return order, ";".join(f"{prop}:{width or 1}px" for prop in properties), ""
+
+    if match := re.fullmatch(r"rounded(?:-(.+))?", body):
+        radius = _RADII.get(match.group(1) or "")
+        if radius is None:
+            return None
+        return 170, f"border-radius:{radius}", ""
+
+    if match := re.fullmatch(r"shadow(?:-(.+))?", body):
+        size = match.group(1) or ""
+        if size in _SHADOWS:
+            return 180, _shadow(size), ""
+        color = _color(size)
+        if color is None:
+            return None
+        return 181, f"--tw-shadow-color:{color};--tw-shadow:var(--tw-shadow-colored)", ""
+
+    if match := re.fullmatch(r"ring(?:-(\d+))?", body):
+        width = f"{match.group(1) or 3}px"
+        return (
+            182,
+            (
+                "--tw-ring-offset-shadow:0 0 0 0 #fff;"
+                f"--tw-ring-shadow:0 0 0 {width} var(--tw-ring-color);"
+                "box-shadow:var(--tw-ring-offset-shadow),var(--tw-ring-shadow),"
+                "var(--tw-shadow,0 0 #0000)"
+            ),
+            "",
+        )
+
+    if match := re.fullmatch(r"opacity-(\d+)", body):
+        return 190, f"opacity:{int(match.group(1)) / 100:g}", ""
+
+    if match := re.fullmatch(r"text-(.+)", body):
+        if match.group(1) in _FONT_SIZES:
+            size, line_height = _FONT_SIZES[match.group(1)]
+            return 250, f"font-size:{size};line-height:{line_height}", ""
+        color = _color(match.group(1))
+        return None if color is None else (260, f"color:{color}", "")
+
+    if match := re.fullmatch(r"font-(.+)", body):
+        weight = _FONT_WEIGHTS.get(match.group(1))
+        return None if weight is None else (255, f"font-weight:{weight}", "")
+
+    if match := re.fullmatch(r"(bg|border|divide|ring|placeholder|from|via|to)-(.+)", body):
+        kind, value = match.groups()
+        color = _color(value)
+        if color is None:
+            return None
+        if kind == "bg":
+            return 270, f"background-color:{color}", ""
+        if kind == "border":
+            return 271, f"border-color:{color}", ""
+        if kind == "divide":
+            return 272, f"border-color:{color}", _CHILDREN
+        if kind == "ring":
+            return 273, f"--tw-ring-color:{color}", ""
+        if kind == "placeholder":
+            return 274, f"color:{color}", "::placeholder"
+        transparent = re.sub(r"rgb\(([\d ]+)( / [\d.]+)?\)", r"rgb(\1 / 0)", color)
+        if kind == "from":
+            return (
+                275,
+                (
+                    f"--tw-gradient-from:{color};--tw-gradient-to:{transparent};"
+                    "--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)"
+                ),
+                "",
+            )
+        if kind == "via":
+            return (
+                276,
+                (
+                    f"--tw-gradient-to:{transparent};"
+                    f"--tw-gradient-stops:var(--tw-gradient-from),{color},var(--tw-gradient-to)"
+                ),
+                "",
+            )
+        return 277, f"--tw-gradient-to:{color}", ""
+
+    return None
+
+
+def _escape(class_name: str) -> str:
+    return re.sub(r"([^A-Za-z0-9_-])", r"\\\1", class_name)
+
+
+def rule(class_name: str) -> tuple[tuple, str] | None:
+    """``(sort key, CSS rule)`` for a class with its variants, or ``None`` if it isn't one."""
+    *variants, name = class_name.split(":")
+    resolved = utility(name)
+    if resolved is None:
+        return None
+    order, declarations, suffix = resolved
+    screen, pseudo, group = None, "", False
+    for variant in variants:
+        if variant in _SCREENS and screen is None:
+            screen = variant
+        elif variant in _PSEUDO and not pseudo:
+            pseudo = _PSEUDO[variant]
+        elif variant == "group-hover" and not group:
+            group = True
+        else:
+            return None
+    selector = f".{_escape(class_name)}{pseudo}{suffix}"
+    if group:
+        selector = f".group:hover {selector}"
+    pseudo_rank = list(_PSEUDO.values()).index(pseudo) + 1 if pseudo else 0
+    key = (list(_SCREENS).index(screen) + 1 if screen else 0, group, pseudo_rank, order, class_name)
+    return key, f"{selector}{{{declarations}}}"
+
+
+def candidates(text: str) -> set[str]:
+    """Every token in ``text`` that could be a class name."""
+    return {token.rstrip(".:") for token in re.findall(r"[\w:./\[\]%#-]+", text)}
+
+
+def utilities(class_names: set[str]) -> str:
+    rules = sorted(filter(None, (rule(name) for name in class_names)))
+    lines = []
+    screen = None
+    for (screen_rank, *_), css in rules:
+        if screen_rank != screen:
+            if screen:
+                lines.append("}")
+            screen = screen_rank
+            if screen_rank:
+                width = _SCREENS[list(_SCREENS)[screen_rank - 1]]
+                lines.append(f"@media (min-width:{width}){{")
+        lines.append(css)
+    if screen:
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _minify(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip() + "\n"
+
+
+def _template_text(templates_dir: Path) -> str:
+    return "\n".join(path.read_text() for path in sorted(templates_dir.glob("*.html")))
+
+
+def stylesheet(templates_dir: Path = TEMPLATES_DIR) -> str:
+    base = (STYLES_DIR / "base.css").read_text()
+    return _minify(base) + utilities(candidates(_template_text(templates_dir)))
+
+
+def unknown_classes(templates_dir: Path = TEMPLATES_DIR) -> list[str]:
+    """Utility-looking names in ``class`` attributes that the build has no CSS for."""
+    names = set()
+    for value in re.findall(r'class="([^"{]*)"', _template_text(templates_dir)):
+        names.update(value.split())
+    return sorted(
+        name
+        for name in names
+        if rule(name) is None and (":" in name or name.lstrip("-").split("-")[0] in _FAMILIES)
+    )
+
+
+def build(templates_dir: Path = TEMPLATES_DIR, out_dir: Path = STATIC_DIR) -> dict[str, str]:
+    """Write the hashed bundle, its ``.gz`` sibling and the manifest; returns the manifest."""
+    css = stylesheet(templates_dir).encode()
+    name = f"app.{hashlib.sha256(css).hexdigest()[:12]}.css"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / name).write_bytes(css)
+    # mtime=0 keeps the .gz byte-for-byte reproducible
+    (out_dir / f"{name}.gz").write_bytes(gzip.compress(css, compresslevel=9, mtime=0))
+    for stale in out_dir.glob("app.*.css*"):
+        if stale.name not in (name, f"{name}.gz"):
+            stale.unlink()
+    manifest = {"app.css": name}
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def _stale(path: Path) -> bool:
+    if not path.exists():
+        return True
+    built = path.stat().st_mtime
+    sources = [*TEMPLATES_DIR.glob("*.html"), STYLES_DIR / "base.css", Path(__file__)]
+    return any(source.stat().st_mtime > built for source in sources)
+
+
+@lru_cache(maxsize=1)
+def manifest() -> dict[str, str]:
+    path = STATIC_DIR / MANIFEST
+    if _stale(path):
+        logger.warning(
+            f"Stylesheet bundle in {STATIC_DIR} is missing or older than the templates; "
+            "building it now. Run `python -m app.assets build` at build time instead."
+        )
+        try:
+            return build()
+        except OSError as exc:
+            if not path.exists():
+                raise
+            logger.warning(f"Could not rebuild the stylesheet bundle, serving the old one: {exc}")
+    return json.loads(path.read_text())
+
+
+def asset_url(name: str) -> str:
+    """URL of a built asset, by its unhashed name (a Jinja global)."""
+    return f"/static/{manifest()[name]}"
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles serving precompressed ``.gz`` siblings, and hashed names as immutable."""
+
+    def file_response(
+        self,
+        full_path: os.PathLike | str,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        compressed = f"{full_path}.gz"
+        headers = {"Vary": "Accept-Encoding"} if os.path.isfile(compressed) else {}
+        accept_encoding = request_headers.get("accept-encoding", "")
+        if headers and negotiate(accept_encoding, brotli_available=False) == "gzip":
+            response = FileResponse(
+                compressed,
+                status_code=status_code,
+                stat_result=os.stat(compressed),
+                media_type=guess_type(str(full_path))[0],
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+        else:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result, headers=headers
+            )
+        if _HASHED.fullmatch(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = IMMUTABLE
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the dashboard stylesheet bundle")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--out", type=Path, default=STATIC_DIR, help="Default: app/static")
+    args = parser.parse_args()
+
+    built = build(out_dir=args.out)
+    css = (args.out / built["app.css"]).stat().st_size
+    compressed = (args.out / f"{built['app.css']}.gz").stat().st_size
+    print(f"{args.out / built['app.css']}: {css} bytes, {compressed} gzipped")
+    for name in unknown_classes():
+        print(f"warning: no CSS for class {name!r}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
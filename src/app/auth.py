@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from fastapi import Depends, HTTPException, Request, status
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,15 +9,23 @@ from app.config import settings
 from app.database import get_db
 from app.models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose (via cryptography) and passlib/bcrypt are imported on first use rather
+# than at startup; most requests never hash a password.
+
+
+@lru_cache(maxsize=1)
+def _pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -27,10 +34,14 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
     to_encode.update({"exp": expire})
+    from jose import jwt
+
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
 async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)) -> User:
+    from jose import JWTError, jwt
+
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(
@@ -62,6 +73,8 @@ async def get_current_user(request: Request, db: AsyncSession = Depends(get_db))
 
 
 async def get_optional_user(request: Request, db: AsyncSession = Depends(get_db)) -> User | None:
+    from jose import JWTError, jwt
+
     token = request.cookies.get("access_token")
     if not token:
         return None
@@ -75,3 +88,14 @@ async def get_optional_user(request: Request, db: AsyncSession = Depends(get_db)
         return None
     result = await db.execute(select(User).where(User.id == user_id, User.is_active == True))
     return result.scalar_one_or_none()
+
+
+async def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    """Allow only the deployment owner accounts listed in FORMFORGE_ADMIN_EMAILS."""
+    admins = {e.strip().lower() for e in settings.admin_emails.split(",") if e.strip()}
+    if user.email.lower() not in admins:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return user
@@ -0,0 +1,100 @@
+"""Size limits on public submission bodies.
+
+Four limits, each configurable worker-wide (``FORMFORGE_MAX_BODY_BYTES``,
+``FORMFORGE_MAX_FIELDS``, ``FORMFORGE_MAX_FIELD_LENGTH``,
+``FORMFORGE_MAX_NESTING_DEPTH``; 0 disables one) and per form through the
+columns of the same name. A form can tighten the worker-wide limits but not
+raise them.
+
+The byte limit is enforced while the body streams in: a ``Content-Length``
+over the limit is refused before anything is read, and a chunked body is
+abandoned at the first chunk that crosses it. The body therefore never holds
+more than the limit in memory, which also bounds the parse. Field count,
+field length and nesting depth are checked on the parsed data. Every refusal
+is a ``413``.
+"""
+
+from collections.abc import AsyncIterator
+from typing import NamedTuple
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.models import Form
+
+
+class BodyLimits(NamedTuple):
+    max_body_bytes: int
+    max_fields: int
+    max_field_length: int
+    max_nesting_depth: int
+
+
+def _tightest(configured: int, override: int | None) -> int:
+    if not override:
+        return configured
+    return min(configured, override) if configured else override
+
+
+def limits_for(form: Form) -> BodyLimits:
+    """The limits for one form: the worker-wide ones, tightened by the form's own."""
+    return BodyLimits(
+        *(_tightest(getattr(settings, name), getattr(form, name)) for name in BodyLimits._fields)
+    )
+
+
+def _too_large(detail: str) -> HTTPException:
+    # A literal: Starlette's name for 413 changed, and the new one is missing from the
+    # versions that fastapi>=0.115 allows
+    return HTTPException(status_code=413, detail=detail)
+
+
+async def read_body(
+    chunks: AsyncIterator[bytes], limits: BodyLimits, content_length: str | None
+) -> bytes:
+    """Collect the body, giving up with 413 as soon as it exceeds the byte limit."""
+    limit = limits.max_body_bytes
+    too_large = f"Request body exceeds {limit} bytes"
+    if limit and content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _too_large(too_large)
+
+    received = 0
+    parts = []
+    async for chunk in chunks:
+        received += len(chunk)
+        if limit and received > limit:
+            raise _too_large(too_large)
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+def check_data(data, limits: BodyLimits) -> None:
+    """Field count, field length and nesting depth of a parsed body; 413 when over."""
+    if isinstance(data, dict) and limits.max_fields and len(data) > limits.max_fields:
+        raise _too_large(f"Too many fields (limit {limits.max_fields})")
+
+    max_length, max_depth = limits.max_field_length, limits.max_nesting_depth
+    if not max_length and not max_depth:
+        return
+    # Iterative, so deeply nested JSON cannot exhaust the stack here
+    stack = [(data, 1)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, str):
+            if max_length and len(value) > max_length:
+                raise _too_large(f"Field exceeds {max_length} characters")
+        elif isinstance(value, (dict, list)):
+            if max_depth and depth > max_depth:
+                raise _too_large(f"Data is nested deeper than {max_depth} levels")
+            if isinstance(value, dict):
+                stack.extend((key, depth) for key in value)
+                stack.extend((item, depth + 1) for item in value.values())
+            else:
+                stack.extend((item, depth + 1) for item in value)
+
+
+def nesting_error(limits: BodyLimits) -> HTTPException:
+    """413 for JSON too deep for the parser itself (it raised RecursionError)."""
+    if limits.max_nesting_depth:
+        return _too_large(f"Data is nested deeper than {limits.max_nesting_depth} levels")
+    return _too_large("Data is nested too deeply")
@@ -0,0 +1,184 @@
+"""Optional transparent compression of ``Submission.data``.
+
+Plain rows stay JSON text. Compressed rows are BLOBs that start with a NUL
+marker byte, which JSON text never does, followed by the format:
+
+    b"\\x00z" + zlib stream
+    b"\\x00d" + 4-byte dictionary id + zlib stream using that preset dictionary
+
+Dictionaries are trained per form from its own submissions (they share keys
+and boilerplate) and stored in ``compression_dictionaries`` under a content
+hash, next to the rows that need them, so a database backup is complete on
+its own. Each worker caches them in memory. While compression is on, rows are
+decoded inside SQLite by ``ff_data`` (see ``app.database``), which fetches a
+dictionary this worker has not seen yet from the same database.
+"""
+
+import hashlib
+import re
+import zlib
+from collections import Counter
+from collections.abc import Callable
+
+from sqlalchemy import Text, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeDecorator
+
+from app.config import settings
+
+_MARKER = 0
+_PLAIN_ZLIB = b"\x00z"
+_DICT_ZLIB = b"\x00d"
+_DICT_ID_LEN = 4
+
+# zlib only looks back 32 KiB, so a larger dictionary is wasted
+_MAX_DICT_BYTES = 32 * 1024
+_MAX_COMMON_BYTES = 4 * 1024
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"\s*:\s*|"(?:[^"\\]|\\.)*"|[^",{}\[\]:\s][^",{}\[\]:]*')
+
+
+# Rows keep the dictionary they were written with, so old ones stay needed after
+# retraining; each is at most _MAX_DICT_BYTES
+_dictionaries: dict[str, bytes] = {}
+
+
+def load_dictionary(dict_id: str, fetch: Callable[[str], bytes | None] | None = None) -> bytes:
+    zdict = _dictionaries.get(dict_id)
+    if zdict is None:
+        zdict = fetch(dict_id) if fetch else None
+        if zdict is None:
+            raise LookupError(f"Unknown compression dictionary {dict_id!r}")
+        _dictionaries[dict_id] = zdict
+    return zdict
+
+
+def remember_dictionary(zdict: bytes) -> str:
+    """Cache ``zdict`` in this worker and return its id."""
+    dict_id = hashlib.sha256(zdict).hexdigest()[: _DICT_ID_LEN * 2]
+    _dictionaries[dict_id] = zdict
+    return dict_id
+
+
+def forget_dictionaries() -> None:
+    _dictionaries.clear()
+
+
+async def save_dictionary(db: AsyncSession, zdict: bytes) -> str:
+    # Imported here: app.models imports this module for SubmissionData
+    from app.models import CompressionDictionary
+
+    dict_id = remember_dictionary(zdict)
+    if await db.get(CompressionDictionary, dict_id) is None:
+        db.add(CompressionDictionary(id=dict_id, data=zdict))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Same content saved concurrently; the id is a hash, so it is the same row
+            await db.rollback()
+    return dict_id
+
+
+async def ensure_dictionary(db: AsyncSession, dict_id: str | None) -> None:
+    """Have ``dict_id`` cached before ``compress_data`` needs it."""
+    if not dict_id or dict_id in _dictionaries or settings.submission_compression != "zlib":
+        return
+    from app.models import CompressionDictionary
+
+    zdict = await db.scalar(
+        select(CompressionDictionary.data).where(CompressionDictionary.id == dict_id)
+    )
+    if zdict is not None:
+        _dictionaries[dict_id] = zdict
+
+
+def train_dictionary(samples: list[str]) -> bytes:
+    """Build a zlib preset dictionary from a form's recent submissions.
+
+    The bulk of the dictionary is raw sample text, which lets zlib match whole
+    runs of keys and boilerplate; fragments seen in many samples go last, since
+    zlib finds matches closest to the data most cheaply.
+    """
+    counts: Counter[str] = Counter()
+    for sample in samples:
+        counts.update(set(_TOKEN_RE.findall(sample)))
+    common = b"".join(
+        fragment.encode() for fragment, count in reversed(counts.most_common(256)) if count > 1
+    )[-_MAX_COMMON_BYTES:]
+    body = b"".join(sample.encode() for sample in samples)
+    return (body[-(_MAX_DICT_BYTES - len(common)) :] + common) if samples else b""
+
+
+def compress_data(text: str, dict_id: str | None = None) -> str | bytes:
+    """Encode a submission's JSON text for storage according to current settings.
+
+    A ``dict_id`` must already be cached, by ``save_dictionary`` or ``ensure_dictionary``.
+    """
+    if settings.submission_compression != "zlib":
+        return text
+    raw = text.encode()
+    if len(raw) < settings.compression_min_bytes:
+        return text
+    if dict_id:
+        compressor = zlib.compressobj(settings.compression_level, zdict=load_dictionary(dict_id))
+        header = _DICT_ZLIB + bytes.fromhex(dict_id)
+    else:
+        compressor = zlib.compressobj(settings.compression_level)
+        header = _PLAIN_ZLIB
+    blob = header + compressor.compress(raw) + compressor.flush()
+    return blob if len(blob) < len(raw) else text
+
+
+def decompress_data(
+    value: str | bytes | None, fetch: Callable[[str], bytes | None] | None = None
+) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    if not value or value[0] != _MARKER:
+        return value.decode()
+    header = value[:2]
+    if header == _PLAIN_ZLIB:
+        return zlib.decompress(value[2:]).decode()
+    if header == _DICT_ZLIB:
+        dict_id = value[2 : 2 + _DICT_ID_LEN].hex()
+        decompressor = zlib.decompressobj(zdict=load_dictionary(dict_id, fetch))
+        payload = value[2 + _DICT_ID_LEN :]
+        return (decompressor.decompress(payload) + decompressor.flush()).decode()
+    raise ValueError(f"Unknown submission data format {header!r}")
+
+
+class SubmissionData(TypeDecorator):
+    """Text column that may also hold compressed BLOBs; always reads back as JSON text.
+
+    Values are written as given: callers pick the encoding with ``compress_data``
+    because only they know the form's dictionary. With compression on, selected
+    values are decoded by ``ff_data`` in SQLite, which can look up dictionaries
+    this worker lacks; with it off, plain JSON text is selected as is.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    @property
+    def _static_cache_key(self):
+        # column_expression depends on the setting, so compiled statements must too
+        return (*super()._static_cache_key, settings.submission_compression)
+
+    def column_expression(self, column):
+        if settings.submission_compression == "none":
+            return column
+        return func.ff_data(column, type_=Text)
+
+    def process_bind_param(self, value, dialect):
+        return value
+
+    def process_result_value(self, value, dialect):
+        # ff_data already returns text; a BLOB here is a leftover read with compression off
+        return decompress_data(value) if isinstance(value, bytes) else value
+
+
+def data_contains(column, term: str):
+    """Substring match on submission data that also sees inside compressed rows."""
+    if settings.submission_compression == "none":
+        return column.contains(term)
+    return func.ff_data(column).contains(term)
@@ -0,0 +1,116 @@
+"""Conditional GETs (ETag, Last-Modified, 304) for dashboard pages and the forms API.
+
+A listing changes only when a form row changes or when the form's submissions
+change. The validators for a response therefore cover:
+
+- each form's ``updated_at``, which is bumped on every ORM update and touched
+  by imports, retention and spam restores;
+- each form's ``SubmissionStats``: hot and archived counts, plus the newest
+  submission's id and time;
+- whatever else the response depends on, such as the user and the query
+  parameters.
+
+The stats come from one grouped query that reads only the
+``(form_id, created_at)`` index. For page 1 of a hot form they come from the
+recent-submissions cache, with no query at all. Handlers check the request
+against the validators before they run the page queries or render a template.
+
+ETags are weak, so they stay valid whatever ``Content-Encoding`` a response is
+sent with. Responses carry ``Cache-Control: private, no-cache``, so browsers
+revalidate on every view instead of guessing freshness from Last-Modified.
+"""
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive import archived_counts
+from app.config import settings
+from app.models import Form, Submission
+from app.recent import SubmissionStats
+
+_NO_SUBMISSIONS = SubmissionStats(0, 0, None, None)
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.replace(tzinfo=UTC, microsecond=0), usegmt=True
+            )
+        return headers
+
+
+async def submission_stats(db: AsyncSession, form_ids: list[int]) -> dict[int, SubmissionStats]:
+    if not form_ids:
+        return {}
+    result = await db.execute(
+        select(
+            Submission.form_id,
+            func.count(Submission.id),
+            func.max(Submission.id),
+            func.max(Submission.created_at),
+        )
+        .where(Submission.form_id.in_(form_ids))
+        .group_by(Submission.form_id)
+    )
+    archived = await archived_counts(db, form_ids)
+    stats = {
+        form_id: _NO_SUBMISSIONS._replace(archived=archived.get(form_id, 0)) for form_id in form_ids
+    }
+    for form_id, count, last_id, last_created in result.all():
+        stats[form_id] = stats[form_id]._replace(
+            hot=count, last_id=last_id, last_created=last_created
+        )
+    return stats
+
+
+def validators(key: tuple, forms: list[Form], stats: dict[int, SubmissionStats]) -> Validators:
+    """Validators for a response built from ``forms``; ``key`` is everything else it shows."""
+    digest = hashlib.sha256(repr((settings.app_version, key)).encode())
+    last_modified = None
+    for form in forms:
+        form_stats = stats.get(form.id, _NO_SUBMISSIONS)
+        changed = form.updated_at or form.created_at
+        digest.update(repr((form.id, changed, tuple(form_stats))).encode())
+        for moment in (changed, form_stats.last_created):
+            if moment is not None and (last_modified is None or moment > last_modified):
+                last_modified = moment
+    return Validators(f'W/"{digest.hexdigest()[:32]}"', last_modified)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag.removeprefix("W/")
+
+
+def not_modified(request: Request, current: Validators) -> Response | None:
+    """A 304 response if the client's copy is current, else ``None``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110 13.1.3)
+        tags = {_opaque(tag) for tag in if_none_match.split(",")}
+        fresh = "*" in tags or _opaque(current.etag) in tags
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or current.last_modified is None:
+            return None
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        fresh = current.last_modified.replace(tzinfo=UTC, microsecond=0) <= since
+    if not fresh:
+        return None
+    return Response(status_code=304, headers=current.headers())
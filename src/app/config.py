@@ -5,9 +5,13 @@ class Settings(BaseSettings):
     app_name: str = "FormForge"
     app_version: str = "0.1.0"
     debug: bool = False
+    # What this process serves: "all", "ingest" (public /f/ endpoints only) or "dashboard"
+    role: str = "all"
 
     # Database
     database_url: str = "sqlite+aiosqlite:///./formforge.db"
+    # Apply pending Alembic migrations on startup; when off, a stale schema refuses to boot
+    auto_migrate: bool = True
 
     # Auth
     secret_key: str = "change-me-in-production"
@@ -22,9 +26,129 @@ class Settings(BaseSettings):
     smtp_from_email: str = "noreply@formforge.dev"
     smtp_use_tls: bool = True
 
+    # Serve /f/{uuid} from the raw ASGI handler in app.routers.fast_submit
+    fast_ingest: bool = True
+
+    # Admission control on /f/{uuid}: submissions processed at once per worker and per form.
+    # Over the cap a request gets 503 + Retry-After instead of queueing. 0 disables a cap.
+    max_inflight_submissions: int = 128
+    max_inflight_per_form: int = 64
+    admission_retry_after: int = 1  # seconds
+    # Shrink the worker cap while the average commit takes longer than the target
+    admission_adaptive: bool = False
+    admission_target_commit_ms: float = 50
+
+    # Limits on /f/{uuid} request bodies, enforced while the body streams in; over a
+    # limit the request gets 413. Forms can tighten these per form. 0 disables a limit.
+    max_body_bytes: int = 1024 * 1024
+    max_fields: int = 1000
+    max_field_length: int = 100_000  # characters, per value or key
+    max_nesting_depth: int = 32
+
+    # Bulk ingestion (POST /api/forms/{id}/submissions/bulk): rows per INSERT/commit,
+    # and per-request caps on items and bytes
+    bulk_chunk_size: int = 500
+    bulk_max_items: int = 10_000
+    bulk_max_body_bytes: int = 32 * 1024 * 1024
+
+    # CSV/NDJSON imports (app.importer): records per multi-row INSERT and progress commit
+    import_batch_size: int = 2000
+
+    # Webhooks (app.webhooks). Deliveries run in the background on the worker that took
+    # the submission; events are dropped rather than queued past these bounds.
+    webhook_queue_size: int = 10_000  # submissions waiting to be routed, per worker
+    webhook_max_pending: int = 1000  # per endpoint, while it is slow or its circuit is open
+    webhook_concurrency: int = 16  # POSTs in flight at once, per worker
+    webhook_timeout: float = 10.0  # seconds
+    webhook_http2: bool = False  # needs the h2 package (pip install "httpx[http2]")
+    webhook_max_attempts: int = 5
+    webhook_backoff_base: float = 0.5  # seconds, doubled per retry, with jitter
+    webhook_backoff_max: float = 30.0
+    # Consecutive failures that open an endpoint's circuit, and how long it stays open
+    webhook_breaker_threshold: int = 5
+    webhook_breaker_cooldown: float = 30.0
+    # Allow webhook URLs on loopback, private and link-local addresses (self-hosted setups)
+    webhook_allow_private: bool = False
+
+    # Live submission streams (SSE, app.live): events buffered per stream before a slow
+    # one is dropped, open streams per worker, keepalive comment interval and how long a
+    # stream lasts before the browser is made to reconnect (so shutdown never waits long)
+    live_buffer_size: int = 100
+    live_max_subscribers: int = 1000
+    live_keepalive_seconds: float = 15.0
+    live_stream_seconds: float = 300.0
+
+    # Recent-submissions cache (app.recent): newest rows kept per recently viewed form to
+    # serve page 1 without queries, the memory cap across forms, and how long an entry is
+    # trusted (bounds staleness from other workers; 0 disables the cache)
+    recent_cache_rows: int = 50
+    recent_cache_bytes: int = 16 * 1024 * 1024
+    recent_cache_ttl_seconds: float = 5.0
+
     # Rate limiting
     submissions_per_minute: int = 10
 
+    # Idempotency-Key / duplicate suppression
+    idempotency_cache_size: int = 10000
+
+    # Spam quarantine
+    spam_quarantine_max_rows: int = 1000  # per form
+    spam_sample_rate: float = 1.0  # fraction of honeypot hits that are kept
+
+    # Retention (scheduled purge of old submissions). Forms opt in with their own limits;
+    # plans have none unless set here as JSON, e.g. {"free": {"retention_days": 90}}
+    # (fields: retention_days, retention_max_rows, spam_retention_days)
+    retention_enabled: bool = True
+    retention_plan_limits: dict[str, dict[str, int]] = {}
+    retention_interval_minutes: int = 60
+    retention_chunk_size: int = 500
+    retention_chunk_pause_ms: int = 50
+    retention_vacuum_pages: int = 2000
+
+    # Submission data compression: "none" or "zlib"
+    submission_compression: str = "none"
+    compression_level: int = 6
+    compression_min_bytes: int = 128
+
+    # HTTP response compression: gzip, or brotli when the brotli package is installed
+    response_compression: bool = True
+    response_compression_min_bytes: int = 1024
+    response_compression_gzip_level: int = 6  # 1 (fastest) .. 9 (smallest)
+    response_compression_brotli_quality: int = 4  # 0 (fastest) .. 11 (smallest)
+
+    # Cold storage: submissions older than this many days move to gzip segment files (0 = off)
+    archive_after_days: int = 0
+    archive_dir: str = "./archive"
+    archive_batch_size: int = 1000
+    archive_interval_minutes: int = 60
+
+    # Retention and archive jobs run in one process at a time: the holder of a lease row in
+    # the database, renewed every third of this; a holder that stops is replaced after it
+    scheduler_lease_seconds: int = 60
+
+    # Per-request SQL accounting: Server-Timing header and N+1 warnings (0 = no warnings)
+    server_timing: bool = True
+    query_count_warn_threshold: int = 20
+
+    # Slow-query log (0 = off)
+    slow_query_ms: float = 200
+    slow_query_log_file: str = "./logs/slow_queries.log"
+    slow_query_log_max_bytes: int = 10 * 1024 * 1024
+    slow_query_log_backups: int = 5
+
+    # Opt-in cProfile middleware; requests are profiled when they carry a signed
+    # X-FormForge-Profile token (python -m app.profiling) or are sampled
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_token_max_age: int = 3600
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 50
+
+    # Comma-separated emails of accounts allowed to use the /api/admin endpoints
+    admin_emails: str = ""
+    # Bearer token /metrics requires when set; ingest replicas only serve /metrics then
+    metrics_token: str = ""
+
     # Base URL for generating form endpoint URLs
     base_url: str = "http://localhost:8000"
 
@@ -1,16 +1,112 @@
+import asyncio
+import sqlite3
+import time
+from contextlib import closing
+from functools import partial
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from app.compression import decompress_data
 from app.config import settings
+from app.metrics import db_query_duration, db_session_acquire
+from app.request_stats import record_query
+from app.slow_queries import record_slow_query
 
 engine = create_async_engine(settings.database_url, echo=settings.debug)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+@event.listens_for(Engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    if "sqlite" not in type(dbapi_connection).__module__:
+        return
+    # Only takes effect on a fresh database file; lets retention purges hand
+    # freed pages back with PRAGMA incremental_vacuum instead of a full VACUUM.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    cursor.execute("PRAGMA database_list")
+    path = next(row[2] for row in cursor.fetchall() if row[1] == "main")
+    cursor.close()
+    # Decodes submission data for reads and search (see SubmissionData)
+    fetch = partial(_read_dictionary, path)
+    dbapi_connection.create_function(
+        "ff_data", 1, partial(decompress_data, fetch=fetch), deterministic=True
+    )
+
+
+def _read_dictionary(path: str, dict_id: str) -> bytes | None:
+    """A compression dictionary this worker has not cached yet, read while decoding a row.
+
+    ``ff_data`` runs inside SQLite on the driver's thread, where the async session
+    cannot be used, so this opens a short read-only connection to the same file.
+    """
+    if not path:  # in-memory database
+        return None
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        row = conn.execute(
+            "SELECT data FROM compression_dictionaries WHERE id = ?", (dict_id,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+# The start time lives on the statement's execution context, which is dropped with
+# it: after_cursor_execute never runs for a statement that fails
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._ff_query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_ff_query_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    db_query_duration.observe(elapsed, statement.split(None, 1)[0].upper())
+    record_query(elapsed)
+    if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+        record_slow_query(conn.engine, statement, parameters, elapsed, executemany)
+
+
 class Base(DeclarativeBase):
     pass
 
 
 async def get_db() -> AsyncSession:
     async with async_session() as session:
+        start = time.perf_counter()
+        await session.connection()
+        db_session_acquire.observe(time.perf_counter() - start)
         yield session
+
+
+async def delete_chunked(db: AsyncSession, model, *criteria) -> int:
+    """Delete rows of ``model`` matching ``criteria`` in small id-ranged chunks.
+
+    Each chunk is its own transaction, followed by a short pause, so the SQLite
+    write lock is never held long enough to stall concurrent submissions.
+    """
+    chunk_size = settings.retention_chunk_size
+    pause = settings.retention_chunk_pause_ms / 1000
+    deleted = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(model.id)
+            .where(model.id > last_id, *criteria)
+            .order_by(model.id)
+            .limit(chunk_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+        await db.execute(delete(model).where(model.id >= ids[0], model.id <= ids[-1], *criteria))
+        await db.commit()
+        deleted += len(ids)
+        last_id = ids[-1]
+        await asyncio.sleep(pause)
+    return deleted
@@ -1,7 +1,9 @@
 import html
 import logging
+import time
 
 from app.config import settings
+from app.metrics import smtp_failures_total, smtp_send_duration
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +61,7 @@ async def send_submission_notification(
         msg.attach(MIMEText(text_body, "plain"))
         msg.attach(MIMEText(html_body, "html"))
 
+        start = time.perf_counter()
         await aiosmtplib.send(
             msg,
             hostname=settings.smtp_host,
@@ -67,7 +70,9 @@ async def send_submission_notification(
             password=settings.smtp_password or None,
             use_tls=settings.smtp_use_tls,
         )
+        smtp_send_duration.observe(time.perf_counter() - start)
         logger.info(f"Notification sent to {to_email} for form {form_name}")
 
     except Exception as e:
+        smtp_failures_total.inc()
         logger.error(f"Failed to send notification to {to_email}: {e}")
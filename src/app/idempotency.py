@@ -0,0 +1,93 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Form, Submission
+
+MAX_KEY_LENGTH = 255
+
+
+class RecentKeys:
+    """Bounded LRU of recently accepted keys, so replays skip the database.
+
+    Only a fast path: the unique index on ``(form_id, idempotency_key)`` remains
+    the source of truth across workers and restarts.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def seen_since(self, key: tuple, since: float) -> bool:
+        seen_at = self._entries.get(key)
+        if seen_at is None or seen_at < since:
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def add(self, key: tuple) -> None:
+        self._entries[key] = time.time()
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+recent_keys = RecentKeys(settings.idempotency_cache_size)
+
+
+def content_hash(data: dict) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def known_key(form: Form, idempotency_key: str | None) -> bool:
+    """Whether this worker already stored a submission under ``idempotency_key``."""
+    return bool(idempotency_key) and recent_keys.seen_since((form.id, "key", idempotency_key), 0)
+
+
+async def is_duplicate(
+    db: AsyncSession, form: Form, idempotency_key: str | None, digest: str
+) -> bool:
+    """Cheap pre-insert check. A replayed key that misses the in-memory cache is
+    caught by the unique index when the insert commits."""
+    if known_key(form, idempotency_key):
+        return True
+
+    if form.dedup_window_seconds:
+        window_start = time.time() - form.dedup_window_seconds
+        if recent_keys.seen_since((form.id, "hash", digest), window_start):
+            return True
+        since = datetime.now(UTC).replace(tzinfo=None) - timedelta(
+            seconds=form.dedup_window_seconds
+        )
+        result = await db.execute(
+            select(Submission.id)
+            .where(
+                Submission.form_id == form.id,
+                Submission.content_hash == digest,
+                Submission.created_at >= since,
+            )
+            .limit(1)
+        )
+        if result.first() is not None:
+            return True
+    return False
+
+
+def remember(form: Form, idempotency_key: str | None, digest: str) -> None:
+    if idempotency_key:
+        recent_keys.add((form.id, "key", idempotency_key))
+    if form.dedup_window_seconds:
+        recent_keys.add((form.id, "hash", digest))
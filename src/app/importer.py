@@ -0,0 +1,501 @@
+"""Import archives of submissions from CSV or NDJSON files.
+
+    python -m app.importer FORM_ID FILE [--format csv|ndjson] [--map COLUMN=FIELD ...]
+        [--drop COLUMN ...] [--timestamp-field COLUMN] [--batch-size N] [--resume JOB_ID]
+
+The same import runs behind ``POST /api/forms/{id}/imports`` (see
+``app.routers.imports``). The file is read as a stream of lines and
+committed ``FORMFORGE_IMPORT_BATCH_SIZE`` records at a time, so memory stays
+flat whatever its size. Each batch is one multi-row INSERT, committed together
+with the job's progress (``ImportJob.bytes_done``). Resuming a failed job with
+the same file skips everything before that offset, so no record is stored
+twice. Imports never send notification emails.
+
+CSV needs a header row; empty cells are left out. Columns are renamed with
+the mapping, or dropped when mapped to ``None``, and ``_`` fields are dropped
+as on ``/f/{uuid}``. The original submission time comes from
+``timestamp_field`` (ISO 8601 or Unix seconds/milliseconds), by default the
+first of ``TIMESTAMP_FIELDS`` present; without one the row is stamped now.
+Each record must pass the form's body limits (``app.body_limits``).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from collections.abc import AsyncIterator, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.body_limits import BodyLimits, check_data, limits_for
+from app.compression import compress_data, ensure_dictionary
+from app.config import settings
+from app.database import async_session
+from app.idempotency import content_hash
+from app.metrics import submissions_total
+from app.models import Form, ImportJob, Submission, utcnow
+from app.recent import recent
+
+FORMATS = ("csv", "ndjson")
+# Checked in order when no timestamp field is given; the first is FormForge's own CSV export
+TIMESTAMP_FIELDS = ("_submitted_at", "submitted_at", "created_at", "timestamp")
+# Rejected records kept on the job for the report
+MAX_REPORTED_ERRORS = 20
+
+_READ_SIZE = 64 * 1024
+
+
+class InvalidImport(Exception):
+    """The file cannot be imported at all (as opposed to one bad record)."""
+
+
+class ImportConflict(Exception):
+    """Another run of the same job committed progress first."""
+
+
+def clean_item(item, limits: BodyLimits) -> tuple[dict, str]:
+    """One submission's data without ``_`` fields, and its JSON text.
+
+    Raises TypeError or ValueError with the reason when the item cannot be stored.
+    """
+    if not isinstance(item, dict):
+        raise TypeError("Expected a JSON object")
+    data = {k: v for k, v in item.items() if not k.startswith("_")}
+    if not data:
+        raise ValueError("No form data received")
+    try:
+        check_data(data, limits)
+    except HTTPException as exc:
+        raise ValueError(exc.detail)
+    text = json.dumps(data)
+    if limits.max_body_bytes and len(text.encode()) > limits.max_body_bytes:
+        raise ValueError(f"Submission exceeds {limits.max_body_bytes} bytes")
+    return data, text
+
+
+async def insert_rows(
+    db: AsyncSession,
+    form: Form,
+    rows: list[tuple[dict, str]],
+    timestamps: list[datetime] | None = None,
+) -> list[int]:
+    """Add submissions with one multi-row INSERT (not committed); returns their ids in order."""
+    await ensure_dictionary(db, form.compression_dict)
+    values = [
+        {
+            "form_id": form.id,
+            "data": compress_data(text, form.compression_dict),
+            "content_hash": content_hash(data),
+        }
+        for data, text in rows
+    ]
+    if timestamps is not None:
+        for row, created_at in zip(values, timestamps):
+            row["created_at"] = created_at
+    # Asking SQLAlchemy to order RETURNING makes it fall back to a row per statement
+    # on SQLite; rowids are handed out in VALUES order, so sorting them is enough.
+    result = await db.execute(insert(Submission).returning(Submission.id), values)
+    return sorted(result.scalars().all())
+
+
+def parse_timestamp(value) -> datetime:
+    """ISO 8601 or Unix seconds/milliseconds, as naive UTC like ``created_at``."""
+    if isinstance(value, (int, float)) or (
+        isinstance(value, str) and value.strip().replace(".", "", 1).isdigit()
+    ):
+        seconds = float(value)
+        if seconds > 1e11:  # milliseconds
+            seconds /= 1000
+        return datetime.fromtimestamp(seconds, UTC).replace(tzinfo=None)
+    if not isinstance(value, str):
+        raise TypeError("Invalid timestamp")
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"Invalid timestamp {value[:40]!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+async def _lines(
+    chunks: AsyncIterator[bytes], max_line: int
+) -> AsyncIterator[tuple[bytes | None, int]]:
+    """Lines (with their newline) and the file offset just past each.
+
+    A line longer than ``max_line`` is not buffered; it comes out as ``None``.
+    """
+    buffer = b""
+    offset = 0
+    oversized = False
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line = buffer[start : end + 1]
+            start = end + 1
+            offset += len(line)
+            yield (None if oversized else line), offset
+            oversized = False
+        buffer = buffer[start:]
+        if max_line and len(buffer) > max_line:
+            # Drop what we have; the rest of the line is skipped up to its newline
+            oversized = True
+            offset += len(buffer)
+            buffer = b""
+    if oversized or buffer:
+        yield (None if oversized else buffer), offset + len(buffer)
+
+
+async def _records(
+    fmt: str, chunks: AsyncIterator[bytes], max_record: int, skip: int
+) -> AsyncIterator[tuple[dict | str | None, int]]:
+    """``(record, end offset)`` per record: a dict, an error message, or ``None``
+    for a record ending at or before ``skip`` (already imported, not parsed)."""
+    too_long = f"Record exceeds {max_record} bytes"
+    lines = _lines(chunks, max_record)
+    if fmt == "ndjson":
+        async for line, end in lines:
+            if end <= skip:
+                yield None, end
+            elif line is None:
+                yield too_long, end
+            elif line.strip():
+                try:
+                    yield json.loads(line), end
+                except (ValueError, RecursionError):
+                    yield "Invalid JSON", end
+        return
+
+    header = None
+    pending: list[bytes] = []
+    size = quotes = 0
+    async for line, end in lines:
+        if line is None:
+            pending, size, quotes = [], 0, 0
+            if header is None:
+                raise InvalidImport("CSV header row is too long")
+            yield (None if end <= skip else too_long), end
+            continue
+        pending.append(line)
+        size += len(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            # Inside a quoted field that spans lines
+            if max_record and size > max_record:
+                pending, size, quotes = [], 0, 0
+                yield (None if end <= skip else too_long), end
+            continue
+        raw, pending, size, quotes = b"".join(pending), [], 0, 0
+        if header is not None and end <= skip:
+            yield None, end
+            continue
+        try:
+            text = raw.decode("utf-8-sig" if header is None else "utf-8")
+        except UnicodeDecodeError:
+            if header is None:
+                raise InvalidImport("CSV header is not valid UTF-8")
+            yield "Invalid UTF-8", end
+            continue
+        row = next(csv.reader([text]), [])
+        if not row:
+            continue  # blank line
+        if header is None:
+            header = row
+            continue
+        if len(row) != len(header):
+            yield f"Expected {len(header)} columns, got {len(row)}", end
+            continue
+        yield {column: value for column, value in zip(header, row) if value != ""}, end
+    if header is None and skip == 0:
+        raise InvalidImport("CSV file has no header row")
+
+
+def _map_record(record: dict, mapping: dict, timestamp_field: str | None):
+    """Apply the column mapping; returns (data, original timestamp or None)."""
+    if timestamp_field is None:
+        timestamp_field = next((f for f in TIMESTAMP_FIELDS if f in record), None)
+    timestamp = None
+    if timestamp_field is not None and record.get(timestamp_field) not in (None, ""):
+        timestamp = parse_timestamp(record[timestamp_field])
+    data = {}
+    for key, value in record.items():
+        if key == timestamp_field:
+            continue
+        field = mapping.get(key, key)
+        if field is not None:
+            data[field] = value
+    return data, timestamp
+
+
+async def create_job(
+    db: AsyncSession,
+    form: Form,
+    source: str,
+    fmt: str,
+    mapping: dict | None = None,
+    timestamp_field: str | None = None,
+) -> ImportJob:
+    if fmt not in FORMATS:
+        raise InvalidImport(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    job = ImportJob(
+        form_id=form.id,
+        source=source[:255],
+        format=fmt,
+        mapping=json.dumps(mapping or {}),
+        timestamp_field=timestamp_field,
+        status="running",
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def run_import(
+    db: AsyncSession,
+    form: Form,
+    job: ImportJob,
+    chunks: AsyncIterator[bytes],
+    batch_size: int | None = None,
+    on_progress: Callable[[ImportJob], None] | None = None,
+) -> ImportJob:
+    """Import ``chunks`` (the whole file, from byte 0) into ``form``, resuming ``job``."""
+    batch_size = batch_size or settings.import_batch_size
+    job_id = job.id
+    limits = limits_for(form)
+    mapping = json.loads(job.mapping)
+    errors = json.loads(job.errors)
+    done = {
+        "bytes_done": job.bytes_done,
+        "records_done": job.records_done,
+        "imported": job.imported,
+        "rejected": job.rejected,
+    }
+    rows: list[tuple[dict, str]] = []
+    timestamps: list[datetime] = []
+    batch_records = batch_rejected = 0
+
+    async def commit_batch(end: int, status: str = "running") -> None:
+        nonlocal rows, timestamps, batch_records, batch_rejected
+        if rows:
+            await insert_rows(db, form, rows, timestamps)
+        # Conditional on the offset we started from: a second run of the same job
+        # that got here first makes this one stop instead of storing rows twice
+        progress = {
+            "bytes_done": end,
+            "records_done": done["records_done"] + batch_records,
+            "imported": done["imported"] + len(rows),
+            "rejected": done["rejected"] + batch_rejected,
+        }
+        result = await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.bytes_done == done["bytes_done"])
+            .values(
+                **progress,
+                errors=json.dumps(errors),
+                status=status,
+                updated_at=datetime.now(UTC).replace(tzinfo=None),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            raise ImportConflict(f"Import job {job_id} was resumed elsewhere")
+        if rows:
+            # Imported rows keep their own timestamps, so the newest one may not move
+            form.updated_at = utcnow()
+        await db.commit()
+        if rows:
+            recent.invalidate(form.id)
+        submissions_total.inc("imported", amount=len(rows))
+        done.update(progress)
+        rows, timestamps, batch_records, batch_rejected = [], [], 0, 0
+        if on_progress is not None and progress["records_done"] != job.records_done:
+            await db.refresh(job)
+            on_progress(job)
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    end = job.bytes_done
+    records = _records(job.format, chunks, limits.max_body_bytes, job.bytes_done)
+    async for record, end in records:
+        if record is None:
+            continue
+        batch_records += 1
+        # A str is the reason _records could not parse the record
+        error = record if isinstance(record, str) else None
+        if error is None:
+            try:
+                if not isinstance(record, dict):
+                    raise TypeError("Expected a JSON object")
+                data, timestamp = _map_record(record, mapping, job.timestamp_field)
+                rows.append(clean_item(data, limits))
+                timestamps.append(timestamp or now)
+            except (TypeError, ValueError) as exc:
+                error = str(exc)
+        if error is not None:
+            batch_rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"record": done["records_done"] + batch_records, "error": error})
+        if batch_records >= batch_size:
+            await commit_batch(end)
+            # Let other requests on this worker in between batches
+            await asyncio.sleep(0)
+    await commit_batch(max(end, job.bytes_done), status="completed")
+    await db.refresh(job)
+    return job
+
+
+async def fail_job(db: AsyncSession, job: ImportJob, error: str) -> None:
+    """Record why a run stopped; its committed progress stays for a resume."""
+    job_id = job.id  # the rollback expires the instance
+    await db.rollback()
+    await db.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id, ImportJob.status == "running")
+        .values(
+            status="failed",
+            error=error,
+            updated_at=datetime.now(UTC).replace(tzinfo=None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(job)
+
+
+async def restart_job(db: AsyncSession, job: ImportJob) -> None:
+    """Mark a failed (or interrupted) job as running again before resuming it."""
+    if job.status == "completed":
+        raise InvalidImport(f"Import job {job.id} already completed")
+    job.status = "running"
+    job.error = None
+    await db.commit()
+
+
+async def _file_chunks(path: Path) -> AsyncIterator[bytes]:
+    # Opened and read on a thread, so a slow disk never stalls the event loop
+    fh = await asyncio.to_thread(open, path, "rb")
+    try:
+        while chunk := await asyncio.to_thread(fh.read, _READ_SIZE):
+            yield chunk
+    finally:
+        fh.close()
+
+
+def job_report(job: ImportJob) -> dict:
+    return {
+        "id": job.id,
+        "form_id": job.form_id,
+        "source": job.source,
+        "format": job.format,
+        "status": job.status,
+        "records_done": job.records_done,
+        "imported": job.imported,
+        "rejected": job.rejected,
+        "bytes_done": job.bytes_done,
+        "errors": json.loads(job.errors),
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+async def import_file(
+    form_id: int,
+    path: Path,
+    fmt: str | None = None,
+    mapping: dict | None = None,
+    timestamp_field: str | None = None,
+    batch_size: int | None = None,
+    resume: int | None = None,
+    on_progress: Callable[[ImportJob], None] | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> dict:
+    async with session_factory() as db:
+        form = (await db.execute(select(Form).where(Form.id == form_id))).scalar_one_or_none()
+        if form is None:
+            raise InvalidImport(f"Form {form_id} not found")
+        if not form.is_active:
+            raise InvalidImport(f"Form {form_id} is inactive")
+        if resume is not None:
+            job = (
+                await db.execute(
+                    select(ImportJob).where(ImportJob.id == resume, ImportJob.form_id == form.id)
+                )
+            ).scalar_one_or_none()
+            if job is None:
+                raise InvalidImport(f"Import job {resume} not found for form {form_id}")
+            await restart_job(db, job)
+        else:
+            fmt = fmt or ("ndjson" if path.suffix.lower() in (".ndjson", ".jsonl") else "csv")
+            job = await create_job(db, form, path.name, fmt, mapping, timestamp_field)
+        try:
+            await run_import(db, form, job, _file_chunks(path), batch_size, on_progress)
+        except ImportConflict:
+            raise  # the other run owns the job now
+        except Exception as exc:
+            await fail_job(db, job, str(exc) or type(exc).__name__)
+            raise
+        return job_report(job)
+
+
+def _parse_mapping(maps: list[str], drops: list[str]) -> dict:
+    mapping: dict[str, str | None] = {}
+    for item in maps:
+        column, sep, field = item.partition("=")
+        if not sep or not column or not field:
+            raise SystemExit(f"--map expects COLUMN=FIELD, got {item!r}")
+        mapping[column] = field
+    for column in drops:
+        mapping[column] = None
+    return mapping
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import submissions from a CSV or NDJSON file")
+    parser.add_argument("form", type=int, help="Form id")
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUMN=FIELD")
+    parser.add_argument("--drop", action="append", default=[], metavar="COLUMN")
+    parser.add_argument("--timestamp-field", metavar="COLUMN")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--resume", type=int, metavar="JOB_ID", help="Continue a failed import")
+    args = parser.parse_args()
+
+    size = args.file.stat().st_size
+
+    def progress(job: ImportJob) -> None:
+        percent = 100 * job.bytes_done / size if size else 100
+        print(
+            f"job {job.id}: {job.records_done} records, {job.imported} imported, "
+            f"{job.rejected} rejected ({percent:.1f}%)",
+            file=sys.stderr,
+        )
+
+    try:
+        report = asyncio.run(
+            import_file(
+                args.form,
+                args.file,
+                args.format,
+                _parse_mapping(args.map, args.drop),
+                args.timestamp_field,
+                args.batch_size,
+                args.resume,
+                progress,
+            )
+        )
+    except (InvalidImport, ImportConflict) as exc:
+        raise SystemExit(str(exc))
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
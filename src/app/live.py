@@ -0,0 +1,114 @@
+"""In-process pub/sub behind the dashboard's live submission streams.
+
+Ingest publishes each stored submission after its commit. Every open
+Server-Sent Events stream (app.routers.live) subscribes to one form, or to
+all of one user's forms. Publishing never waits. Each frame is encoded once,
+and a form nobody is watching costs two dict lookups.
+
+Each subscriber has a buffer of FORMFORGE_LIVE_BUFFER_SIZE events. A subscriber
+that falls that far behind is dropped: its buffer is discarded, and its
+stream ends with a ``dropped`` event so the page can reload. One slow
+connection therefore never holds memory or ingest back.
+
+Only this worker's submissions are published here. With several workers or
+separate ingest replicas, a stream shows only the submissions that reached
+the worker serving it.
+"""
+
+import asyncio
+import json
+from collections import deque
+from datetime import UTC, datetime
+
+from app.config import settings
+from app.metrics import Counter, register_gauge, registry
+from app.models import Form
+
+live_dropped_total = registry.register(
+    Counter(
+        "formforge_live_subscribers_dropped_total",
+        "Live streams cut off for falling too far behind.",
+    )
+)
+
+
+class Subscription:
+    def __init__(self, topics: tuple[tuple[str, int], ...]):
+        self.topics = topics
+        self.dropped = False
+        self._frames: deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        if self.dropped:
+            return
+        if len(self._frames) >= settings.live_buffer_size:
+            self.dropped = True
+            self._frames.clear()
+            live_dropped_total.inc()
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+
+    async def next(self) -> bytes | None:
+        """The frames buffered so far, once there are any; ``None`` once dropped."""
+        await self._ready.wait()
+        self._ready.clear()
+        if self.dropped:
+            return None
+        frames = b"".join(self._frames)
+        self._frames.clear()
+        return frames
+
+
+class Broker:
+    def __init__(self):
+        self._subscribers: dict[tuple[str, int], set[Subscription]] = {}
+        self._all: set[Subscription] = set()
+
+    def subscribe(self, *topics: tuple[str, int]) -> Subscription:
+        subscription = Subscription(topics)
+        self._all.add(subscription)
+        for topic in topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._all.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def count(self) -> int:
+        return len(self._all)
+
+    def publish(self, form: Form, submission_id: int, data: dict) -> None:
+        by_form = self._subscribers.get(("form", form.id))
+        by_user = self._subscribers.get(("user", form.owner_id))
+        if not by_form and not by_user:
+            return
+        payload = json.dumps(
+            {
+                "form_id": form.id,
+                "submission": {
+                    "id": submission_id,
+                    "data": data,
+                    "created_at": datetime.now(UTC).replace(tzinfo=None).isoformat(),
+                },
+            }
+        )
+        frame = f"event: submission\nid: {submission_id}\ndata: {payload}\n\n".encode()
+        for subscription in (by_form or set()) | (by_user or set()):
+            subscription.push(frame)
+
+
+broker = Broker()
+
+register_gauge(
+    "formforge_live_subscribers",
+    "Open live submission streams on this worker.",
+    broker.count,
+)
@@ -1,47 +1,72 @@
+import secrets
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.config import settings
-from app.database import engine, Base
-from app.routers import auth, forms, submissions, export, pages
+from app.database import engine
+from app.metrics import MetricsMiddleware, registry
+from app.migrations import ensure_schema
+from app.request_stats import QueryStatsMiddleware
+from app.response_compression import CompressionMiddleware
+from app.webhooks import dispatcher as webhooks
 
 # Resolve paths relative to this file so they work from any working directory
 _APP_DIR = Path(__file__).resolve().parent
 _STATIC_DIR = _APP_DIR / "static"
 
+# ingest: public /f/{uuid} endpoints only. dashboard: UI, API and scheduled jobs. all: both.
+ROLES = ("all", "ingest", "dashboard")
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Create tables on startup (Alembic will manage migrations in production)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    await engine.dispose()
 
+def _lifespan(role: str):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await ensure_schema(engine)
+        scheduler = lease = None
+        # Retention and archive jobs belong with the dashboard, not with every ingest
+        # replica; among the rest, only the lease holder runs them
+        if role != "ingest":
+            from app.scheduler import Lease, create_scheduler
 
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="Form backend-as-a-service — instant API endpoints for HTML forms",
-    lifespan=lifespan,
-)
+            lease = Lease("jobs")
+            scheduler = create_scheduler(lease)
+            scheduler.start()
+        yield
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+            await lease.release()
+        await webhooks.close()
+        await engine.dispose()
 
-# Static files
-app.mount("/static", StaticFiles(directory=str(_STATIC_DIR)), name="static")
+    return lifespan
 
-# Include routers
-app.include_router(auth.router)
-app.include_router(forms.router)
-app.include_router(submissions.router)
-app.include_router(export.router)
-app.include_router(pages.router)
+
+def _routers(role: str) -> list:
+    # Imported per role, so an ingest worker never loads auth, templates or export code
+    if role == "ingest":
+        from app.routers import submissions
+
+        return [submissions.router]
+
+    from app.routers import admin, auth, bulk, export, forms, imports, pages, spam, webhooks
+
+    routers = [
+        auth.router, forms.router, bulk.router, imports.router, webhooks.router,
+        export.router, spam.router, admin.router, pages.router,
+    ]
+    if role == "all":
+        # Live streams only see submissions published in their own process, which
+        # in a split deployment are the ingest replicas'
+        from app.routers import live, submissions
+
+        routers.insert(2, submissions.router)
+        routers.insert(6, live.router)
+    return routers
 
 
-@app.exception_handler(401)
 async def unauthorized_redirect(request: Request, exc):
     accept = request.headers.get("accept", "")
     if "text/html" in accept and "application/json" not in accept:
@@ -51,10 +76,71 @@ async def unauthorized_redirect(request: Request, exc):
     return JSONResponse(status_code=401, content={"detail": detail})
 
 
-@app.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "app": settings.app_name,
-        "version": settings.app_version,
-    }
+def create_app(role: str | None = None) -> FastAPI:
+    """Build the app for one deployment role (``FORMFORGE_ROLE`` when not given)."""
+    role = role or settings.role
+    if role not in ROLES:
+        raise ValueError(f"Unknown role {role!r}; expected one of {', '.join(ROLES)}")
+
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        description="Form backend-as-a-service — instant API endpoints for HTML forms",
+        lifespan=_lifespan(role),
+        # Interactive docs need the dashboard; ingest replicas only take form posts
+        openapi_url=None if role == "ingest" else "/openapi.json",
+    )
+
+    if settings.response_compression:
+        # Innermost, so the metrics and Server-Timing cover the time spent compressing
+        app.add_middleware(CompressionMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    if settings.profiling_enabled:
+        from app.profiling import ProfilingMiddleware
+
+        # Outermost, so writing the profile is not counted in request metrics
+        app.add_middleware(ProfilingMiddleware)
+
+    if role != "ingest":
+        from app.assets import AssetFiles
+
+        app.mount("/static", AssetFiles(directory=str(_STATIC_DIR)), name="static")
+        app.add_exception_handler(401, unauthorized_redirect)
+
+    if role != "dashboard" and settings.fast_ingest:
+        from app.routers.fast_submit import fast_route
+
+        # Ahead of the routers, so it answers /f/{uuid} instead of submit_form
+        app.router.routes.append(fast_route)
+    for router in _routers(role):
+        app.include_router(router)
+    # Read by the templates, which only open live streams when they are served
+    app.state.live_updates = role == "all"
+
+    @app.get("/health")
+    async def health_check():
+        return {
+            "status": "healthy",
+            "app": settings.app_name,
+            "version": settings.app_version,
+            "role": role,
+        }
+
+    # Ingest replicas face the internet, so they only expose metrics behind the token
+    if role != "ingest" or settings.metrics_token:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics(request: Request):
+            expected = f"Bearer {settings.metrics_token}".encode()
+            given = request.headers.get("authorization", "").encode()
+            if settings.metrics_token and not secrets.compare_digest(given, expected):
+                return PlainTextResponse(
+                    "Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"}
+                )
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,80 @@
+"""Schema version check run on startup.
+
+Booting reads ``alembic_version`` and compares it with ``SCHEMA_REVISION``,
+the newest migration in ``alembic/versions`` (a test keeps the two in sync).
+Alembic itself is only imported when the database is new or behind, and then
+only if ``FORMFORGE_AUTO_MIGRATE`` is on.
+"""
+
+import logging
+from pathlib import Path
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_REVISION = "0008"
+# Databases created by the old create_all() startup match this revision
+BASELINE_REVISION = "0001"
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+_UNVERSIONED = "unversioned"
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_DIR.parent / "alembic.ini"))
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _read_revision(connection) -> str | None:
+    """The database's revision, ``None`` if empty, ``_UNVERSIONED`` if pre-Alembic."""
+    inspector = inspect(connection)
+    if not inspector.has_table("alembic_version"):
+        return _UNVERSIONED if inspector.has_table("users") else None
+    return connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+
+
+def _upgrade(connection, revision: str | None) -> None:
+    from alembic import command
+
+    config = alembic_config(connection)
+    if revision == _UNVERSIONED:
+        logger.warning(
+            f"Database has no migration history; assuming it matches revision "
+            f"{BASELINE_REVISION} (the schema create_all() used to build)"
+        )
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def ensure_schema(engine: AsyncEngine) -> None:
+    """Make sure the database is at ``SCHEMA_REVISION`` before serving requests."""
+    async with engine.connect() as conn:
+        revision = await conn.run_sync(_read_revision)
+    if revision == SCHEMA_REVISION:
+        return
+    if not settings.auto_migrate:
+        raise RuntimeError(
+            f"Database schema is at {revision or 'nothing'}, expected {SCHEMA_REVISION}. "
+            f"Run 'alembic upgrade head' or set FORMFORGE_AUTO_MIGRATE=true."
+        )
+
+    logger.info(f"Migrating database schema from {revision or 'empty'} to {SCHEMA_REVISION}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(_upgrade, revision)
+    except Exception:
+        # Another worker booting at the same time may have migrated first
+        async with engine.connect() as conn:
+            if await conn.run_sync(_read_revision) != SCHEMA_REVISION:
+                raise
@@ -1,12 +1,30 @@
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    false,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.compression import SubmissionData
 from app.database import Base
 
 
+def utcnow() -> datetime:
+    """Naive UTC, like the ``CURRENT_TIMESTAMP`` defaults."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -37,9 +55,29 @@ class Form(Base):
     email_notifications: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     notification_email: Mapped[str | None] = mapped_column(String(320), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Retention overrides; None falls back to the owner's plan default
+    retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    retention_max_rows: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    spam_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Preset zlib dictionary trained from this form's submissions (see app.compression)
+    compression_dict: Mapped[str | None] = mapped_column(String(8), nullable=True)
+    # Drop submissions identical to one received within this many seconds
+    dedup_window_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Body limits for /f/{uuid}; None uses the worker-wide setting (see app.body_limits)
+    max_body_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_fields: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_field_length: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_nesting_depth: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Kept in step with the form's active webhooks, so ingest skips forms without any
+    has_webhooks: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default=false(), nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
+    # Set on every ORM update, and touched when the form's submissions change other
+    # than by ingest; feeds Last-Modified (see app.conditional)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, onupdate=utcnow, nullable=True)
 
     owner: Mapped["User"] = relationship(back_populates="forms")
     submissions: Mapped[list["Submission"]] = relationship(
@@ -49,14 +87,129 @@ class Form(Base):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_form_id_created_at", "form_id", "created_at"),
+        Index("ix_submissions_form_id_content_hash", "form_id", "content_hash"),
+        UniqueConstraint("form_id", "idempotency_key"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     form_id: Mapped[int] = mapped_column(Integer, ForeignKey("forms.id"), nullable=False)
-    data: Mapped[str] = mapped_column(Text, nullable=False)  # JSON blob
+    data: Mapped[str] = mapped_column(SubmissionData, nullable=False)  # JSON, maybe compressed
     ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
     is_spam: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    idempotency_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
 
     form: Mapped["Form"] = relationship(back_populates="submissions")
+
+
+class SpamSubmission(Base):
+    """Quarantined spam, kept apart so hot submission queries never scan it."""
+
+    __tablename__ = "spam_submissions"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("forms.id"), nullable=False, index=True
+    )
+    data: Mapped[str] = mapped_column(Text, nullable=False)  # JSON blob
+    ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+
+class ArchiveSegment(Base):
+    """Index entry for one form-month of submissions moved to cold storage.
+
+    ``size_bytes`` is the committed length of the gzip segment file; anything
+    past it is a partial append from an interrupted run and is truncated away.
+    """
+
+    __tablename__ = "archive_segments"
+    __table_args__ = (UniqueConstraint("form_id", "month"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("forms.id"), nullable=False, index=True
+    )
+    month: Mapped[str] = mapped_column(String(7), nullable=False)  # YYYY-MM
+    row_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class ImportJob(Base):
+    """Progress of one CSV/NDJSON import into a form (see app.importer).
+
+    ``bytes_done`` is the offset in the source file just past the last record
+    whose batch committed; it is updated in the same transaction as that batch,
+    so a resumed import picks up exactly where the last commit left off.
+    """
+
+    __tablename__ = "import_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("forms.id"), nullable=False, index=True
+    )
+    source: Mapped[str] = mapped_column(String(255), nullable=False)
+    format: Mapped[str] = mapped_column(String(10), nullable=False)  # csv or ndjson
+    mapping: Mapped[str] = mapped_column(Text, default="{}", nullable=False)  # JSON object
+    timestamp_field: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="running", nullable=False)
+    bytes_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    records_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    imported: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rejected: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    errors: Mapped[str] = mapped_column(Text, default="[]", nullable=False)  # first few, JSON
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class Webhook(Base):
+    """A URL that receives a form's new submissions (see app.webhooks)."""
+
+    __tablename__ = "webhooks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    form_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("forms.id"), nullable=False, index=True
+    )
+    url: Mapped[str] = mapped_column(String(500), nullable=False)
+    secret: Mapped[str] = mapped_column(String(64), nullable=False)  # HMAC signing key
+    # Submissions per POST, and how long to wait for a batch to fill
+    batch_size: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    batch_wait_ms: Mapped[int] = mapped_column(Integer, default=1000, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+
+class CompressionDictionary(Base):
+    """A trained zlib preset dictionary, keyed by a hash of its bytes (see app.compression)."""
+
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[str] = mapped_column(String(8), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+
+class SchedulerLease(Base):
+    """Which process runs the scheduled jobs, and until when (see app.scheduler)."""
+
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(100), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -0,0 +1,104 @@
+"""Opt-in per-request profiling with cProfile.
+
+The middleware is only installed when ``FORMFORGE_PROFILING_ENABLED`` is set,
+so a normal deployment pays nothing. When installed, a request is profiled if
+it carries a valid ``X-FormForge-Profile`` token or is picked by
+``FORMFORGE_PROFILING_SAMPLE_RATE``. cProfile hooks the whole thread, so only
+one request is profiled at a time; requests overlapping it are not profiled
+themselves but their work on the event loop will appear in its stats.
+
+Generate a token (valid for ``FORMFORGE_PROFILING_TOKEN_MAX_AGE`` seconds):
+
+    PYTHONPATH=src python -m app.profiling
+"""
+
+import asyncio
+import cProfile
+import logging
+import random
+import re
+import time
+from pathlib import Path
+
+from itsdangerous import BadSignature, TimestampSigner
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-formforge-profile"
+_TOKEN_VALUE = "profile"
+
+
+def _signer() -> TimestampSigner:
+    return TimestampSigner(settings.secret_key, salt="formforge-profile")
+
+
+def make_token() -> str:
+    return _signer().sign(_TOKEN_VALUE).decode()
+
+
+def verify_token(token: str) -> bool:
+    try:
+        value = _signer().unsign(token, max_age=settings.profiling_token_max_age)
+    except BadSignature:
+        return False
+    return value.decode() == _TOKEN_VALUE
+
+
+def _write_profile(profiler: cProfile.Profile, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(path)
+    # Keep only the newest files
+    profiles = sorted(path.parent.glob("*.pstats"), key=lambda p: p.stat().st_mtime_ns)
+    for old in profiles[: max(0, len(profiles) - settings.profiling_max_files)]:
+        old.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware writing a ``.pstats`` file per profiled request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    def _wanted(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return verify_token(value.decode("latin-1"))
+        rate = settings.profiling_sample_rate
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        stamp = time.strftime("%Y%m%dT%H%M%S") + f"-{time.perf_counter_ns() % 1_000_000:06d}"
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_")[:60] or "root"
+        name = f"{stamp}-{scope['method']}-{slug}.pstats"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-formforge-profile-file", name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._busy = False
+            path = Path(settings.profiling_dir) / name
+            try:
+                await asyncio.to_thread(_write_profile, profiler, path)
+            except OSError as e:
+                logger.error(f"Failed to write profile {path}: {e}")
+
+
+if __name__ == "__main__":
+    print(make_token())
@@ -0,0 +1,62 @@
+import json
+import random
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.compression import compress_data, ensure_dictionary
+from app.config import settings
+from app.database import delete_chunked
+from app.models import Form, SpamSubmission, Submission, utcnow
+from app.recent import recent
+
+# Trim a form's quarantine after this many inserts instead of counting on every hit
+_TRIM_EVERY = 100
+_inserts_since_trim: dict[int, int] = defaultdict(int)
+
+
+async def quarantine_spam(db: AsyncSession, form: Form, data: dict, ip_address: str) -> None:
+    if random.random() >= settings.spam_sample_rate:
+        return
+    db.add(SpamSubmission(form_id=form.id, data=json.dumps(data), ip_address=ip_address))
+    await db.commit()
+
+    _inserts_since_trim[form.id] += 1
+    if _inserts_since_trim[form.id] >= _TRIM_EVERY:
+        _inserts_since_trim[form.id] = 0
+        await trim_quarantine(db, form.id)
+
+
+async def trim_quarantine(db: AsyncSession, form_id: int) -> int:
+    """Drop the oldest quarantined rows beyond ``spam_quarantine_max_rows``."""
+    result = await db.execute(
+        select(SpamSubmission.id)
+        .where(SpamSubmission.form_id == form_id)
+        .order_by(SpamSubmission.id.desc())
+        .offset(settings.spam_quarantine_max_rows)
+        .limit(1)
+    )
+    threshold = result.scalar_one_or_none()
+    if threshold is None:
+        return 0
+    return await delete_chunked(
+        db, SpamSubmission, SpamSubmission.form_id == form_id, SpamSubmission.id <= threshold
+    )
+
+
+async def restore_spam(db: AsyncSession, form: Form, spam: SpamSubmission) -> Submission:
+    await ensure_dictionary(db, form.compression_dict)
+    submission = Submission(
+        form_id=form.id,
+        data=compress_data(spam.data, form.compression_dict),
+        ip_address=spam.ip_address,
+        created_at=spam.created_at,
+    )
+    db.add(submission)
+    await db.delete(spam)
+    form.updated_at = utcnow()
+    await db.commit()
+    recent.invalidate(form.id)
+    await db.refresh(submission)
+    return submission
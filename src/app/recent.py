@@ -0,0 +1,178 @@
+"""Recent submissions of hot forms, kept in memory for first-page reads.
+
+Nearly every dashboard view is page 1 of a form's submissions with no search.
+For each recently viewed form, this keeps its ``SubmissionStats`` and the
+newest FORMFORGE_RECENT_CACHE_ROWS decoded rows (hot and archived, in listing
+order), so those views skip the COUNT and ORDER BY/LIMIT queries, and
+conditional requests (app.conditional) skip the database entirely:
+
+- **Fill**: the first read of a form fills its entry from the queries it runs
+  anyway.
+- **Update**: ingest on this worker adds each new submission to an existing
+  entry.
+- **Invalidate**: anything else that changes a form's rows drops its entry.
+  That covers bulk and imports, retention, archiving, spam restores and
+  deleting the form.
+- **Expire**: an entry is reloaded after FORMFORGE_RECENT_CACHE_TTL_SECONDS.
+  This bounds staleness when other workers or processes take submissions this
+  one never sees.
+- **Evict**: entries are evicted least recently used first, to stay under
+  FORMFORGE_RECENT_CACHE_BYTES across all forms.
+
+A read that raced a change (a submission stored while its queries ran) is
+not cached.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+
+from app.config import settings
+from app.metrics import Counter, register_gauge, registry
+from app.models import Submission
+
+recent_cache_total = registry.register(
+    Counter(
+        "formforge_recent_cache_total",
+        "First-page submission reads by result (hit, miss).",
+        ("result",),
+    )
+)
+
+# Rough per-row overhead of the dict, its keys and the datetime, on top of the JSON text
+_ROW_OVERHEAD = 400
+
+
+class SubmissionStats(NamedTuple):
+    """A form's row counts and newest submission, as listings and validators need."""
+
+    hot: int
+    archived: int
+    last_id: int | None
+    last_created: datetime | None
+
+    @property
+    def total(self) -> int:
+        return self.hot + self.archived
+
+
+def cached_row(
+    submission_id: int,
+    data: dict,
+    ip_address: str | None,
+    created_at: datetime,
+    is_spam: bool = False,
+) -> dict:
+    return {
+        "id": submission_id,
+        "data": data,
+        "ip_address": ip_address,
+        "is_spam": is_spam,
+        "created_at": created_at,
+    }
+
+
+def row_from(submission: Submission) -> dict:
+    return cached_row(
+        submission.id,
+        json.loads(submission.data),
+        submission.ip_address,
+        submission.created_at,
+        submission.is_spam,
+    )
+
+
+def _row_size(row: dict) -> int:
+    return _ROW_OVERHEAD + len(json.dumps(row["data"]))
+
+
+class _Entry:
+    __slots__ = ("expires", "rows", "size", "stats")
+
+    def __init__(self, rows: list[dict], stats: SubmissionStats):
+        self.rows = rows
+        self.stats = stats
+        self.size = sum(_row_size(row) for row in rows)
+        self.expires = time.monotonic() + settings.recent_cache_ttl_seconds
+
+
+class RecentSubmissions:
+    def __init__(self):
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._bytes = 0
+        # Bumped on every change to a form, so a fill can tell it raced one
+        self._versions: dict[int, int] = {}
+
+    def page(self, form_id: int, per_page: int) -> tuple[list[dict], SubmissionStats] | None:
+        """First page and stats from memory, or ``None`` on a miss."""
+        entry = self._entries.get(form_id)
+        if entry is not None and entry.expires <= time.monotonic():
+            self._drop(form_id)
+            entry = None
+        if entry is None or (per_page > len(entry.rows) and entry.stats.total > len(entry.rows)):
+            recent_cache_total.inc("miss")
+            return None
+        recent_cache_total.inc("hit")
+        self._entries.move_to_end(form_id)
+        return entry.rows[:per_page], entry.stats
+
+    def version(self, form_id: int) -> int:
+        """Taken before the queries whose results go to ``fill``."""
+        return self._versions.get(form_id, 0)
+
+    def fill(self, form_id: int, version: int, rows: list[dict], stats: SubmissionStats) -> None:
+        if not settings.recent_cache_ttl_seconds or self.version(form_id) != version:
+            return
+        self._drop(form_id)
+        entry = self._entries[form_id] = _Entry(rows[: settings.recent_cache_rows], stats)
+        self._bytes += entry.size
+        self._evict()
+
+    def add(self, form_id: int, row: dict) -> None:
+        """A submission this worker just committed."""
+        self._versions[form_id] = self.version(form_id) + 1
+        entry = self._entries.get(form_id)
+        if entry is None:
+            return
+        entry.rows.insert(0, row)
+        entry.stats = entry.stats._replace(
+            hot=entry.stats.hot + 1, last_id=row["id"], last_created=row["created_at"]
+        )
+        size = _row_size(row)
+        if len(entry.rows) > settings.recent_cache_rows:
+            size -= _row_size(entry.rows.pop())
+        entry.size += size
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, form_id: int) -> None:
+        self._versions[form_id] = self.version(form_id) + 1
+        self._drop(form_id)
+
+    def clear(self) -> None:
+        for form_id in list(self._entries):
+            self.invalidate(form_id)
+
+    def size(self) -> int:
+        return self._bytes
+
+    def _drop(self, form_id: int) -> None:
+        entry = self._entries.pop(form_id, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._bytes > settings.recent_cache_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+
+recent = RecentSubmissions()
+
+register_gauge(
+    "formforge_recent_cache_bytes",
+    "Estimated memory held by cached recent submissions.",
+    recent.size,
+)
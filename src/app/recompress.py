@@ -0,0 +1,102 @@
+"""Re-encode stored submission data with the current compression settings.
+
+    python -m app.recompress [--form ID] [--batch-size N] [--train]
+
+With ``FORMFORGE_SUBMISSION_COMPRESSION=none`` this decompresses every row,
+which is required before turning compression off for good.
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import LargeBinary, Text, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.compression import compress_data, ensure_dictionary, save_dictionary, train_dictionary
+from app.database import async_session
+from app.models import Form, Submission
+
+
+async def train_form_dictionary(db: AsyncSession, form: Form, sample_size: int = 500) -> None:
+    result = await db.execute(
+        select(Submission.data)
+        .where(Submission.form_id == form.id)
+        .order_by(Submission.id.desc())
+        .limit(sample_size)
+    )
+    zdict = train_dictionary(result.scalars().all())
+    form.compression_dict = await save_dictionary(db, zdict) if zdict else None
+    await db.commit()
+
+
+async def recompress_form(db: AsyncSession, form: Form, batch_size: int = 1000) -> dict[str, int]:
+    stats = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+    await ensure_dictionary(db, form.compression_dict)
+    last_id = 0
+    while True:
+        result = await db.execute(
+            # ff_data explicitly: with compression off, Submission.data is selected undecoded
+            select(
+                Submission.id,
+                func.length(cast(Submission.data, LargeBinary)),
+                func.ff_data(Submission.data, type_=Text),
+            )
+            .where(Submission.form_id == form.id, Submission.id > last_id)
+            .order_by(Submission.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return stats
+
+        updates = []
+        for row_id, stored_bytes, text in rows:
+            encoded = compress_data(text, form.compression_dict)
+            stats["bytes_before"] += stored_bytes
+            stats["bytes_after"] += len(encoded.encode() if isinstance(encoded, str) else encoded)
+            updates.append({"id": row_id, "data": encoded})
+        await db.execute(update(Submission), updates)
+        await db.commit()
+
+        stats["rows"] += len(rows)
+        last_id = rows[-1][0]
+        await asyncio.sleep(0)
+
+
+async def recompress(
+    form_id: int | None = None,
+    batch_size: int = 1000,
+    train: bool = False,
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> dict[str, int]:
+    totals = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+    async with session_factory() as db:
+        query = select(Form)
+        if form_id is not None:
+            query = query.where(Form.id == form_id)
+        forms = (await db.execute(query)).scalars().all()
+
+        for form in forms:
+            if train:
+                await train_form_dictionary(db, form)
+            stats = await recompress_form(db, form, batch_size)
+            for key, value in stats.items():
+                totals[key] += value
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompress stored submission data")
+    parser.add_argument("--form", type=int, default=None, help="Only this form id")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--train", action="store_true", help="Train a fresh per-form dictionary first"
+    )
+    args = parser.parse_args()
+    stats = asyncio.run(recompress(args.form, args.batch_size, args.train))
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-request SQL accounting, surfaced as a ``Server-Timing`` header.
+
+``app.database``'s cursor events add every statement to the ``QueryStats`` of
+the request that issued it. The stats object is shared through a context
+variable; it is mutated in place, so copies of the context (greenlets, tasks
+spawned by the handler) still report into the same request.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("db_time", "queries", "scope")
+
+    def __init__(self, scope: dict):
+        self.queries = 0
+        self.db_time = 0.0
+        self.scope = scope
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the (shared) scope dict
+        return getattr(self.scope.get("route"), "path", None) or self.scope["path"]
+
+    def record(self, elapsed: float) -> None:
+        self.queries += 1
+        self.db_time += elapsed
+
+    def server_timing(self) -> str:
+        return f"db;dur={self.db_time * 1000:.1f}, queries;desc={self.queries}"
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def record_query(elapsed: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.record(elapsed)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware counting the queries and DB time of each request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            # Streaming responses only report the queries run before their headers
+            if message["type"] == "http.response.start" and settings.server_timing:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            threshold = settings.query_count_warn_threshold
+            if threshold and stats.queries > threshold:
+                logger.warning(
+                    f"{scope['method']} {stats.route} ran {stats.queries} queries "
+                    f"({stats.db_time * 1000:.1f} ms in DB, "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms total)"
+                )
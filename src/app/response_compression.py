@@ -0,0 +1,188 @@
+"""Content-negotiated response compression: gzip, or brotli when it is installed.
+
+Pure ASGI, so streaming responses are compressed as they go. Each body
+message is compressed and flushed as it passes through, and nothing is held
+back for the next one: a CSV export starts arriving before it is finished.
+The start message is held only until the first body message, which decides
+small responses.
+
+Responses pass through unchanged when any of these apply:
+
+- the client accepts neither ``br`` nor ``gzip``, or the request is a HEAD;
+- the response already has a ``Content-Encoding``, or is a range;
+- the type is compressed already (images, audio, video, archives, woff) or is
+  ``text/event-stream``. Live streams are long-lived and send small frames,
+  and a compressor per open stream would cost far more memory than it saves
+  bandwidth;
+- the whole body is smaller than FORMFORGE_RESPONSE_COMPRESSION_MIN_BYTES.
+
+FORMFORGE_RESPONSE_COMPRESSION_GZIP_LEVEL and ..._BROTLI_QUALITY trade CPU
+for bandwidth. ``formforge_response_compression_bytes_total`` counts bytes
+before and after compression, so the effect of a change can be measured.
+"""
+
+import zlib
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+from app.metrics import Counter, registry
+
+response_compression_bytes_total = registry.register(
+    Counter(
+        "formforge_response_compression_bytes_total",
+        "Response body bytes through compression, by encoding and stage (in, out).",
+        ("encoding", "stage"),
+    )
+)
+
+_SKIP_TYPES = (
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "text/event-stream",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-brotli",
+    "application/zstd",
+    "application/pdf",
+    "application/octet-stream",
+)
+
+
+def compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "image/svg+xml":
+        return True
+    return bool(media_type) and not media_type.startswith(_SKIP_TYPES)
+
+
+def negotiate(accept_encoding: str, brotli_available: bool) -> str | None:
+    """The encoding to use for an ``Accept-Encoding`` value; brotli wins ties."""
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    chosen, best = None, 0.0
+    for coding in ("br", "gzip") if brotli_available else ("gzip",):
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best:
+            chosen, best = coding, quality
+    return chosen
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            settings.response_compression_gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class _Brotli:
+    def __init__(self, brotli):
+        self._compressor = brotli.Compressor(quality=settings.response_compression_brotli_quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        return compressed + (self._compressor.finish() if final else self._compressor.flush())
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses for clients that accept it."""
+
+    def __init__(self, app):
+        self.app = app
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self._brotli = brotli
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"), self._brotli is not None)
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                if (
+                    message["status"] < 200
+                    or message["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or "content-range" in headers
+                    or not compressible(headers.get("content-type", ""))
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                start = {**message, "headers": headers.raw}
+                content_length = headers.get("content-length")
+                if content_length is not None and (
+                    int(content_length) < settings.response_compression_min_bytes
+                ):
+                    passthrough = True
+                    await send(start)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < settings.response_compression_min_bytes:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = _Brotli(self._brotli) if encoding == "br" else _Gzip()
+                headers = MutableHeaders(raw=start["headers"])
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    # Still the same content, but no longer the same bytes
+                    headers["etag"] = f"W/{etag}"
+                await send({**start, "headers": headers.raw})
+
+            compressed = encoder.compress(body, final=not more_body)
+            response_compression_bytes_total.inc(encoding, "in", amount=len(body))
+            response_compression_bytes_total.inc(encoding, "out", amount=len(compressed))
+            if compressed or not more_body:
+                await send(
+                    {"type": "http.response.body", "body": compressed, "more_body": more_body}
+                )
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,132 @@
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.archive import delete_form_archive, drop_expired_segments
+from app.config import settings
+from app.database import async_session, delete_chunked
+from app.models import Form, ImportJob, SpamSubmission, Submission, User, Webhook, utcnow
+from app.quarantine import trim_quarantine
+from app.recent import recent
+
+logger = logging.getLogger(__name__)
+
+_POLICY_FIELDS = ("retention_days", "retention_max_rows", "spam_retention_days")
+
+
+def effective_policy(form: Form, plan: str) -> dict[str, int | None]:
+    """The tighter of the form's limits and its plan's; None means "keep forever".
+
+    Plans have no limits unless the operator sets FORMFORGE_RETENTION_PLAN_LIMITS.
+    """
+    plan_policy = settings.retention_plan_limits.get(plan, {})
+    policy = {}
+    for field in _POLICY_FIELDS:
+        values = [v for v in (getattr(form, field), plan_policy.get(field)) if v]
+        policy[field] = min(values) if values else None
+    return policy
+
+
+def _cutoff(days: int) -> datetime:
+    # created_at is stored as naive UTC (SQLite CURRENT_TIMESTAMP)
+    return datetime.now(UTC).replace(tzinfo=None) - timedelta(days=days)
+
+
+async def _overflow_threshold(db: AsyncSession, form_id: int, keep_rows: int) -> int | None:
+    result = await db.execute(
+        select(Submission.id)
+        .where(Submission.form_id == form_id)
+        .order_by(Submission.id.desc())
+        .offset(keep_rows)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def purge_form(db: AsyncSession, form: Form, plan: str) -> dict[str, int]:
+    policy = effective_policy(form, plan)
+    purged = {"expired": 0, "overflow": 0, "spam": 0}
+
+    if policy["spam_retention_days"]:
+        purged["spam"] = await delete_chunked(
+            db,
+            SpamSubmission,
+            SpamSubmission.form_id == form.id,
+            SpamSubmission.created_at < _cutoff(policy["spam_retention_days"]),
+        )
+    purged["spam"] += await trim_quarantine(db, form.id)
+    if policy["retention_days"]:
+        cutoff = _cutoff(policy["retention_days"])
+        purged["expired"] = await delete_chunked(
+            db, Submission, Submission.form_id == form.id, Submission.created_at < cutoff
+        )
+        purged["expired"] += await drop_expired_segments(db, form.id, cutoff)
+    if policy["retention_max_rows"]:
+        threshold = await _overflow_threshold(db, form.id, policy["retention_max_rows"])
+        if threshold is not None:
+            purged["overflow"] = await delete_chunked(
+                db, Submission, Submission.form_id == form.id, Submission.id <= threshold
+            )
+    if purged["expired"] or purged["overflow"]:
+        # ``form`` was loaded by another session, so update the row directly
+        await db.execute(update(Form).where(Form.id == form.id).values(updated_at=utcnow()))
+        await db.commit()
+        recent.invalidate(form.id)
+    return purged
+
+
+async def incremental_vacuum(db: AsyncSession) -> None:
+    # No-op unless the database was created with auto_vacuum=INCREMENTAL
+    pages = settings.retention_vacuum_pages
+    await db.execute(text(f"PRAGMA incremental_vacuum({int(pages)})"))
+    await db.commit()
+
+
+async def run_retention(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> dict[str, int]:
+    """Apply retention policies to every form. Scheduled by ``app.scheduler``."""
+    async with session_factory() as db:
+        result = await db.execute(select(Form, User.plan).join(User, Form.owner_id == User.id))
+        forms = result.all()
+
+    totals = {"expired": 0, "overflow": 0, "spam": 0}
+    for form, plan in forms:
+        async with session_factory() as db:
+            purged = await purge_form(db, form, plan)
+        for key, count in purged.items():
+            totals[key] += count
+
+    if any(totals.values()):
+        async with session_factory() as db:
+            await incremental_vacuum(db)
+        logger.info(
+            f"Retention purge: {totals['expired']} expired, "
+            f"{totals['overflow']} over row cap, {totals['spam']} spam"
+        )
+    return totals
+
+
+async def remove_form(
+    form_id: int,
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+) -> None:
+    """Delete a form and everything stored for it, after ``DELETE /api/forms/{id}``.
+
+    The form was already marked inactive, so nothing new arrives while the
+    submissions go in chunks. If this stops part way, the form stays inactive
+    and deleting it again finishes the job.
+    """
+    try:
+        async with session_factory() as db:
+            for model in (Submission, SpamSubmission, ImportJob, Webhook):
+                await delete_chunked(db, model, model.form_id == form_id)
+            await delete_form_archive(db, form_id)
+            await db.execute(delete(Form).where(Form.id == form_id))
+            await db.commit()
+    except Exception:
+        logger.exception(f"Deleting form {form_id} failed")
+    finally:
+        recent.invalidate(form_id)
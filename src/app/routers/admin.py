@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from app import slow_queries
+from app.auth import get_admin_user
+from app.config import settings
+from app.models import User
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = 50,
+    user: User = Depends(get_admin_user),
+):
+    limit = max(1, min(limit, slow_queries.recent.maxlen))
+    entries = list(reversed(slow_queries.recent))[:limit]
+    return {
+        "threshold_ms": settings.slow_query_ms,
+        "log_file": settings.slow_query_log_file,
+        "entries": entries,
+    }
@@ -0,0 +1,223 @@
+"""Bulk submission ingestion for server-side integrations and migrations.
+
+``POST /api/forms/{form_id}/submissions/bulk`` takes the form owner's
+submissions as a JSON array of objects, or as NDJSON
+(``Content-Type: application/x-ndjson``, one object per line). Items are
+validated and inserted ``FORMFORGE_BULK_CHUNK_SIZE`` at a time, each chunk
+one multi-row INSERT in its own transaction, instead of one request, form
+lookup and commit per row through ``/f/{uuid}``. NDJSON is processed as it
+streams in, so only one chunk is held in memory.
+
+Each item gets the same treatment as a public submission's data: ``_``
+fields are dropped and the form's body limits (app.body_limits) apply to it
+on its own. The caller is the authenticated owner, so there is no rate limit,
+honeypot or CORS check. The response reports a result per item;
+``?notify=false`` suppresses the per-row notification emails and webhook
+deliveries.
+"""
+
+import json
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.body_limits import limits_for, read_body
+from app.config import settings
+from app.database import get_db
+from app.email_service import send_submission_notification
+from app.importer import clean_item, insert_rows
+from app.live import broker as live
+from app.metrics import submissions_total
+from app.models import Form, User
+from app.recent import recent
+from app.routers.forms import ensure_active
+from app.tasks import spawn
+from app.webhooks import dispatcher as webhooks
+
+router = APIRouter(prefix="/api/forms", tags=["bulk"])
+
+_NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class _TooLarge(Exception):
+    """The request went over a bulk limit after some chunks were committed."""
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+class _BulkWriter:
+    """Validates items and commits them a chunk at a time."""
+
+    def __init__(self, db: AsyncSession, form: Form, notify: bool):
+        self.db = db
+        self.form = form
+        self.notify = notify and form.email_notifications and bool(form.notification_email)
+        self.webhooks = notify and form.has_webhooks
+        self.limits = limits_for(form)
+        self.results: list[dict] = []
+        self.count = 0
+        self.accepted = 0
+        self._pending: list[tuple[int, dict, str]] = []
+
+    async def add(self, item) -> None:
+        index = self._next_index()
+        try:
+            data, text = clean_item(item, self.limits)
+        except (TypeError, ValueError) as exc:
+            self.results.append({"index": index, "status": "rejected", "error": str(exc)})
+            return
+        self._pending.append((index, data, text))
+        if len(self._pending) >= settings.bulk_chunk_size:
+            await self.flush()
+
+    def reject(self, error: str) -> None:
+        """Record an item that could not even be parsed."""
+        index = self._next_index()
+        self.results.append({"index": index, "status": "rejected", "error": error})
+
+    def _next_index(self) -> int:
+        if self.count >= settings.bulk_max_items:
+            raise _TooLarge(f"More than {settings.bulk_max_items} submissions in one request")
+        self.count += 1
+        return self.count - 1
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        form = self.form
+        ids = await insert_rows(self.db, form, [(data, text) for _, data, text in pending])
+        await self.db.commit()
+        recent.invalidate(form.id)
+
+        self.accepted += len(ids)
+        submissions_total.inc("accepted", amount=len(ids))
+        for (index, data, _), submission_id in zip(pending, ids):
+            self.results.append({"index": index, "status": "accepted", "id": submission_id})
+            live.publish(form, submission_id, data)
+            if self.webhooks:
+                webhooks.enqueue(form, submission_id, data)
+            if self.notify:
+                spawn(
+                    send_submission_notification(
+                        to_email=form.notification_email,
+                        form_name=form.name,
+                        submission_data=data,
+                    )
+                )
+
+    def summary(self) -> dict:
+        return {
+            "accepted": self.accepted,
+            "rejected": len(self.results) - self.accepted,
+            "results": sorted(self.results, key=lambda result: result["index"]),
+        }
+
+
+async def _ndjson_lines(
+    chunks: AsyncIterator[bytes], max_line: int, max_bytes: int
+) -> AsyncIterator[bytes | None]:
+    """Non-blank lines as they arrive; ``None`` for a line longer than ``max_line``."""
+    buffer = b""
+    received = 0
+    oversized = False
+    async for chunk in chunks:
+        received += len(chunk)
+        if max_bytes and received > max_bytes:
+            raise _TooLarge(f"Request body exceeds {max_bytes} bytes")
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if oversized:
+                # The rest of a line already reported as too long
+                oversized = False
+            elif line.strip():
+                yield line
+        if max_line and len(buffer) > max_line:
+            if not oversized:
+                yield None
+            oversized = True
+            buffer = b""
+    if buffer.strip() and not oversized:
+        yield buffer
+
+
+async def _ingest_ndjson(writer: _BulkWriter, request: Request) -> None:
+    max_line = writer.limits.max_body_bytes
+    lines = _ndjson_lines(request.stream(), max_line, settings.bulk_max_body_bytes)
+    async for line in lines:
+        if line is None:
+            writer.reject(f"Submission exceeds {max_line} bytes")
+            continue
+        try:
+            item = json.loads(line)
+        except (ValueError, RecursionError):
+            writer.reject("Invalid JSON")
+            continue
+        await writer.add(item)
+
+
+async def _ingest_array(writer: _BulkWriter, request: Request) -> None:
+    limits = writer.limits._replace(max_body_bytes=settings.bulk_max_body_bytes)
+    body = await read_body(request.stream(), limits, request.headers.get("content-length"))
+    try:
+        items = json.loads(body)
+    except (ValueError, RecursionError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array of submissions",
+        )
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"More than {settings.bulk_max_items} submissions in one request",
+        )
+    for item in items:
+        await writer.add(item)
+
+
+@router.post("/{form_id}/submissions/bulk")
+async def bulk_submit(
+    form_id: int,
+    request: Request,
+    notify: bool = True,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(select(Form).where(Form.id == form_id, Form.owner_id == user.id))
+    form = result.scalar_one_or_none()
+    if not form:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
+    ensure_active(form)
+
+    content_length = request.headers.get("content-length", "")
+    max_bytes = settings.bulk_max_body_bytes
+    if max_bytes and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request body exceeds {max_bytes} bytes",
+        )
+
+    writer = _BulkWriter(db, form, notify)
+    mime = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    try:
+        if mime in _NDJSON_TYPES:
+            await _ingest_ndjson(writer, request)
+        else:
+            await _ingest_array(writer, request)
+        await writer.flush()
+    except _TooLarge as exc:
+        # Earlier chunks are already committed; say which items made it
+        await writer.flush()
+        return JSONResponse(
+            status_code=413,
+            content={"detail": exc.detail, **writer.summary()},
+        )
+    return writer.summary()
@@ -7,12 +7,16 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.archive import iter_archived
 from app.auth import get_current_user
 from app.database import get_db
 from app.models import Form, Submission, User
 
 router = APIRouter(prefix="/api/forms", tags=["export"])
 
+_CHUNK_ROWS = 1000
+_CHUNK_BYTES = 64 * 1024
+
 
 @router.get("/{form_id}/export/csv")
 async def export_csv(
@@ -27,39 +31,51 @@ async def export_csv(
     if not form:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
 
-    result = await db.execute(
-        select(Submission)
-        .where(Submission.form_id == form.id, Submission.is_spam == False)
-        .order_by(Submission.created_at.desc())
-    )
-    submissions = result.scalars().all()
+    # Two passes over hot and archived rows, so neither is held in memory: the
+    # first finds every field for the header, the second writes the rows
+    fields = set()
+    count = 0
+    async for s in _all_submissions(db, form.id):
+        fields.update(json.loads(s.data).keys())
+        count += 1
 
-    if not submissions:
+    if not count:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No submissions to export",
         )
 
-    # Collect all unique field names across submissions
-    all_fields = set()
-    parsed = []
-    for s in submissions:
-        data = json.loads(s.data)
-        all_fields.update(data.keys())
-        parsed.append({"_id": s.id, "_submitted_at": s.created_at.isoformat(), **data})
-
-    fieldnames = ["_id", "_submitted_at"] + sorted(all_fields)
-
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
-    writer.writeheader()
-    for row in parsed:
-        writer.writerow(row)
-
-    output.seek(0)
+    fieldnames = ["_id", "_submitted_at"] + sorted(fields)
     filename = f"{form.name.replace(' ', '_')}_submissions.csv"
     return StreamingResponse(
-        iter([output.getvalue()]),
+        _csv_chunks(db, form.id, fieldnames),
         media_type="text/csv",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
+
+
+async def _all_submissions(db: AsyncSession, form_id: int):
+    result = await db.stream_scalars(
+        select(Submission)
+        .where(Submission.form_id == form_id)
+        .order_by(Submission.created_at.desc())
+        .execution_options(yield_per=_CHUNK_ROWS)
+    )
+    async for s in result:
+        yield s
+    async for s in iter_archived(db, form_id):
+        yield s
+
+
+async def _csv_chunks(db: AsyncSession, form_id: int, fieldnames: list[str]):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    async for s in _all_submissions(db, form_id):
+        data = json.loads(s.data)
+        writer.writerow({"_id": s.id, "_submitted_at": s.created_at.isoformat(), **data})
+        if output.tell() >= _CHUNK_BYTES:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
@@ -0,0 +1,152 @@
+"""Raw ASGI handler for ``/f/{form_uuid}``, the highest-volume route.
+
+``submit_form`` pays for FastAPI's dependency injection, a ``Request``
+object and exception handlers. This endpoint works on the raw scope and
+writes prebuilt response bytes. All checks, body parsing and storage go
+through the same helpers as ``submit_form`` in ``app.routers.submissions``,
+so status codes, bodies and headers match; ``tests/test_fast_submit.py``
+compares the two. ``create_app`` mounts it ahead of the FastAPI route unless
+``FORMFORGE_FAST_INGEST`` is off.
+"""
+
+import json
+from functools import lru_cache
+from urllib.parse import quote
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.requests import ClientDisconnect
+from starlette.routing import Match, Route
+
+from app.admission import admission
+from app.database import get_db
+from app.routers.submissions import (
+    SUBMISSION_OK_JSON,
+    THANK_YOU_HTML,
+    _admit,
+    _check_cors,
+    _enter,
+    _get_form,
+    _receive_data,
+    _response_kind,
+    _split_honeypot,
+    _store,
+)
+
+_JSON_OK = SUBMISSION_OK_JSON.encode()
+_THANK_YOU = THANK_YOU_HTML.encode()
+_JSON = b"application/json"
+_HTML = b"text/html; charset=utf-8"
+
+
+@lru_cache(maxsize=64)
+def _error_body(detail: str) -> bytes:
+    # Same encoding as FastAPI's HTTPException handler (JSONResponse)
+    return json.dumps({"detail": detail}, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def _respond(send, status_code: int, body: bytes, content_type: bytes | None, extra=()):
+    headers = [(b"content-length", str(len(body)).encode())]
+    if content_type:
+        headers.append((b"content-type", content_type))
+    headers.extend((k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in extra)
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _chunks(receive):
+    """The request body as it arrives, like ``Request.stream()``."""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        yield message.get("body", b"")
+        if not message.get("more_body", False):
+            return
+
+
+def _client_ip(headers: dict[str, str], scope) -> str:
+    forwarded = headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _handle(scope, receive, send, db, form_uuid: str, headers: dict[str, str]) -> None:
+    if scope["method"] == "OPTIONS":
+        form = await _get_form(db, form_uuid)
+        await _respond(send, 200, b"", None, _check_cors(form, headers.get("origin", "")).items())
+        return
+
+    client_ip = _client_ip(headers, scope)
+    idempotency_key = headers.get("idempotency-key") or None
+    form = await _admit(db, form_uuid, client_ip, idempotency_key)
+
+    data = await _receive_data(form, Headers(scope=scope), _chunks(receive))
+    clean_data, is_spam = _split_honeypot(data)
+    replayed = await _store(db, form, clean_data, is_spam, client_ip, idempotency_key)
+
+    cors_headers = _check_cors(form, headers.get("origin", ""))
+    if replayed:
+        cors_headers["Idempotent-Replayed"] = "true"
+
+    kind = _response_kind(form, headers.get("accept", ""))
+    if kind == "redirect":
+        # Quoted like Starlette's RedirectResponse
+        location = quote(form.redirect_url, safe=":/%#?=@[]!$&'()*+,;")
+        extra = [("location", location), *cors_headers.items()]
+        await _respond(send, status.HTTP_303_SEE_OTHER, b"", None, extra)
+    elif kind == "html":
+        await _respond(send, 200, _THANK_YOU, _HTML, cors_headers.items())
+    else:
+        await _respond(send, 200, _JSON_OK, _JSON, cors_headers.items())
+
+
+class FastSubmitEndpoint:
+    """ASGI app for POST and OPTIONS on ``/f/{form_uuid}``."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        headers: dict[str, str] = {}
+        for key, value in scope["headers"]:
+            # First occurrence wins, like Starlette's Headers.get
+            headers.setdefault(key.decode("latin-1"), value.decode("latin-1"))
+
+        form_uuid = scope["path_params"]["form_uuid"]
+        admitted = False
+        sessions = None
+        try:
+            if scope["method"] == "POST":
+                # Before the session, like submit_form's dependency order
+                _enter(form_uuid)
+                admitted = True
+            # Honour dependency_overrides, so tests (and anything else) can swap the session
+            provider = scope["app"].dependency_overrides.get(get_db, get_db)
+            sessions = provider()
+            db = await anext(sessions)
+            await _handle(scope, receive, send, db, form_uuid, headers)
+        except HTTPException as exc:
+            headers_out = (exc.headers or {}).items()
+            await _respond(send, exc.status_code, _error_body(exc.detail), _JSON, headers_out)
+        finally:
+            if sessions is not None:
+                await sessions.aclose()
+            if admitted:
+                admission.leave(form_uuid)
+
+
+class _FastRoute(Route):
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match is not Match.NONE:
+            # APIRoute does this too; the metrics and query-stats middleware read it
+            child_scope["route"] = self
+        return match, child_scope
+
+
+fast_route = _FastRoute(
+    "/f/{form_uuid}",
+    FastSubmitEndpoint(),
+    methods=["POST", "OPTIONS"],
+    include_in_schema=False,
+)
@@ -1,13 +1,18 @@
-import json
-
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.archive import archived_counts, paginate_with_archive
 from app.auth import get_current_user
+from app.compression import data_contains
+from app.conditional import not_modified, submission_stats, validators
+from app.config import settings
 from app.database import get_db
 from app.models import Form, Submission, User
+from app.recent import recent, row_from
+from app.retention import remove_form
 from app.schemas import FormCreate, FormListResponse, FormResponse, FormUpdate
+from app.tasks import spawn
 
 router = APIRouter(prefix="/api/forms", tags=["forms"])
 
@@ -18,6 +23,20 @@ PLAN_LIMITS = {
 }
 
 
+async def get_owned_form(form_id: int, user: User, db: AsyncSession) -> Form:
+    result = await db.execute(select(Form).where(Form.id == form_id, Form.owner_id == user.id))
+    form = result.scalar_one_or_none()
+    if not form:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
+    return form
+
+
+def ensure_active(form: Form) -> None:
+    """Refuse new submissions for a form that is switched off or being deleted."""
+    if not form.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Form is inactive")
+
+
 def form_to_response(form: Form, submission_count: int = 0) -> FormResponse:
     return FormResponse(
         id=form.id,
@@ -28,6 +47,15 @@ def form_to_response(form: Form, submission_count: int = 0) -> FormResponse:
         email_notifications=form.email_notifications,
         notification_email=form.notification_email,
         is_active=form.is_active,
+        retention_days=form.retention_days,
+        retention_max_rows=form.retention_max_rows,
+        spam_retention_days=form.spam_retention_days,
+        dedup_window_seconds=form.dedup_window_seconds,
+        max_body_bytes=form.max_body_bytes,
+        max_fields=form.max_fields,
+        max_field_length=form.max_field_length,
+        max_nesting_depth=form.max_nesting_depth,
+        has_webhooks=form.has_webhooks,
         created_at=form.created_at,
         submission_count=submission_count,
     )
@@ -57,6 +85,14 @@ async def create_form(
         redirect_url=data.redirect_url,
         email_notifications=data.email_notifications,
         notification_email=data.notification_email or user.email,
+        retention_days=data.retention_days,
+        retention_max_rows=data.retention_max_rows,
+        spam_retention_days=data.spam_retention_days,
+        dedup_window_seconds=data.dedup_window_seconds,
+        max_body_bytes=data.max_body_bytes,
+        max_fields=data.max_fields,
+        max_field_length=data.max_field_length,
+        max_nesting_depth=data.max_nesting_depth,
     )
     db.add(form)
     await db.commit()
@@ -66,6 +102,8 @@ async def create_form(
 
 @router.get("/", response_model=FormListResponse)
 async def list_forms(
+    request: Request,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -73,17 +111,13 @@ async def list_forms(
         select(Form).where(Form.owner_id == user.id).order_by(Form.created_at.desc())
     )
     forms = result.scalars().all()
+    stats = await submission_stats(db, [form.id for form in forms])
+    current = validators(("forms",), forms, stats)
+    if (not_modified_response := not_modified(request, current)) is not None:
+        return not_modified_response
 
-    form_responses = []
-    for form in forms:
-        count_result = await db.execute(
-            select(func.count(Submission.id)).where(
-                Submission.form_id == form.id, Submission.is_spam == False
-            )
-        )
-        count = count_result.scalar()
-        form_responses.append(form_to_response(form, count))
-
+    response.headers.update(current.headers())
+    form_responses = [form_to_response(form, stats[form.id].total) for form in forms]
     return FormListResponse(forms=form_responses, total=len(form_responses))
 
 
@@ -101,11 +135,10 @@ async def get_form(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
 
     count_result = await db.execute(
-        select(func.count(Submission.id)).where(
-            Submission.form_id == form.id, Submission.is_spam == False
-        )
+        select(func.count(Submission.id)).where(Submission.form_id == form.id)
     )
-    count = count_result.scalar()
+    archived = await archived_counts(db, [form.id])
+    count = count_result.scalar() + archived.get(form.id, 0)
     return form_to_response(form, count)
 
 
@@ -131,15 +164,14 @@ async def update_form(
     await db.refresh(form)
 
     count_result = await db.execute(
-        select(func.count(Submission.id)).where(
-            Submission.form_id == form.id, Submission.is_spam == False
-        )
+        select(func.count(Submission.id)).where(Submission.form_id == form.id)
     )
-    count = count_result.scalar()
+    archived = await archived_counts(db, [form.id])
+    count = count_result.scalar() + archived.get(form.id, 0)
     return form_to_response(form, count)
 
 
-@router.delete("/{form_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{form_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_form(
     form_id: int,
     user: User = Depends(get_current_user),
@@ -152,13 +184,19 @@ async def delete_form(
     if not form:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
 
-    await db.delete(form)
+    # Stop ingest now; the submissions are deleted in chunks after we answer, since
+    # a large form takes far longer than a client or proxy will wait.
+    form.is_active = False
     await db.commit()
+    spawn(remove_form(form.id, async_sessionmaker(db.bind, expire_on_commit=False)))
+    return {"detail": "Form is being deleted"}
 
 
 @router.get("/{form_id}/submissions")
 async def list_submissions(
     form_id: int,
+    request: Request,
+    response: Response,
     page: int = 1,
     per_page: int = 20,
     search: str = "",
@@ -172,34 +210,48 @@ async def list_submissions(
     if not form:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
 
-    query = select(Submission).where(
-        Submission.form_id == form.id, Submission.is_spam == False
-    )
-    if search:
-        query = query.where(Submission.data.contains(search))
+    first_page = page == 1 and not search
+    cached = recent.page(form.id, per_page) if first_page else None
+    if cached is not None:
+        rows, stats = cached
+    else:
+        version = recent.version(form.id)
+        stats = (await submission_stats(db, [form.id]))[form.id]
+    current = validators(("submissions", page, per_page, search), [form], {form.id: stats})
+    if (not_modified_response := not_modified(request, current)) is not None:
+        return not_modified_response
+    response.headers.update(current.headers())
 
-    count_result = await db.execute(
-        select(func.count(Submission.id)).where(
-            Submission.form_id == form.id, Submission.is_spam == False
-        ).where(Submission.data.contains(search) if search else True)
-    )
-    total = count_result.scalar()
+    if cached is not None:
+        total = stats.total
+    else:
+        # Page 1 reads enough rows to fill the recent-submissions cache as well
+        limit = max(per_page, settings.recent_cache_rows) if first_page else per_page
+        query = select(Submission).where(Submission.form_id == form.id)
+        total = stats.hot
+        if search:
+            query = query.where(data_contains(Submission.data, search))
+            count_result = await db.execute(
+                select(func.count(Submission.id))
+                .where(Submission.form_id == form.id)
+                .where(data_contains(Submission.data, search))
+            )
+            total = count_result.scalar()
 
-    query = query.order_by(Submission.created_at.desc())
-    query = query.offset((page - 1) * per_page).limit(per_page)
-    result = await db.execute(query)
-    submissions = result.scalars().all()
+        query = query.order_by(Submission.created_at.desc())
+        query = query.offset((page - 1) * per_page).limit(limit)
+        result = await db.execute(query)
+        submissions, total = await paginate_with_archive(
+            db, form.id, result.scalars().all(), total, (page - 1) * per_page, limit, search
+        )
+        rows = [row_from(s) for s in submissions]
+        if first_page:
+            recent.fill(form.id, version, rows, stats)
+        rows = rows[:per_page]
 
     return {
         "submissions": [
-            {
-                "id": s.id,
-                "data": json.loads(s.data),
-                "ip_address": s.ip_address,
-                "is_spam": s.is_spam,
-                "created_at": s.created_at.isoformat(),
-            }
-            for s in submissions
+            {**row, "created_at": row["created_at"].isoformat()} for row in rows
         ],
         "total": total,
         "page": page,
@@ -0,0 +1,148 @@
+"""CSV/NDJSON imports over HTTP; the import itself is in app.importer.
+
+The file is the raw request body (``Content-Type: text/csv`` or
+``application/x-ndjson``, or ``?format=``), read as it streams in. The
+response is the finished job. ``GET .../imports/{job_id}`` shows a running
+job's progress from another request, and ``POST .../imports/{job_id}/resume``
+with the same file continues a failed one.
+"""
+
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.importer import (
+    FORMATS,
+    ImportConflict,
+    InvalidImport,
+    create_job,
+    fail_job,
+    job_report,
+    restart_job,
+    run_import,
+)
+from app.models import Form, ImportJob, User
+from app.routers.forms import ensure_active, get_owned_form
+
+router = APIRouter(prefix="/api/forms", tags=["imports"])
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+async def _get_job(job_id: int, form: Form, db: AsyncSession) -> ImportJob:
+    result = await db.execute(
+        select(ImportJob).where(ImportJob.id == job_id, ImportJob.form_id == form.id)
+    )
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return job
+
+
+def _parse_mapping(mapping: str) -> dict:
+    try:
+        parsed = json.loads(mapping or "{}")
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict) or not all(
+        isinstance(v, str) or v is None for v in parsed.values()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="mapping must be a JSON object of column names to field names or null",
+        )
+    return parsed
+
+
+async def _run(db: AsyncSession, form: Form, job: ImportJob, request: Request) -> dict:
+    try:
+        await run_import(db, form, job, request.stream())
+    except ImportConflict as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except InvalidImport as exc:
+        await fail_job(db, job, str(exc))
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except ClientDisconnect:
+        await fail_job(db, job, "Upload interrupted")
+        raise
+    except Exception as exc:
+        await fail_job(db, job, str(exc) or type(exc).__name__)
+        raise
+    return job_report(job)
+
+
+@router.post("/{form_id}/imports", status_code=status.HTTP_201_CREATED)
+async def start_import(
+    form_id: int,
+    request: Request,
+    format: str | None = None,
+    source: str = "upload",
+    mapping: str = "",
+    timestamp_field: str | None = None,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    ensure_active(form)
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    fmt = format or _CONTENT_TYPES.get(content_type)
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send text/csv or application/x-ndjson, or set ?format=csv|ndjson",
+        )
+    job = await create_job(db, form, source, fmt, _parse_mapping(mapping), timestamp_field)
+    return await _run(db, form, job, request)
+
+
+@router.post("/{form_id}/imports/{job_id}/resume")
+async def resume_import(
+    form_id: int,
+    job_id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    ensure_active(form)
+    job = await _get_job(job_id, form, db)
+    try:
+        await restart_job(db, job)
+    except InvalidImport as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return await _run(db, form, job, request)
+
+
+@router.get("/{form_id}/imports")
+async def list_imports(
+    form_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    result = await db.execute(
+        select(ImportJob).where(ImportJob.form_id == form.id).order_by(ImportJob.id.desc())
+    )
+    return {"imports": [job_report(job) for job in result.scalars().all()]}
+
+
+@router.get("/{form_id}/imports/{job_id}")
+async def get_import(
+    form_id: int,
+    job_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    return job_report(await _get_job(job_id, form, db))
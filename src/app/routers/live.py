@@ -0,0 +1,101 @@
+"""Server-Sent Events streams of new submissions, fed by app.live.
+
+``GET /api/forms/{form_id}/events`` streams one form, and ``GET /api/events``
+streams all of the user's forms. Each new submission arrives as an
+``event: submission`` frame whose data is JSON of the form
+``{"form_id", "submission": {"id", "data", "created_at"}}``. A stream that
+falls behind ends with ``event: dropped``. Every stream ends after
+FORMFORGE_LIVE_STREAM_SECONDS, and ``EventSource`` reconnects on its own.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.config import settings
+from app.database import get_db
+from app.live import Subscription, broker
+from app.models import Form, User
+
+router = APIRouter(prefix="/api", tags=["live"])
+
+# Browsers wait this long before reconnecting a stream that ended
+_RETRY_MS = 1000
+
+
+async def _frames(subscription: Subscription) -> AsyncIterator[bytes]:
+    deadline = time.monotonic() + settings.live_stream_seconds
+    try:
+        yield f"retry: {_RETRY_MS}\n\n".encode()
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                frames = await asyncio.wait_for(
+                    subscription.next(), min(remaining, settings.live_keepalive_seconds)
+                )
+            except TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield b": keepalive\n\n"
+                continue
+            if frames is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield frames
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class _EventStream(StreamingResponse):
+    """Releases its subscription even when the body is never iterated."""
+
+    def __init__(self, subscription: Subscription):
+        self.subscription = subscription
+        super().__init__(
+            _frames(subscription),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            broker.unsubscribe(self.subscription)
+
+
+async def _stream(db: AsyncSession, *topics: tuple[str, int]) -> StreamingResponse:
+    # The stream may stay open for minutes; don't keep a pooled connection for it
+    await db.close()
+    # No await between the check and the subscribe, so concurrent requests can't both pass
+    if broker.count() >= settings.live_max_subscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live streams open, try again later",
+            headers={"Retry-After": str(settings.admission_retry_after)},
+        )
+    return _EventStream(broker.subscribe(*topics))
+
+
+@router.get("/forms/{form_id}/events")
+async def form_events(
+    form_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(select(Form.id).where(Form.id == form_id, Form.owner_id == user.id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
+    return await _stream(db, ("form", form_id))
+
+
+@router.get("/events")
+async def user_events(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _stream(db, ("user", user.id))
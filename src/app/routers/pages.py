@@ -1,25 +1,39 @@
-import json
+from functools import lru_cache
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.archive import paginate_with_archive
 from app.auth import get_current_user, get_optional_user
+from app.compression import data_contains
+from app.conditional import not_modified, submission_stats, validators
 from app.config import settings
 from app.database import get_db
 from app.models import Form, Submission, User
+from app.recent import recent, row_from
 
 router = APIRouter(tags=["pages"])
 _TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(_TEMPLATES_DIR))
+
+
+@lru_cache(maxsize=1)
+def templates():
+    """The Jinja2 environment, built (and jinja2 imported) on the first page render."""
+    from fastapi.templating import Jinja2Templates
+
+    from app.assets import asset_url
+
+    environment = Jinja2Templates(directory=str(_TEMPLATES_DIR))
+    environment.env.globals["asset_url"] = asset_url
+    return environment
 
 
 @router.get("/", response_class=HTMLResponse)
 async def landing_page(request: Request, user: User | None = Depends(get_optional_user)):
-    return templates.TemplateResponse(
+    return templates().TemplateResponse(
         request, "landing.html", {"user": user, "settings": settings}
     )
 
@@ -28,14 +42,14 @@ async def landing_page(request: Request, user: User | None = Depends(get_optiona
 async def login_page(request: Request, user: User | None = Depends(get_optional_user)):
     if user:
         return RedirectResponse(url="/dashboard", status_code=302)
-    return templates.TemplateResponse(request, "login.html")
+    return templates().TemplateResponse(request, "login.html")
 
 
 @router.get("/register", response_class=HTMLResponse)
 async def register_page(request: Request, user: User | None = Depends(get_optional_user)):
     if user:
         return RedirectResponse(url="/dashboard", status_code=302)
-    return templates.TemplateResponse(request, "register.html")
+    return templates().TemplateResponse(request, "register.html")
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
@@ -48,29 +62,23 @@ async def dashboard_page(
         select(Form).where(Form.owner_id == user.id).order_by(Form.created_at.desc())
     )
     forms = result.scalars().all()
+    stats = await submission_stats(db, [form.id for form in forms])
+    current = validators(("dashboard", user.id, user.name, user.plan), forms, stats)
+    if (response := not_modified(request, current)) is not None:
+        return response
 
-    form_data = []
-    total_submissions = 0
-    for form in forms:
-        count_result = await db.execute(
-            select(func.count(Submission.id)).where(
-                Submission.form_id == form.id, Submission.is_spam == False
-            )
-        )
-        count = count_result.scalar()
-        total_submissions += count
-        form_data.append({"form": form, "submission_count": count})
-
-    return templates.TemplateResponse(
+    form_data = [{"form": form, "submission_count": stats[form.id].total} for form in forms]
+    return templates().TemplateResponse(
         request,
         "dashboard.html",
         {
             "user": user,
             "forms": form_data,
             "total_forms": len(forms),
-            "total_submissions": total_submissions,
+            "total_submissions": sum(s.total for s in stats.values()),
             "settings": settings,
         },
+        headers=current.headers(),
     )
 
 
@@ -91,34 +99,51 @@ async def form_detail_page(
         raise HTTPException(status_code=404, detail="Form not found")
 
     per_page = 20
-    query = select(Submission).where(
-        Submission.form_id == form.id, Submission.is_spam == False
-    )
-    if search:
-        query = query.where(Submission.data.contains(search))
-
-    count_query = select(func.count(Submission.id)).where(
-        Submission.form_id == form.id, Submission.is_spam == False
+    first_page = page == 1 and not search
+    cached = recent.page(form.id, per_page) if first_page else None
+    if cached is not None:
+        submissions, stats = cached
+    else:
+        version = recent.version(form.id)
+        stats = (await submission_stats(db, [form.id]))[form.id]
+    current = validators(
+        ("form_detail", user.id, user.name, page, search), [form], {form.id: stats}
     )
-    if search:
-        count_query = count_query.where(Submission.data.contains(search))
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
+    if (response := not_modified(request, current)) is not None:
+        return response
+
+    if cached is not None:
+        total = stats.total
+    else:
+        # Page 1 reads enough rows to fill the recent-submissions cache as well
+        limit = max(per_page, settings.recent_cache_rows) if first_page else per_page
+        query = select(Submission).where(Submission.form_id == form.id)
+        total = stats.hot
+        if search:
+            query = query.where(data_contains(Submission.data, search))
+            count_query = select(func.count(Submission.id)).where(
+                Submission.form_id == form.id, data_contains(Submission.data, search)
+            )
+            count_result = await db.execute(count_query)
+            total = count_result.scalar()
 
-    query = query.order_by(Submission.created_at.desc()).offset((page - 1) * per_page).limit(per_page)
-    result = await db.execute(query)
-    submissions_raw = result.scalars().all()
+        query = query.order_by(Submission.created_at.desc()).offset((page - 1) * per_page).limit(limit)
+        result = await db.execute(query)
+        submissions_raw, total = await paginate_with_archive(
+            db, form.id, result.scalars().all(), total, (page - 1) * per_page, limit, search
+        )
+        submissions = [row_from(s) for s in submissions_raw]
+        if first_page:
+            recent.fill(form.id, version, submissions, stats)
+        submissions = submissions[:per_page]
 
-    submissions = []
     all_fields = set()
-    for s in submissions_raw:
-        data = json.loads(s.data)
-        all_fields.update(data.keys())
-        submissions.append({"id": s.id, "data": data, "created_at": s.created_at, "ip_address": s.ip_address})
+    for s in submissions:
+        all_fields.update(s["data"].keys())
 
     total_pages = max(1, (total + per_page - 1) // per_page)
 
-    return templates.TemplateResponse(
+    return templates().TemplateResponse(
         request,
         "form_detail.html",
         {
@@ -133,4 +158,5 @@ async def form_detail_page(
             "search": search,
             "settings": settings,
         },
+        headers=current.headers(),
     )
@@ -0,0 +1,88 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.database import delete_chunked, get_db
+from app.models import SpamSubmission, User
+from app.quarantine import restore_spam
+from app.routers.forms import get_owned_form
+
+router = APIRouter(prefix="/api/forms", tags=["spam"])
+
+
+@router.get("/{form_id}/spam")
+async def list_spam(
+    form_id: int,
+    page: int = 1,
+    per_page: int = 20,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+
+    count_result = await db.execute(
+        select(func.count(SpamSubmission.id)).where(SpamSubmission.form_id == form.id)
+    )
+    total = count_result.scalar()
+
+    result = await db.execute(
+        select(SpamSubmission)
+        .where(SpamSubmission.form_id == form.id)
+        .order_by(SpamSubmission.id.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    return {
+        "submissions": [
+            {
+                "id": s.id,
+                "data": json.loads(s.data),
+                "ip_address": s.ip_address,
+                "created_at": s.created_at.isoformat(),
+            }
+            for s in result.scalars().all()
+        ],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+    }
+
+
+@router.post("/{form_id}/spam/{spam_id}/restore")
+async def restore_to_inbox(
+    form_id: int,
+    spam_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    result = await db.execute(
+        select(SpamSubmission).where(
+            SpamSubmission.id == spam_id, SpamSubmission.form_id == form.id
+        )
+    )
+    spam = result.scalar_one_or_none()
+    if not spam:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Spam entry not found")
+
+    submission = await restore_spam(db, form, spam)
+    return {
+        "id": submission.id,
+        "data": json.loads(submission.data),
+        "ip_address": submission.ip_address,
+        "is_spam": submission.is_spam,
+        "created_at": submission.created_at.isoformat(),
+    }
+
+
+@router.delete("/{form_id}/spam", status_code=status.HTTP_204_NO_CONTENT)
+async def empty_spam(
+    form_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    await delete_chunked(db, SpamSubmission, SpamSubmission.form_id == form.id)
@@ -1,18 +1,34 @@
-import asyncio
 import json
 import logging
+import math
 import time
 from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+from urllib.parse import parse_qsl
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
 
+from app.admission import admission
+from app.body_limits import BodyLimits, check_data, limits_for, nesting_error, read_body
+from app.compression import compress_data, ensure_dictionary
 from app.config import settings
 from app.database import get_db
 from app.email_service import send_submission_notification
+from app.idempotency import MAX_KEY_LENGTH, content_hash, is_duplicate, known_key, remember
+from app.live import broker as live
+from app.metrics import register_gauge, submissions_total
 from app.models import Form, Submission
+from app.quarantine import quarantine_spam
+from app.recent import cached_row, recent
+from app.tasks import spawn
+from app.webhooks import dispatcher as webhooks
 
 logger = logging.getLogger(__name__)
 
@@ -20,15 +36,52 @@ router = APIRouter(tags=["submissions"])
 
 # In-memory rate limiting store: { form_uuid: { ip: [timestamps] } }
 _rate_limit_store: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+_RATE_LIMIT_WINDOW = 60.0
+_last_sweep = 0.0
 
 
 def clear_rate_limits():
     _rate_limit_store.clear()
 
 
+def _sweep_rate_limits(now: float) -> None:
+    """Forget clients with no request inside the window.
+
+    Without this every IP that ever submitted stays in the store for the life
+    of the process. Runs at most once per window, so the cost is amortised.
+    """
+    global _last_sweep
+    if now - _last_sweep < _RATE_LIMIT_WINDOW:
+        return
+    _last_sweep = now
+    for form_uuid in list(_rate_limit_store):
+        ips = _rate_limit_store[form_uuid]
+        stale = [
+            ip
+            for ip, timestamps in ips.items()
+            if not timestamps or now - timestamps[-1] >= _RATE_LIMIT_WINDOW
+        ]
+        for ip in stale:
+            del ips[ip]
+        if not ips:
+            del _rate_limit_store[form_uuid]
+
+
+def _rate_limit_entries() -> int:
+    return sum(len(ips) for ips in _rate_limit_store.values())
+
+
+register_gauge(
+    "formforge_rate_limit_entries",
+    "Tracked (form, client IP) pairs in the in-memory rate limiter.",
+    _rate_limit_entries,
+)
+
+
 def _check_rate_limit(form_uuid: str, ip: str) -> bool:
     now = time.time()
-    window = 60.0
+    window = _RATE_LIMIT_WINDOW
+    _sweep_rate_limits(now)
     timestamps = _rate_limit_store[form_uuid][ip]
     # Clean old entries
     _rate_limit_store[form_uuid][ip] = [t for t in timestamps if now - t < window]
@@ -45,8 +98,7 @@ def _get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def _check_cors(form: Form, request: Request) -> dict[str, str]:
-    origin = request.headers.get("origin", "")
+def _check_cors(form: Form, origin: str) -> dict[str, str]:
     allowed = form.allowed_origins.strip()
     headers = {}
     if allowed == "*":
@@ -56,73 +108,69 @@ def _check_cors(form: Form, request: Request) -> dict[str, str]:
         if origin in allowed_list:
             headers["Access-Control-Allow-Origin"] = origin
     headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
-    headers["Access-Control-Allow-Headers"] = "Content-Type"
+    headers["Access-Control-Allow-Headers"] = "Content-Type, Idempotency-Key"
     return headers
 
 
-@router.options("/f/{form_uuid}")
-async def submission_preflight(
-    form_uuid: str,
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-):
-    result = await db.execute(select(Form).where(Form.uuid == form_uuid))
-    form = result.scalar_one_or_none()
-    if not form:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
+# Shared by submit_form and the raw ASGI fast path in app.routers.fast_submit.
+# Both run the same checks in the same order, so they answer every request alike.
 
-    cors_headers = _check_cors(form, request)
-    return Response(status_code=200, headers=cors_headers)
 
+def _enter(form_uuid: str) -> None:
+    """Take an admission slot (see app.admission) or refuse with 503."""
+    if admission.try_enter(form_uuid):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many submissions in progress. Please try again shortly.",
+            headers={"Retry-After": str(settings.admission_retry_after)},
+        )
 
-@router.post("/f/{form_uuid}")
-async def submit_form(
-    form_uuid: str,
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-):
+
+async def _admission_slot(form_uuid: str):
+    # Declared before get_db in submit_form, so a refused request never touches the pool
+    _enter(form_uuid)
+    try:
+        yield
+    finally:
+        admission.leave(form_uuid)
+
+
+async def _get_form(db: AsyncSession, form_uuid: str) -> Form:
     result = await db.execute(select(Form).where(Form.uuid == form_uuid))
     form = result.scalar_one_or_none()
     if not form:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Form not found")
+    return form
 
+
+async def _admit(
+    db: AsyncSession, form_uuid: str, client_ip: str, idempotency_key: str | None
+) -> Form:
+    """Checks that run before the request body is read."""
+    form = await _get_form(db, form_uuid)
     if not form.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Form is inactive")
 
-    client_ip = _get_client_ip(request)
+    if idempotency_key and len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key is too long"
+        )
 
-    # Rate limiting
-    if not _check_rate_limit(form_uuid, client_ip):
+    # Rate limiting. A retry of a key already stored here is answered as a replay
+    # instead, and does not count against the client's quota.
+    if not known_key(form, idempotency_key) and not _check_rate_limit(form_uuid, client_ip):
+        submissions_total.inc("rate_limited")
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Rate limit exceeded. Please try again later.",
         )
+    return form
 
-    # Parse form data (URL-encoded or JSON)
-    content_type = request.headers.get("content-type", "")
-    if "application/json" in content_type:
-        try:
-            data = await request.json()
-        except Exception:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON"
-            )
-    elif "application/x-www-form-urlencoded" in content_type or "multipart/form-data" in content_type:
-        form_data = await request.form()
-        data = {k: v for k, v in form_data.items()}
-    else:
-        # Try JSON first, fall back to form data
-        try:
-            data = await request.json()
-        except Exception:
-            try:
-                form_data = await request.form()
-                data = {k: v for k, v in form_data.items()}
-            except Exception:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Unable to parse request body",
-                )
+
+def _split_honeypot(data) -> tuple[dict, bool]:
+    """Drop the honeypot and internal ``_`` fields; returns (clean data, is spam)."""
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
 
     # Honeypot spam detection
     is_spam = False
@@ -138,41 +186,81 @@ async def submit_form(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No form data received"
         )
-
-    submission = Submission(
-        form_id=form.id,
-        data=json.dumps(clean_data),
-        ip_address=client_ip,
-        is_spam=is_spam,
-    )
-    db.add(submission)
-    await db.commit()
+    return clean_data, is_spam
+
+
+async def _store(
+    db: AsyncSession,
+    form: Form,
+    clean_data: dict,
+    is_spam: bool,
+    client_ip: str,
+    idempotency_key: str | None,
+) -> bool:
+    """Save (or quarantine) the submission and queue its notification; True if replayed."""
+    # Spam goes to the quarantine table so hot submission queries never see it
+    replayed = False
+    if is_spam:
+        await quarantine_spam(db, form, clean_data, client_ip)
+        submissions_total.inc("spam")
+    else:
+        digest = content_hash(clean_data)
+        replayed = await is_duplicate(db, form, idempotency_key, digest)
+        if not replayed:
+            await ensure_dictionary(db, form.compression_dict)
+            submission = Submission(
+                form_id=form.id,
+                data=compress_data(json.dumps(clean_data), form.compression_dict),
+                ip_address=client_ip,
+                idempotency_key=idempotency_key,
+                content_hash=digest,
+                # Set here rather than by the database so the recent-submissions cache has it
+                created_at=datetime.now(UTC).replace(tzinfo=None, microsecond=0),
+            )
+            db.add(submission)
+            try:
+                start = time.perf_counter()
+                await db.commit()
+                admission.observe_commit(time.perf_counter() - start)
+            except IntegrityError:
+                # Same Idempotency-Key committed concurrently or before this worker's cache
+                await db.rollback()
+                await db.refresh(form)
+                replayed = True
+            remember(form, idempotency_key, digest)
+        submissions_total.inc("duplicate" if replayed else "accepted")
+
+    if not is_spam and not replayed:
+        recent.add(
+            form.id, cached_row(submission.id, clean_data, client_ip, submission.created_at)
+        )
+        live.publish(form, submission.id, clean_data)
+        if form.has_webhooks:
+            # Only queued here; delivery happens in the background
+            webhooks.enqueue(form, submission.id, clean_data)
 
     # Send email notification (fire-and-forget, don't block the response)
-    if not is_spam and form.email_notifications and form.notification_email:
-        asyncio.create_task(
+    if not is_spam and not replayed and form.email_notifications and form.notification_email:
+        spawn(
             send_submission_notification(
                 to_email=form.notification_email,
                 form_name=form.name,
                 submission_data=clean_data,
             )
         )
+    return replayed
 
-    cors_headers = _check_cors(form, request)
-
-    # Determine response based on accept header and redirect URL
-    accept = request.headers.get("accept", "")
 
+def _response_kind(form: Form, accept: str) -> str:
+    """``redirect``, ``html`` (thank-you page) or ``json``, from the Accept header."""
     if form.redirect_url and "text/html" in accept:
-        response = RedirectResponse(
-            url=form.redirect_url, status_code=status.HTTP_303_SEE_OTHER
-        )
-        for k, v in cors_headers.items():
-            response.headers[k] = v
-        return response
-
+        return "redirect"
     if "text/html" in accept and "application/json" not in accept:
-        html = """<!DOCTYPE html>
+        return "html"
+    return "json"
+
+
+THANK_YOU_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
 <title>Thank you!</title>
@@ -196,10 +284,121 @@ p{color:#64748b;margin:0;font-size:0.95rem;line-height:1.5;}
 </div>
 </body>
 </html>"""
-        return HTMLResponse(content=html, headers=cors_headers)
 
+SUBMISSION_OK_JSON = json.dumps({"status": "ok", "message": "Submission received"})
+
+
+@router.options("/f/{form_uuid}")
+async def submission_preflight(
+    form_uuid: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    form = await _get_form(db, form_uuid)
+    cors_headers = _check_cors(form, request.headers.get("origin", ""))
+    return Response(status_code=200, headers=cors_headers)
+
+
+async def _parse_form(mime: str, body: bytes, headers: Headers) -> dict:
+    """What ``request.form()`` returns for this body, as a dict (last value wins)."""
+    if mime == "application/x-www-form-urlencoded":
+        # Starlette decodes latin-1 then unquote_plus, which is what parse_qsl does
+        return dict(parse_qsl(body.decode("latin-1"), keep_blank_values=True))
+    if mime != "multipart/form-data":
+        return {}
+
+    async def stream():
+        yield body
+        yield b""
+
+    # The body is already within max_body_bytes; app.body_limits checks the fields
+    parser = MultiPartParser(
+        headers, stream(), max_files=math.inf, max_fields=math.inf, max_part_size=len(body) + 1
+    )
+    try:
+        form_data = await parser.parse()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+    return {k: v for k, v in form_data.items()}
+
+
+def _loads(body: bytes, limits: BodyLimits):
+    try:
+        return json.loads(body)
+    except RecursionError:
+        raise nesting_error(limits)
+
+
+async def _parse_body(headers: Headers, body: bytes, limits: BodyLimits):
+    # Parse form data (URL-encoded or JSON)
+    content_type = headers.get("content-type", "")
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if "application/json" in content_type:
+        try:
+            return _loads(body, limits)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+    if "application/x-www-form-urlencoded" in content_type or "multipart/form-data" in content_type:
+        return await _parse_form(mime, body, headers)
+    # No usable content type: JSON first, then form data
+    try:
+        return _loads(body, limits)
+    except ValueError:
+        try:
+            return await _parse_form(mime, body, headers)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Unable to parse request body"
+            )
+
+
+async def _receive_data(form: Form, headers: Headers, chunks: AsyncIterator[bytes]):
+    """Read and parse the body within the form's limits (see app.body_limits)."""
+    limits = limits_for(form)
+    try:
+        body = await read_body(chunks, limits, headers.get("content-length"))
+        data = await _parse_body(headers, body, limits)
+        check_data(data, limits)
+    except HTTPException as exc:
+        if exc.status_code == 413:
+            submissions_total.inc("too_large")
+        raise
+    return data
+
+
+@router.post("/f/{form_uuid}")
+async def submit_form(
+    form_uuid: str,
+    request: Request,
+    _slot: None = Depends(_admission_slot),
+    db: AsyncSession = Depends(get_db),
+):
+    client_ip = _get_client_ip(request)
+    idempotency_key = request.headers.get("idempotency-key") or None
+    form = await _admit(db, form_uuid, client_ip, idempotency_key)
+
+    data = await _receive_data(form, request.headers, request.stream())
+    clean_data, is_spam = _split_honeypot(data)
+    replayed = await _store(db, form, clean_data, is_spam, client_ip, idempotency_key)
+
+    cors_headers = _check_cors(form, request.headers.get("origin", ""))
+    if replayed:
+        # Same response as the original request, but nothing was written
+        cors_headers["Idempotent-Replayed"] = "true"
+
+    # Determine response based on accept header and redirect URL
+    kind = _response_kind(form, request.headers.get("accept", ""))
+    if kind == "redirect":
+        response = RedirectResponse(
+            url=form.redirect_url, status_code=status.HTTP_303_SEE_OTHER
+        )
+        for k, v in cors_headers.items():
+            response.headers[k] = v
+        return response
+    if kind == "html":
+        return HTMLResponse(content=THANK_YOU_HTML, headers=cors_headers)
     return Response(
-        content=json.dumps({"status": "ok", "message": "Submission received"}),
+        content=SUBMISSION_OK_JSON,
         media_type="application/json",
         headers=cors_headers,
     )
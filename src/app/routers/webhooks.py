@@ -0,0 +1,124 @@
+"""Managing a form's webhooks; delivery itself is in app.webhooks.
+
+The signing secret is generated here and returned with the webhook, so the
+receiving service can check ``X-FormForge-Signature``. URLs are checked with
+``app.webhooks.check_url`` before they are saved. Every change also updates
+``Form.has_webhooks``, the flag ingest checks before queueing anything.
+"""
+
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.models import Form, User, Webhook
+from app.routers.forms import get_owned_form
+from app.schemas import WebhookCreate, WebhookResponse, WebhookUpdate
+from app.webhooks import UnsafeWebhookURL, check_url, dispatcher
+
+router = APIRouter(prefix="/api/forms", tags=["webhooks"])
+
+MAX_WEBHOOKS_PER_FORM = 5
+
+
+async def _get_webhook(webhook_id: int, form: Form, db: AsyncSession) -> Webhook:
+    result = await db.execute(
+        select(Webhook).where(Webhook.id == webhook_id, Webhook.form_id == form.id)
+    )
+    webhook = result.scalar_one_or_none()
+    if not webhook:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Webhook not found")
+    return webhook
+
+
+async def _webhooks(db: AsyncSession, form: Form) -> list[Webhook]:
+    result = await db.execute(
+        select(Webhook).where(Webhook.form_id == form.id).order_by(Webhook.id)
+    )
+    return list(result.scalars())
+
+
+async def _check_url(url: str) -> None:
+    # 422 as a literal: HTTP_422_UNPROCESSABLE_CONTENT is missing from older Starlette
+    try:
+        await check_url(url)
+    except UnsafeWebhookURL as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except OSError:
+        raise HTTPException(status_code=422, detail="Webhook host does not resolve")
+
+
+async def _commit(db: AsyncSession, form: Form) -> None:
+    """Commit with ``has_webhooks`` matching the form's active webhooks."""
+    await db.flush()
+    active_ids = {w.id for w in await _webhooks(db, form) if w.is_active}
+    form.has_webhooks = bool(active_ids)
+    await db.commit()
+    dispatcher.invalidate(form.id, active_ids)
+
+
+@router.get("/{form_id}/webhooks")
+async def list_webhooks(
+    form_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    return {"webhooks": [WebhookResponse.model_validate(w) for w in await _webhooks(db, form)]}
+
+
+@router.post(
+    "/{form_id}/webhooks", response_model=WebhookResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_webhook(
+    form_id: int,
+    data: WebhookCreate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    if len(await _webhooks(db, form)) >= MAX_WEBHOOKS_PER_FORM:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"A form can have at most {MAX_WEBHOOKS_PER_FORM} webhooks",
+        )
+    await _check_url(data.url)
+    webhook = Webhook(form_id=form.id, secret=secrets.token_hex(32), **data.model_dump())
+    db.add(webhook)
+    await _commit(db, form)
+    await db.refresh(webhook)
+    return webhook
+
+
+@router.put("/{form_id}/webhooks/{webhook_id}", response_model=WebhookResponse)
+async def update_webhook(
+    form_id: int,
+    webhook_id: int,
+    data: WebhookUpdate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    webhook = await _get_webhook(webhook_id, form, db)
+    if data.url is not None:
+        await _check_url(data.url)
+    for field, value in data.model_dump(exclude_unset=True).items():
+        setattr(webhook, field, value)
+    await _commit(db, form)
+    return webhook
+
+
+@router.delete("/{form_id}/webhooks/{webhook_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    form_id: int,
+    webhook_id: int,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    form = await get_owned_form(form_id, user, db)
+    webhook = await _get_webhook(webhook_id, form, db)
+    await db.delete(webhook)
+    await _commit(db, form)
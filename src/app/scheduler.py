@@ -0,0 +1,138 @@
+"""Scheduled retention and archive jobs, run by one process at a time.
+
+Every process that is not an ingest replica starts a scheduler, but the jobs
+only run in the one holding the ``jobs`` row of ``scheduler_leases``. Each
+process tries to take or renew the lease every third of
+FORMFORGE_SCHEDULER_LEASE_SECONDS. A lease that is not renewed in time is
+free for the next process that asks, so the jobs move on when their holder
+stops. ``max_instances=1`` only keeps runs apart within one process, and two
+workers archiving the same rows would append to the same segment file.
+"""
+
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.archive import run_archive
+from app.config import settings
+from app.database import async_session
+from app.models import SchedulerLease, utcnow
+from app.retention import run_retention
+
+logger = logging.getLogger(__name__)
+
+
+class Lease:
+    """A named row in ``scheduler_leases``, held by this process while it renews it."""
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+        holder: str | None = None,
+    ):
+        self.name = name
+        self.session_factory = session_factory
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._valid_until = 0.0  # monotonic
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    async def renew(self) -> bool:
+        """Take the lease if it is free or already ours; whether we hold it now."""
+        started = time.monotonic()
+        now = utcnow()
+        seconds = settings.scheduler_lease_seconds
+        values = {"holder": self.holder, "expires_at": now + timedelta(seconds=seconds)}
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.holder == self.holder, SchedulerLease.expires_at < now),
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            acquired = result.rowcount == 1
+            if not acquired and await db.get(SchedulerLease, self.name) is None:
+                db.add(SchedulerLease(name=self.name, **values))
+                acquired = True
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Another process created the row first
+                await db.rollback()
+                acquired = False
+
+        if acquired != self.held:
+            logger.info(f"{'Took' if acquired else 'Lost'} the {self.name!r} scheduler lease")
+        self._valid_until = started + seconds if acquired else 0.0
+        return acquired
+
+    async def release(self) -> None:
+        """Give the lease up (on shutdown), so another process can take it at once."""
+        if not self.held:
+            return
+        self._valid_until = 0.0
+        async with self.session_factory() as db:
+            await db.execute(
+                delete(SchedulerLease).where(
+                    SchedulerLease.name == self.name, SchedulerLease.holder == self.holder
+                )
+            )
+            await db.commit()
+
+
+def _leased(lease: Lease, job):
+    async def run():
+        if lease.held:
+            await job()
+
+    run.__name__ = job.__name__
+    return run
+
+
+def create_scheduler(lease: Lease):
+    # Imported here so that loading the app (tests, CLI tools) skips APScheduler
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    if settings.retention_enabled:
+        scheduler.add_job(
+            _leased(lease, run_retention),
+            "interval",
+            minutes=settings.retention_interval_minutes,
+            id="retention",
+            max_instances=1,
+            coalesce=True,
+        )
+    if settings.archive_after_days:
+        scheduler.add_job(
+            _leased(lease, run_archive),
+            "interval",
+            minutes=settings.archive_interval_minutes,
+            id="archive",
+            max_instances=1,
+            coalesce=True,
+        )
+    if scheduler.get_jobs():
+        scheduler.add_job(
+            lease.renew,
+            "interval",
+            seconds=max(1, settings.scheduler_lease_seconds / 3),
+            id="lease",
+            next_run_time=datetime.now(UTC),
+            max_instances=1,
+            coalesce=True,
+        )
+    return scheduler
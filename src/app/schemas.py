@@ -32,6 +32,14 @@ class FormCreate(BaseModel):
     redirect_url: str | None = Field(default=None, max_length=500)
     email_notifications: bool = True
     notification_email: str | None = Field(default=None, max_length=320)
+    retention_days: int | None = Field(default=None, ge=1)
+    retention_max_rows: int | None = Field(default=None, ge=1)
+    spam_retention_days: int | None = Field(default=None, ge=1)
+    dedup_window_seconds: int | None = Field(default=None, ge=1)
+    max_body_bytes: int | None = Field(default=None, ge=1)
+    max_fields: int | None = Field(default=None, ge=1)
+    max_field_length: int | None = Field(default=None, ge=1)
+    max_nesting_depth: int | None = Field(default=None, ge=1)
 
 
 class FormUpdate(BaseModel):
@@ -41,6 +49,14 @@ class FormUpdate(BaseModel):
     email_notifications: bool | None = None
     notification_email: str | None = None
     is_active: bool | None = None
+    retention_days: int | None = Field(default=None, ge=1)
+    retention_max_rows: int | None = Field(default=None, ge=1)
+    spam_retention_days: int | None = Field(default=None, ge=1)
+    dedup_window_seconds: int | None = Field(default=None, ge=1)
+    max_body_bytes: int | None = Field(default=None, ge=1)
+    max_fields: int | None = Field(default=None, ge=1)
+    max_field_length: int | None = Field(default=None, ge=1)
+    max_nesting_depth: int | None = Field(default=None, ge=1)
 
 
 class FormResponse(BaseModel):
@@ -52,6 +68,15 @@ class FormResponse(BaseModel):
     email_notifications: bool
     notification_email: str | None
     is_active: bool
+    retention_days: int | None = None
+    retention_max_rows: int | None = None
+    spam_retention_days: int | None = None
+    dedup_window_seconds: int | None = None
+    max_body_bytes: int | None = None
+    max_fields: int | None = None
+    max_field_length: int | None = None
+    max_nesting_depth: int | None = None
+    has_webhooks: bool = False
     created_at: datetime
     submission_count: int = 0
 
@@ -63,6 +88,36 @@ class FormListResponse(BaseModel):
     total: int
 
 
+# --- Webhooks ---
+_WEBHOOK_URL = r"^https?://\S+$"
+
+
+class WebhookCreate(BaseModel):
+    url: str = Field(..., max_length=500, pattern=_WEBHOOK_URL)
+    batch_size: int = Field(default=1, ge=1, le=100)
+    batch_wait_ms: int = Field(default=1000, ge=0, le=60_000)
+    is_active: bool = True
+
+
+class WebhookUpdate(BaseModel):
+    url: str | None = Field(default=None, max_length=500, pattern=_WEBHOOK_URL)
+    batch_size: int | None = Field(default=None, ge=1, le=100)
+    batch_wait_ms: int | None = Field(default=None, ge=0, le=60_000)
+    is_active: bool | None = None
+
+
+class WebhookResponse(BaseModel):
+    id: int
+    url: str
+    secret: str
+    batch_size: int
+    batch_wait_ms: int
+    is_active: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 # --- Submissions ---
 class SubmissionResponse(BaseModel):
     id: int
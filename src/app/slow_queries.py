@@ -0,0 +1,124 @@
+"""Slow-query log with ``EXPLAIN QUERY PLAN`` capture.
+
+Statements slower than ``FORMFORGE_SLOW_QUERY_MS`` are recorded from
+``app.database``'s cursor events. Parameter values never leave this module:
+only their types are logged, while the real values are used once to ask SQLite
+for the statement's plan on a separate connection, in a background task so the
+slow request is not made slower. Entries are written as JSON lines to a
+rotating file and the most recent ones are kept in memory for the admin API.
+"""
+
+import asyncio
+import json
+import logging
+import logging.handlers
+from collections import deque
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.metrics import Counter, registry
+from app.request_stats import current_stats
+from app.tasks import spawn
+
+logger = logging.getLogger(__name__)
+
+# Separate logger so entries go only to the rotating file, one JSON object per line
+_file_logger = logging.getLogger("formforge.slow_queries")
+_file_logger.propagate = False
+_file_logger.setLevel(logging.INFO)
+_handler: logging.handlers.RotatingFileHandler | None = None
+
+_EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+recent: deque[dict] = deque(maxlen=200)
+
+# Plans by statement text, so a hot slow query is only explained once
+_plans: dict[str, list[str]] = {}
+_MAX_PLANS = 256
+
+slow_queries_total = registry.register(
+    Counter(
+        "formforge_slow_queries_total",
+        "Statements slower than the slow-query threshold.",
+        ("statement",),
+    )
+)
+
+
+def redact_parameters(parameters) -> list[str] | dict[str, str] | None:
+    """Replace bound values with their type names (``str``, ``int``, ...)."""
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in parameters]
+
+
+def _write(entry: dict) -> None:
+    global _handler
+    path = Path(settings.slow_query_log_file)
+    if _handler is None or _handler.baseFilename != str(path.resolve()):
+        if _handler is not None:
+            _file_logger.removeHandler(_handler)
+            _handler.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=settings.slow_query_log_max_bytes,
+            backupCount=settings.slow_query_log_backups,
+            encoding="utf-8",
+        )
+        _file_logger.addHandler(_handler)
+    _file_logger.info(json.dumps(entry))
+
+
+async def _capture_plan(entry: dict, sync_engine: Engine, statement: str, parameters) -> None:
+    try:
+        async with AsyncEngine(sync_engine).connect() as conn:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            # Rows are (id, parent, notused, detail)
+            entry["plan"] = [row[-1] for row in result.all()]
+        if len(_plans) >= _MAX_PLANS:
+            _plans.pop(next(iter(_plans)))
+        _plans[statement] = entry["plan"]
+    except SQLAlchemyError as e:
+        entry["plan_error"] = str(e)
+    _write(entry)
+
+
+def record_slow_query(
+    sync_engine: Engine, statement: str, parameters, elapsed: float, executemany: bool
+) -> None:
+    """Log a slow statement. Called from ``after_cursor_execute``."""
+    keyword = statement.split(None, 1)[0].upper()
+    if keyword == "EXPLAIN":
+        return
+    slow_queries_total.inc(keyword)
+    stats = current_stats()
+    entry = {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "duration_ms": round(elapsed * 1000, 2),
+        "route": f"{stats.scope['method']} {stats.route}" if stats else None,
+        "statement": statement,
+        "parameters": None if executemany else redact_parameters(parameters),
+        "plan": None,
+    }
+    recent.append(entry)
+
+    if statement in _plans:
+        entry["plan"] = _plans[statement]
+    elif sync_engine.dialect.name == "sqlite" and keyword in _EXPLAINABLE and not executemany:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop (sync scripts): log without a plan
+            pass
+        else:
+            spawn(_capture_plan(entry, sync_engine, statement, parameters))
+            return
+    _write(entry)
@@ -0,0 +1,25 @@
+import asyncio
+from collections.abc import Coroutine
+
+from app.metrics import register_gauge
+
+# Strong references to fire-and-forget tasks; the event loop only keeps weak ones
+_background_tasks: set[asyncio.Task] = set()
+
+
+def spawn(coro: Coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def pending_tasks() -> int:
+    return len(_background_tasks)
+
+
+register_gauge(
+    "formforge_background_tasks",
+    "Fire-and-forget tasks (e.g. notification emails) not yet finished.",
+    pending_tasks,
+)
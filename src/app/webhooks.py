@@ -0,0 +1,391 @@
+"""Forwarding new submissions to the form owner's webhook endpoints.
+
+Ingest only calls ``enqueue``. It puts the submission on a bounded in-memory
+queue and returns without awaiting anything, and drops the event (counted in
+``formforge_webhook_events_dropped_total``) when the queue is full. A slow or
+dead endpoint therefore never holds up ``/f/{uuid}``. The rest runs in
+background tasks on the worker that took the submission:
+
+- A dispatcher task takes events off the queue, looks up the form's active
+  webhooks (cached for a few seconds) and hands the event to each one's
+  endpoint.
+- An endpoint sends one POST at a time. Each POST carries up to the webhook's
+  ``batch_size`` submissions, after waiting up to ``batch_wait_ms`` for a
+  batch to fill. While a POST is in flight, new events queue behind it, up to
+  FORMFORGE_WEBHOOK_MAX_PENDING; after that the oldest are dropped.
+- All POSTs share one pooled ``httpx.AsyncClient``. It uses keep-alive, and
+  HTTP/2 when FORMFORGE_WEBHOOK_HTTP2 is set and ``h2`` is installed. At most
+  FORMFORGE_WEBHOOK_CONCURRENCY POSTs run at once.
+- A network error, 408, 429 or 5xx is retried with jittered exponential
+  backoff. Other responses count as failures straight away.
+- After FORMFORGE_WEBHOOK_BREAKER_THRESHOLD consecutive failures, the
+  endpoint's circuit opens. Nothing is sent to it for
+  FORMFORGE_WEBHOOK_BREAKER_COOLDOWN seconds, and its batch waits with the
+  rest of its backlog. After that, one trial POST either closes the circuit
+  or opens it again.
+
+Webhook URLs must resolve to public addresses. ``check_url`` runs when a
+webhook is created or changed and again before every POST, so a hostname
+later pointed at loopback, a private network, a link-local address (such as
+the cloud metadata service at 169.254.169.254) or a reserved range is refused
+rather than letting users make the server call its own network.
+FORMFORGE_WEBHOOK_ALLOW_PRIVATE lifts this for self-hosted setups.
+
+Delivery is best effort: events still in memory are lost when the worker
+exits. Every POST body has the shape
+``{"event": "submission.created", "form": {...}, "submissions": [...]}``.
+Each POST is signed with the webhook's secret in an
+``X-FormForge-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">``
+header (see ``sign``).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import time
+from collections import deque
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from urllib.parse import urlsplit
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.metrics import Counter, Histogram, register_gauge, registry
+from app.models import Form, Webhook
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-FormForge-Signature"
+# How long a form's webhook list is reused before it is read again
+_TARGET_TTL = 10.0
+
+webhook_deliveries_total = registry.register(
+    Counter(
+        "formforge_webhook_deliveries_total",
+        "Submissions forwarded to webhooks, by outcome (delivered, failed).",
+        ("outcome",),
+    )
+)
+webhook_events_dropped_total = registry.register(
+    Counter(
+        "formforge_webhook_events_dropped_total",
+        "Submissions not forwarded because a bound was hit (queue_full, backlog).",
+        ("reason",),
+    )
+)
+webhook_circuit_opened_total = registry.register(
+    Counter(
+        "formforge_webhook_circuit_opened_total",
+        "Times a webhook endpoint's circuit breaker opened.",
+    )
+)
+webhook_post_duration = registry.register(
+    Histogram(
+        "formforge_webhook_post_duration_seconds",
+        "Time for one webhook POST, including failed attempts.",
+    )
+)
+
+
+@dataclass(frozen=True)
+class Target:
+    id: int
+    url: str
+    secret: str
+    batch_size: int
+    batch_wait: float  # seconds
+
+
+def sign(secret: str, body: bytes, timestamp: int | None = None) -> str:
+    """The ``X-FormForge-Signature`` value for ``body``."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = str(timestamp).encode() + b"." + body
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+class UnsafeWebhookURL(ValueError):
+    """A webhook URL that is malformed or reaches a non-public address."""
+
+
+async def _addresses(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [sockaddr[0] for *_, sockaddr in infos]
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])  # drop an IPv6 zone id
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def check_url(url: str) -> None:
+    """Raise ``UnsafeWebhookURL`` unless every address of the URL's host is public.
+
+    A host that does not resolve raises ``OSError``.
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError as e:
+        raise UnsafeWebhookURL(f"Invalid URL: {e}") from None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeWebhookURL("Webhook URLs need an http(s) scheme and a host")
+    if settings.webhook_allow_private:
+        return
+    try:
+        addresses = await _addresses(parts.hostname, port)
+    except UnicodeError:
+        raise UnsafeWebhookURL(f"Invalid host {parts.hostname!r}") from None
+    for address in addresses:
+        if not _is_public(address):
+            raise UnsafeWebhookURL(f"{parts.hostname} resolves to a non-public address")
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(settings.webhook_backoff_max, settings.webhook_backoff_base * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class _Endpoint:
+    """One webhook's backlog, batching, retries and circuit breaker."""
+
+    def __init__(self, dispatcher: "WebhookDispatcher", form_id: int, target: Target):
+        self.dispatcher = dispatcher
+        self.form_id = form_id
+        self.target = target
+        self.pending: deque[tuple[dict, dict]] = deque()
+        self.failures = 0  # consecutive
+        self.open_until = 0.0  # monotonic time the circuit stays open until
+        self._arrived = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add(self, form: dict, submission: dict) -> None:
+        while len(self.pending) >= settings.webhook_max_pending:
+            self.pending.popleft()
+            webhook_events_dropped_total.inc("backlog")
+        self.pending.append((form, submission))
+        self._arrived.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._pump())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _pump(self) -> None:
+        while self.pending:
+            wait = self.open_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._fill()
+            size = min(self.target.batch_size, len(self.pending))
+            batch = [self.pending.popleft() for _ in range(size)]
+            await self._deliver(batch)
+
+    async def _fill(self) -> None:
+        """Wait up to ``batch_wait`` for a full batch."""
+        deadline = time.monotonic() + self.target.batch_wait
+        while len(self.pending) < self.target.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except TimeoutError:
+                return
+
+    async def _deliver(self, batch: list[tuple[dict, dict]]) -> None:
+        body = json.dumps(
+            {
+                "event": "submission.created",
+                "form": batch[0][0],
+                "submissions": [submission for _, submission in batch],
+            }
+        ).encode()
+        attempt = 0
+        while True:
+            attempt += 1
+            ok, retryable = await self.dispatcher.post(self.target, body)
+            if ok:
+                self.failures = 0
+                webhook_deliveries_total.inc("delivered", amount=len(batch))
+                return
+            self.failures += 1
+            if self.failures >= settings.webhook_breaker_threshold:
+                # Keep the batch at the front of the backlog until the circuit closes
+                logger.warning(f"Webhook {self.target.id} failing, pausing deliveries")
+                self.open_until = time.monotonic() + settings.webhook_breaker_cooldown
+                webhook_circuit_opened_total.inc()
+                self.pending.extendleft(reversed(batch))
+                return
+            if not retryable or attempt >= settings.webhook_max_attempts:
+                webhook_deliveries_total.inc("failed", amount=len(batch))
+                return
+            await asyncio.sleep(_backoff(attempt))
+
+
+class WebhookDispatcher:
+    def __init__(self):
+        self.session_factory: async_sessionmaker[AsyncSession] = async_session
+        # Set to an httpx transport (e.g. httpx.MockTransport) to bypass the network
+        self.transport = None
+        self.endpoints: dict[int, _Endpoint] = {}
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._targets: dict[int, tuple[float, list[Target]]] = {}
+        self._client = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def enqueue(self, form: Form, submission_id: int, data: dict) -> None:
+        """Queue a stored submission for the form's webhooks. Never waits."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=settings.webhook_queue_size)
+            self._semaphore = asyncio.Semaphore(settings.webhook_concurrency)
+            self._task = asyncio.create_task(self._run())
+        event = (
+            form.id,
+            {"id": form.id, "uuid": form.uuid, "name": form.name},
+            {
+                "id": submission_id,
+                "data": data,
+                "created_at": datetime.now(UTC).replace(tzinfo=None).isoformat(),
+            },
+        )
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            webhook_events_dropped_total.inc("queue_full")
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def invalidate(self, form_id: int, active_ids: Collection[int] = ()) -> None:
+        """Forget the cached webhook list after it changes.
+
+        Endpoints of the form's deleted or paused webhooks are stopped, and their
+        backlog dropped. Other workers do the same on their next lookup.
+        """
+        self._targets.pop(form_id, None)
+        self._prune(form_id, active_ids)
+
+    def _prune(self, form_id: int, active_ids: Collection[int]) -> None:
+        for webhook_id, endpoint in list(self.endpoints.items()):
+            if endpoint.form_id == form_id and webhook_id not in active_ids:
+                endpoint.stop()
+                del self.endpoints[webhook_id]
+
+    async def _run(self) -> None:
+        while True:
+            form_id, form, submission = await self._queue.get()
+            try:
+                targets = await self._targets_for(form_id)
+            except SQLAlchemyError as e:
+                logger.error(f"Failed to load webhooks for form {form_id}: {e}")
+                continue
+            for target in targets:
+                endpoint = self.endpoints.get(target.id)
+                if endpoint is None:
+                    endpoint = self.endpoints[target.id] = _Endpoint(self, form_id, target)
+                endpoint.target = target
+                endpoint.add(form, submission)
+
+    async def _targets_for(self, form_id: int) -> list[Target]:
+        cached = self._targets.get(form_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Webhook).where(Webhook.form_id == form_id, Webhook.is_active.is_(True))
+            )
+            targets = [
+                Target(w.id, w.url, w.secret, w.batch_size, w.batch_wait_ms / 1000)
+                for w in result.scalars()
+            ]
+        self._targets[form_id] = (time.monotonic() + _TARGET_TTL, targets)
+        self._prune(form_id, {target.id for target in targets})
+        return targets
+
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            http2 = settings.webhook_http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        'FORMFORGE_WEBHOOK_HTTP2 needs the h2 package (pip install "httpx[http2]"); '
+                        "using HTTP/1.1"
+                    )
+                    http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                transport=self.transport,
+                timeout=settings.webhook_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.webhook_concurrency,
+                    max_keepalive_connections=settings.webhook_concurrency,
+                ),
+                headers={"User-Agent": f"{settings.app_name}-Webhooks/{settings.app_version}"},
+            )
+        return self._client
+
+    async def post(self, target: Target, body: bytes) -> tuple[bool, bool]:
+        """POST one signed batch; (delivered, worth retrying)."""
+        import httpx
+
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign(target.secret, body),
+        }
+        async with self._semaphore:
+            with webhook_post_duration.time():
+                try:
+                    await check_url(target.url)
+                    client = self.client()
+                    response = await client.post(target.url, content=body, headers=headers)
+                except (UnsafeWebhookURL, httpx.InvalidURL) as e:
+                    logger.warning(f"Webhook {target.id} not sent: {e}")
+                    return False, False
+                except (httpx.HTTPError, OSError) as e:
+                    logger.info(f"Webhook {target.id} POST failed: {e!r}")
+                    return False, True
+        if response.is_success:
+            return True, False
+        logger.info(f"Webhook {target.id} answered {response.status_code}")
+        return False, response.status_code in (408, 429) or response.status_code >= 500
+
+    async def close(self) -> None:
+        """Stop background tasks and close the HTTP client (on shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+        for endpoint in self.endpoints.values():
+            endpoint.stop()
+        if self._client is not None:
+            await self._client.aclose()
+        self.endpoints.clear()
+        self._targets.clear()
+        self._task = self._queue = self._client = None
+
+
+dispatcher = WebhookDispatcher()
+
+register_gauge(
+    "formforge_webhook_queue_depth",
+    "Submissions waiting to be routed to webhook endpoints.",
+    dispatcher.queued,
+)
@@ -1,11 +1,16 @@
+import asyncio
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 from app.database import Base, get_db
+from app.idempotency import recent_keys
 from app.main import app
+from app.recent import recent
 from app.routers.submissions import clear_rate_limits
+from app.tasks import pending_tasks
 
 # Allow more submissions in tests
 settings.submissions_per_minute = 1000
@@ -27,6 +32,8 @@ app.dependency_overrides[get_db] = override_get_db
 @pytest.fixture(autouse=True)
 async def setup_database():
     clear_rate_limits()
+    recent_keys.clear()
+    recent.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -35,6 +42,20 @@ async def setup_database():
     await engine.dispose()
 
 
+async def drain():
+    """Wait (up to a second) for background tasks started by the app to finish."""
+    for _ in range(100):
+        if not pending_tasks():
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory bound to the test database, for code that opens its own sessions."""
+    return TestSessionLocal
+
+
 @pytest.fixture
 async def client():
     transport = ASGITransport(app=app)
@@ -0,0 +1,109 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.admission import AdmissionController, admission, shed_total
+from app.config import settings
+from app.database import get_db
+from app.main import create_app
+from app.metrics import submissions_total
+from tests.conftest import override_get_db
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+@pytest.fixture(autouse=True)
+def _fresh_admission():
+    admission.reset()
+    shed_total.clear()
+    yield
+    admission.reset()
+
+
+def test_worker_and_form_caps(monkeypatch):
+    monkeypatch.setattr(settings, "max_inflight_submissions", 3)
+    monkeypatch.setattr(settings, "max_inflight_per_form", 2)
+    controller = AdmissionController()
+
+    assert controller.try_enter("a") is None
+    assert controller.try_enter("a") is None
+    assert controller.try_enter("a") == "form"
+    assert controller.try_enter("b") is None
+    assert controller.try_enter("c") == "worker"
+    assert shed_total.value("form") == 1
+    assert shed_total.value("worker") == 1
+
+    controller.leave("a")
+    assert controller.try_enter("c") is None
+    for form in ("a", "b", "c"):
+        controller.leave(form)
+    assert controller.inflight == 0
+    assert controller.per_form == {}
+
+
+def test_zero_disables_caps(monkeypatch):
+    monkeypatch.setattr(settings, "max_inflight_submissions", 0)
+    monkeypatch.setattr(settings, "max_inflight_per_form", 0)
+    controller = AdmissionController()
+    assert all(controller.try_enter("a") is None for _ in range(1000))
+
+
+def test_adaptive_limit_follows_commit_latency(monkeypatch):
+    monkeypatch.setattr(settings, "max_inflight_submissions", 16)
+    monkeypatch.setattr(settings, "admission_adaptive", True)
+    monkeypatch.setattr(settings, "admission_target_commit_ms", 20)
+    controller = AdmissionController()
+    assert controller.limit == 16
+
+    for _ in range(200):
+        controller.observe_commit(0.2)
+    assert controller.limit == 2
+
+    for _ in range(2000):
+        controller.observe_commit(0.001)
+    assert controller.limit == 16
+
+    monkeypatch.setattr(settings, "admission_adaptive", False)
+    controller.observe_commit(5)
+    assert controller.limit == 16
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast_ingest", [True, False])
+async def test_overloaded_worker_sheds_with_retry_after(client, monkeypatch, fast_ingest):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Busy"})).json()
+    url = f"/f/{form['uuid']}"
+
+    monkeypatch.setattr(settings, "fast_ingest", fast_ingest)
+    monkeypatch.setattr(settings, "max_inflight_submissions", 1)
+    app = create_app("ingest")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ingest:
+        # Another request is still being processed
+        assert admission.try_enter("someone-else") is None
+        response = await ingest.post(url, json={"email": "a@example.com"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == str(settings.admission_retry_after)
+        assert shed_total.value("worker") == 1
+        # Preflights are not admission-controlled
+        assert (await ingest.options(url)).status_code == 200
+
+        admission.leave("someone-else")
+        response = await ingest.post(url, json={"email": "a@example.com"})
+        assert response.status_code == 200
+    assert admission.inflight == 0
+    assert submissions_total.value("accepted") >= 1
+
+    metrics = (await client.get("/metrics")).text
+    assert 'formforge_submissions_shed_total{reason="worker"} 1' in metrics
+    assert "formforge_submissions_inflight 0" in metrics
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.archive import run_archive, segment_path
+from app.config import settings
+from app.models import ArchiveSegment, Submission, utcnow
+from tests.conftest import drain
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+@pytest.fixture(autouse=True)
+def archive_settings(tmp_path):
+    original = settings.archive_dir, settings.archive_after_days, settings.archive_batch_size
+    settings.archive_dir = str(tmp_path / "archive")
+    settings.archive_after_days = 30
+    settings.archive_batch_size = 2
+    yield
+    settings.archive_dir, settings.archive_after_days, settings.archive_batch_size = original
+
+
+async def _form_with_old_submissions(client, session_factory):
+    """Five submissions; User 0-2 are backdated past the archive cutoff."""
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Archive Me"})).json()
+    for i in range(5):
+        await client.post(
+            f"/f/{form['uuid']}",
+            json={"name": f"User {i}"},
+            headers={"accept": "application/json"},
+        )
+    async with session_factory() as db:
+        for i, days in enumerate([90, 60, 45]):
+            await db.execute(
+                update(Submission)
+                .where(Submission.id == i + 1)
+                .values(created_at=utcnow() - timedelta(days=days))
+            )
+        await db.commit()
+    return form
+
+
+async def _hot_count(session_factory):
+    async with session_factory() as db:
+        return (await db.execute(select(func.count(Submission.id)))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_submissions(client, session_factory):
+    form = await _form_with_old_submissions(client, session_factory)
+
+    assert await run_archive(session_factory) == 3
+    assert await _hot_count(session_factory) == 2
+
+    async with session_factory() as db:
+        segments = (await db.execute(select(ArchiveSegment))).scalars().all()
+    assert sum(s.row_count for s in segments) == 3
+    for s in segments:
+        assert segment_path(form["id"], s.month).stat().st_size == s.size_bytes
+
+
+@pytest.mark.asyncio
+async def test_listing_reads_archive_transparently(client, session_factory):
+    form = await _form_with_old_submissions(client, session_factory)
+    await run_archive(session_factory)
+
+    page1 = (await client.get(f"/api/forms/{form['id']}/submissions?per_page=3")).json()
+    page2 = (await client.get(f"/api/forms/{form['id']}/submissions?page=2&per_page=3")).json()
+    assert page1["total"] == 5
+    names = [s["data"]["name"] for s in page1["submissions"] + page2["submissions"]]
+    assert names == ["User 4", "User 3", "User 2", "User 1", "User 0"]
+
+    form_resp = (await client.get(f"/api/forms/{form['id']}")).json()
+    assert form_resp["submission_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_search_and_export_include_archive(client, session_factory):
+    form = await _form_with_old_submissions(client, session_factory)
+    await run_archive(session_factory)
+
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions?search=user 1")).json()
+    assert resp["total"] == 1
+    assert resp["submissions"][0]["data"]["name"] == "User 1"
+
+    csv = await client.get(f"/api/forms/{form['id']}/export/csv")
+    assert len(csv.text.strip().split("\n")) == 6
+
+
+@pytest.mark.asyncio
+async def test_interrupted_append_is_truncated(client, session_factory):
+    form = await _form_with_old_submissions(client, session_factory)
+    await run_archive(session_factory)
+
+    async with session_factory() as db:
+        segment = (await db.execute(select(ArchiveSegment).limit(1))).scalar_one()
+    path = segment_path(form["id"], segment.month)
+    path.write_bytes(path.read_bytes() + b"garbage from a crashed run")
+
+    async with session_factory() as db:
+        await db.execute(
+            update(Submission)
+            .where(Submission.id == 4)
+            .values(created_at=datetime.fromisoformat(segment.month + "-15"))
+        )
+        await db.commit()
+    assert await run_archive(session_factory) == 1
+
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions")).json()
+    assert resp["total"] == 5
+    assert len(resp["submissions"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_delete_form_removes_archive(client, session_factory):
+    form = await _form_with_old_submissions(client, session_factory)
+    await run_archive(session_factory)
+
+    await client.delete(f"/api/forms/{form['id']}")
+    await drain()
+    async with session_factory() as db:
+        assert (await db.execute(select(func.count(ArchiveSegment.id)))).scalar() == 0
+    assert not (segment_path(form["id"], "2000-01").parent).exists()
@@ -0,0 +1,100 @@
+import gzip
+import re
+
+import pytest
+
+from app.assets import IMMUTABLE, TEMPLATES_DIR, build, rule, unknown_classes, utilities
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+def test_build_is_purged_hashed_and_precompressed(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "page.html").write_text(
+        '<div class="p-4 sm:px-6 hover:bg-brand-700 w-1/2">'
+        "<script>el.className = 'text-red-500';</script></div>"
+    )
+    out = tmp_path / "static"
+    name = build(templates, out)["app.css"]
+    assert re.fullmatch(r"app\.[0-9a-f]{12}\.css", name)
+
+    css = (out / name).read_text()
+    assert ".p-4{padding:1rem}" in css
+    assert ".hover\\:bg-brand-700:hover{background-color:rgb(29 78 216)}" in css
+    assert ".w-1\\/2{width:50%}" in css
+    assert "@media (min-width:640px){\n.sm\\:px-6{" in css
+    # Classes set from scripts count too; unused ones are left out
+    assert ".text-red-500{" in css
+    assert ".bg-red-900" not in css and ".p-8{" not in css
+    assert gzip.decompress((out / f"{name}.gz").read_bytes()).decode() == css
+
+    # Same input, same bytes; new classes, a new name and the old files gone
+    assert build(templates, out)["app.css"] == name
+    (templates / "page.html").write_text('<div class="p-8"></div>')
+    renamed = build(templates, out)["app.css"]
+    assert renamed != name
+    assert sorted(p.name for p in out.iterdir()) == sorted(
+        [renamed, f"{renamed}.gz", "manifest.json"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_pages_link_the_hashed_bundle(client):
+    await _register(client)
+    page = await client.get("/dashboard")
+    assert "cdn.tailwindcss.com" not in page.text
+    href = re.search(r'<link rel="stylesheet" href="(/static/app\.[0-9a-f]{12}\.css)">', page.text)
+    assert href
+
+    response = await client.get(href.group(1), headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert ".bg-gray-50{" in response.text
+
+    plain = await client.get(href.group(1), headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == response.text
+    assert plain.headers["cache-control"] == IMMUTABLE
+
+    revalidated = await client.get(
+        href.group(1),
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_rule_variants_and_order():
+    assert rule("bg-purple-500") is None
+    assert rule("wobble:p-4") is None
+    assert rule("-p-4") is None
+    assert rule("-mt-0.5")[1] == ".-mt-0\\.5{margin-top:-0.125rem}"
+    assert rule("group-hover:text-white")[1] == (
+        ".group:hover .group-hover\\:text-white{color:rgb(255 255 255)}"
+    )
+    assert rule("max-w-[200px]")[1] == ".max-w-\\[200px\\]{max-width:200px}"
+    assert rule("space-y-4")[1] == (".space-y-4 > :not([hidden]) ~ :not([hidden]){margin-top:1rem}")
+
+    # The more specific utility comes later, whatever the names
+    css = utilities({"pt-2", "p-4", "shadow-brand-200", "shadow-lg", "leading-tight", "text-sm"})
+    order = [line.split("{")[0] for line in css.splitlines()]
+    assert order.index(".p-4") < order.index(".pt-2")
+    assert order.index(".shadow-lg") < order.index(".shadow-brand-200")
+    assert order.index(".text-sm") < order.index(".leading-tight")
+
+
+def test_every_template_class_has_css():
+    assert unknown_classes(TEMPLATES_DIR) == []
@@ -0,0 +1,157 @@
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.body_limits import BodyLimits, limits_for
+from app.config import settings
+from app.database import get_db
+from app.main import create_app
+from app.metrics import submissions_total
+from app.models import Form
+from tests.conftest import override_get_db
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+@pytest.fixture(params=[True, False], ids=["fast", "fastapi"])
+async def ingest(request, monkeypatch):
+    """A client for /f/{uuid}, through the raw ASGI handler and through submit_form."""
+    monkeypatch.setattr(settings, "fast_ingest", request.param)
+    app = create_app("ingest")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _form(client, **fields) -> dict:
+    await _register(client)
+    response = await client.post("/api/forms/", json={"name": "Limited", **fields})
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _count(client, form) -> int:
+    return (await client.get(f"/api/forms/{form['id']}/submissions")).json()["total"]
+
+
+def test_form_limits_only_tighten(monkeypatch):
+    monkeypatch.setattr(settings, "max_body_bytes", 1000)
+    monkeypatch.setattr(settings, "max_fields", 0)
+    monkeypatch.setattr(settings, "max_field_length", 50)
+    monkeypatch.setattr(settings, "max_nesting_depth", 4)
+    form = Form(max_body_bytes=100, max_fields=5, max_field_length=500)
+    assert limits_for(form) == BodyLimits(100, 5, 50, 4)
+
+
+@pytest.mark.asyncio
+async def test_declared_length_over_limit_is_refused(client, ingest, monkeypatch):
+    form = await _form(client)
+    monkeypatch.setattr(settings, "max_body_bytes", 100)
+    before = submissions_total.value("too_large")
+
+    response = await ingest.post(f"/f/{form['uuid']}", json={"message": "x" * 200})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds 100 bytes"}
+    assert submissions_total.value("too_large") == before + 1
+
+    assert (await ingest.post(f"/f/{form['uuid']}", json={"message": "x"})).status_code == 200
+    assert await _count(client, form) == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_abandoned_at_the_limit(client, ingest, monkeypatch):
+    form = await _form(client)
+    monkeypatch.setattr(settings, "max_body_bytes", 1000)
+    sent = []
+
+    async def body():
+        for _ in range(100):
+            sent.append(1)
+            yield b"x" * 100
+
+    # No Content-Length: the only way to notice is to count while reading
+    response = await ingest.post(
+        f"/f/{form['uuid']}", content=body(), headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 413
+    assert len(sent) <= 12
+    assert await _count(client, form) == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs, detail",
+    [
+        ({"json": {f"f{i}": i for i in range(6)}}, "Too many fields (limit 5)"),
+        ({"data": {f"f{i}": "v" for i in range(6)}}, "Too many fields (limit 5)"),
+        ({"files": {f"f{i}": (None, "v") for i in range(6)}}, "Too many fields (limit 5)"),
+        ({"json": {"message": "x" * 21}}, "Field exceeds 20 characters"),
+        ({"data": {"message": "x" * 21}}, "Field exceeds 20 characters"),
+        ({"json": {"k" * 21: "v"}}, "Field exceeds 20 characters"),
+        ({"json": {"a": {"b": {"c": 1}}}}, "Data is nested deeper than 2 levels"),
+        ({"json": {"a": [[1]]}}, "Data is nested deeper than 2 levels"),
+    ],
+)
+async def test_field_limits(client, ingest, kwargs, detail):
+    form = await _form(client, max_fields=5, max_field_length=20, max_nesting_depth=2)
+    response = await ingest.post(f"/f/{form['uuid']}", **kwargs)
+    assert response.status_code == 413
+    assert response.json() == {"detail": detail}
+    assert await _count(client, form) == 0
+
+
+@pytest.mark.asyncio
+async def test_within_limits_is_accepted(client, ingest):
+    form = await _form(client, max_fields=5, max_field_length=20, max_nesting_depth=2)
+    response = await ingest.post(
+        f"/f/{form['uuid']}", json={"message": "x" * 20, "tags": ["a", "b"], "n": 1}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_json_too_deep_for_the_parser_is_413(client, ingest, monkeypatch):
+    form = await _form(client)
+    monkeypatch.setattr(settings, "max_nesting_depth", 0)
+    depth = 200_000
+    response = await ingest.post(
+        f"/f/{form['uuid']}",
+        content=b"[" * depth + b"]" * depth,
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Data is nested too deeply"}
+
+
+@pytest.mark.asyncio
+async def test_form_limits_round_trip(client):
+    form = await _form(client, max_body_bytes=2048)
+    assert form["max_body_bytes"] == 2048
+    assert form["max_fields"] is None
+
+    response = await client.put(f"/api/forms/{form['id']}", json={"max_fields": 10})
+    assert response.json()["max_fields"] == 10
+
+    response = await client.put(f"/api/forms/{form['id']}", json={"max_nesting_depth": 0})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_zero_disables_limits(client, ingest, monkeypatch):
+    form = await _form(client)
+    for name in BodyLimits._fields:
+        monkeypatch.setattr(settings, name, 0)
+    data = {f"f{i}": "x" * 2000 for i in range(1500)}
+    response = await ingest.post(f"/f/{form['uuid']}", content=json.dumps(data))
+    assert response.status_code == 200
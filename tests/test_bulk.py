@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app.config import settings
+from app.metrics import submissions_total
+from app.routers import bulk
+from tests.conftest import engine
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _form(client, **fields) -> dict:
+    await _register(client)
+    response = await client.post("/api/forms/", json={"name": "Import", **fields})
+    return response.json()
+
+
+def _url(form) -> str:
+    return f"/api/forms/{form['id']}/submissions/bulk"
+
+
+async def _stored(client, form) -> list[dict]:
+    response = await client.get(f"/api/forms/{form['id']}/submissions?per_page=1000")
+    return sorted((s["data"] for s in response.json()["submissions"]), key=json.dumps)
+
+
+@pytest.fixture
+def statements():
+    """First word of each SQL statement run against the test database, and COMMITs."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement.split(None, 1)[0].upper())
+
+    def commit(conn):
+        seen.append("COMMIT")
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    event.listen(engine.sync_engine, "commit", commit)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+    event.remove(engine.sync_engine, "commit", commit)
+
+
+@pytest.mark.asyncio
+async def test_json_array_is_inserted_in_chunks(client, monkeypatch, statements):
+    monkeypatch.setattr(settings, "bulk_chunk_size", 4)
+    form = await _form(client)
+    items = [{"email": f"user{i}@example.com", "_source": "crm"} for i in range(10)]
+
+    statements.clear()
+    response = await client.post(_url(form), json=items)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["accepted"] == 10
+    assert body["rejected"] == 0
+    assert [r["index"] for r in body["results"]] == list(range(10))
+    assert all(r["status"] == "accepted" for r in body["results"])
+    assert len({r["id"] for r in body["results"]}) == 10
+
+    # 10 rows in chunks of 4: three multi-row INSERTs, one commit each
+    assert statements.count("INSERT") == 3
+    assert statements.count("COMMIT") == 3
+
+    # Each reported id is the row holding that item
+    response = await client.get(f"/api/forms/{form['id']}/submissions?per_page=100")
+    by_id = {s["id"]: s["data"] for s in response.json()["submissions"]}
+    assert [by_id[r["id"]] for r in body["results"]] == [{"email": i["email"]} for i in items]
+    assert submissions_total.value("accepted") >= 10
+
+
+@pytest.mark.asyncio
+async def test_ndjson_reports_each_line(client):
+    form = await _form(client, max_fields=2)
+    lines = [
+        b'{"email": "a@example.com"}',
+        b"",
+        b"{not json",
+        b'["a"]',
+        b'{"_only": "internal"}',
+        b'{"a": 1, "b": 2, "c": 3}',
+        b'{"email": "b@example.com"}',
+    ]
+    response = await client.post(
+        _url(form), content=b"\n".join(lines), headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["accepted"] == 2
+    assert body["rejected"] == 4
+    assert [(r["index"], r["status"], r.get("error")) for r in body["results"]] == [
+        (0, "accepted", None),
+        (1, "rejected", "Invalid JSON"),
+        (2, "rejected", "Expected a JSON object"),
+        (3, "rejected", "No form data received"),
+        (4, "rejected", "Too many fields (limit 2)"),
+        (5, "accepted", None),
+    ]
+    assert len(await _stored(client, form)) == 2
+
+
+@pytest.mark.asyncio
+async def test_ndjson_line_over_form_limit_is_skipped(client):
+    form = await _form(client, max_body_bytes=50)
+
+    async def body():
+        yield b'{"email": "a@example.com"}\n{"message": "'
+        for _ in range(10):
+            yield b"x" * 40
+        yield b'"}\n{"email": "b@example.com"}'
+
+    response = await client.post(
+        _url(form), content=body(), headers={"Content-Type": "application/x-ndjson"}
+    )
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["accepted", "rejected", "accepted"]
+    assert results[1]["error"] == "Submission exceeds 50 bytes"
+
+
+@pytest.mark.asyncio
+async def test_notifications_can_be_suppressed(client, monkeypatch):
+    sent = []
+
+    async def fake_notification(**kwargs):
+        sent.append(kwargs["submission_data"])
+
+    monkeypatch.setattr(bulk, "send_submission_notification", fake_notification)
+    form = await _form(client)
+
+    await client.post(_url(form) + "?notify=false", json=[{"a": 1}, {"a": 2}])
+    await client.post(_url(form), json=[{"a": 3}])
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert sent == [{"a": 3}]
+
+
+@pytest.mark.asyncio
+async def test_limits(client, monkeypatch):
+    form = await _form(client)
+    monkeypatch.setattr(settings, "bulk_max_items", 3)
+    monkeypatch.setattr(settings, "bulk_chunk_size", 2)
+
+    response = await client.post(_url(form), json=[{"a": i} for i in range(4)])
+    assert response.status_code == 413
+    assert await _stored(client, form) == []
+
+    # NDJSON is streamed: chunks before the cap are kept and reported
+    ndjson = b"\n".join(b'{"a": %d}' % i for i in range(4))
+    response = await client.post(
+        _url(form), content=ndjson, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 413
+    body = response.json()
+    assert body["detail"] == "More than 3 submissions in one request"
+    assert body["accepted"] == 3
+    assert len(await _stored(client, form)) == 3
+
+    monkeypatch.setattr(settings, "bulk_max_body_bytes", 10)
+    response = await client.post(_url(form), json=[{"a": 1}, {"a": 2}])
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds 10 bytes"}
+
+
+@pytest.mark.asyncio
+async def test_bad_requests(client):
+    form = await _form(client)
+    assert (await client.post(_url(form), json={"a": 1})).status_code == 400
+    assert (await client.post(_url(form), content=b"[{")).status_code == 400
+    assert (await client.post("/api/forms/999/submissions/bulk", json=[])).status_code == 404
+
+    client.cookies.clear()
+    assert (await client.post(_url(form), json=[{"a": 1}])).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_inactive_form_is_refused(client):
+    form = await _form(client)
+    await client.put(f"/api/forms/{form['id']}", json={"is_active": False})
+    response = await client.post(_url(form), json=[{"email": "late@example.com"}])
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Form is inactive"
+    assert await _stored(client, form) == []
@@ -0,0 +1,160 @@
+import json
+
+import pytest
+from sqlalchemy import select, text
+
+from app.compression import (
+    compress_data,
+    decompress_data,
+    forget_dictionaries,
+    save_dictionary,
+    train_dictionary,
+)
+from app.config import settings
+from app.database import engine
+from app.models import Submission
+from app.recompress import recompress
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+def _payload(i):
+    return {
+        "name": f"User {i}",
+        "email": f"user{i}@example.com",
+        "message": f"Hello, I would like to hear more about your product. Ticket {i}. " * 4,
+    }
+
+
+@pytest.fixture
+def compression():
+    original = settings.submission_compression
+    settings.submission_compression = "zlib"
+    forget_dictionaries()
+    yield
+    settings.submission_compression = original
+    forget_dictionaries()
+
+
+async def _storage_types(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(text("SELECT typeof(data) FROM submissions ORDER BY id"))
+        return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_plain_and_dictionary(session_factory, compression):
+    raw = json.dumps(_payload(1))
+    blob = compress_data(raw)
+    assert isinstance(blob, bytes) and blob[:2] == b"\x00z"
+    assert decompress_data(blob) == raw
+
+    zdict = train_dictionary([json.dumps(_payload(i)) for i in range(20)])
+    async with session_factory() as db:
+        dict_id = await save_dictionary(db, zdict)
+    with_dict = compress_data(raw, dict_id)
+    assert with_dict[:2] == b"\x00d"
+    assert len(with_dict) < len(blob)
+    assert decompress_data(with_dict) == raw
+
+
+def test_small_or_disabled_values_stay_text(compression):
+    assert compress_data('{"a": 1}') == '{"a": 1}'
+    settings.submission_compression = "none"
+    raw = json.dumps(_payload(1))
+    assert compress_data(raw) == raw
+    assert decompress_data(raw) == raw
+
+
+def test_udf_only_while_compression_is_on(compression):
+    query = select(Submission.data)
+    compressed_key = query._generate_cache_key()
+    assert "ff_data(" in str(query.compile(engine))
+    settings.submission_compression = "none"
+    plain = select(Submission.data)
+    assert "ff_data(" not in str(plain.compile(engine))
+    # Compiled statements are cached per setting, not reused across it
+    assert plain._generate_cache_key() != compressed_key
+
+
+@pytest.mark.asyncio
+async def test_compressed_submissions_read_and_search(client, session_factory, compression):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Long Form"})).json()
+    for i in range(3):
+        await client.post(
+            f"/f/{form['uuid']}", json=_payload(i), headers={"accept": "application/json"}
+        )
+
+    assert await _storage_types(session_factory) == ["blob"] * 3
+
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions")).json()
+    assert resp["submissions"][0]["data"] == _payload(2)
+
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions?search=user1@")).json()
+    assert resp["total"] == 1
+
+    csv = await client.get(f"/api/forms/{form['id']}/export/csv")
+    assert "Ticket 0" in csv.text
+
+
+@pytest.mark.asyncio
+async def test_recompress_existing_rows(client, session_factory, compression):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Legacy"})).json()
+    settings.submission_compression = "none"
+    for i in range(5):
+        await client.post(
+            f"/f/{form['uuid']}", json=_payload(i), headers={"accept": "application/json"}
+        )
+    assert await _storage_types(session_factory) == ["text"] * 5
+
+    settings.submission_compression = "zlib"
+    stats = await recompress(batch_size=2, train=True, session_factory=session_factory)
+    assert stats["rows"] == 5
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert await _storage_types(session_factory) == ["blob"] * 5
+
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions")).json()
+    assert [s["data"] for s in resp["submissions"]] == [_payload(i) for i in range(4, -1, -1)]
+
+    settings.submission_compression = "none"
+    await recompress(session_factory=session_factory)
+    assert await _storage_types(session_factory) == ["text"] * 5
+
+
+@pytest.mark.asyncio
+async def test_dictionaries_travel_with_the_database(client, session_factory, compression):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Restored"})).json()
+    for i in range(3):
+        await client.post(
+            f"/f/{form['uuid']}", json=_payload(i), headers={"accept": "application/json"}
+        )
+    await recompress(train=True, session_factory=session_factory)
+    async with session_factory() as db:
+        result = await db.execute(text("SELECT hex(substr(data, 1, 2)) FROM submissions"))
+        assert set(result.scalars()) == {"0064"}
+
+    # A worker that never saw the dictionary, as after restoring a backup elsewhere
+    forget_dictionaries()
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions?search=user1@")).json()
+    assert [s["data"] for s in resp["submissions"]] == [_payload(1)]
+
+    forget_dictionaries()
+    resp = await client.post(
+        f"/f/{form['uuid']}", json=_payload(3), headers={"accept": "application/json"}
+    )
+    assert resp.status_code == 200
+    resp = (await client.get(f"/api/forms/{form['id']}/submissions")).json()
+    assert resp["submissions"][0]["data"] == _payload(3)
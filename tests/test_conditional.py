@@ -0,0 +1,168 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+from sqlalchemy import event
+from starlette.requests import Request
+
+from app.conditional import Validators, not_modified
+from app.recent import recent
+from tests.conftest import engine
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _form(client) -> dict:
+    await _register(client)
+    return (await client.post("/api/forms/", json={"name": "Cached"})).json()
+
+
+async def _revalidate(client, url: str, etag: str):
+    return await client.get(url, headers={"If-None-Match": etag})
+
+
+@pytest.fixture
+def submission_queries():
+    """SQL statements that read the submissions table."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM submissions" in statement:
+            seen.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_submissions_list_revalidates(client, submission_queries):
+    form = await _form(client)
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    url = f"/api/forms/{form['id']}/submissions"
+
+    first = await client.get(url)
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" in first.headers
+
+    # Page 1 is answered from the recent-submissions cache without touching the table
+    submission_queries.clear()
+    response = await _revalidate(client, url, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert submission_queries == []
+
+    # Rebuilt from the database, the validators are the same
+    recent.clear()
+    assert (await _revalidate(client, url, etag)).status_code == 304
+
+    await client.post(f"/f/{form['uuid']}", json={"n": 2})
+    response = await _revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_not_modified_skips_page_queries(client, submission_queries):
+    form = await _form(client)
+    await client.post(f"/f/{form['uuid']}", json={"email": "a@example.com"})
+    url = f"/api/forms/{form['id']}/submissions?search=example"
+    etag = (await client.get(url)).headers["etag"]
+
+    submission_queries.clear()
+    assert (await _revalidate(client, url, etag)).status_code == 304
+    # Only the grouped stats query ran, not the search COUNT or the page SELECT
+    assert len(submission_queries) == 1
+    assert "GROUP BY" in submission_queries[0]
+
+    # Other query parameters get other validators
+    other = await _revalidate(client, f"/api/forms/{form['id']}/submissions?search=nope", etag)
+    assert other.status_code == 200
+    assert other.json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_forms_list_and_dashboard_revalidate(client):
+    form = await _form(client)
+    for url in ("/api/forms/", "/dashboard", f"/dashboard/forms/{form['id']}"):
+        first = await client.get(url)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert (await _revalidate(client, url, etag)).status_code == 304
+
+        # Editing the form changes every view of it
+        await client.put(f"/api/forms/{form['id']}", json={"name": f"Renamed {url}"})
+        response = await _revalidate(client, url, etag)
+        assert response.status_code == 200
+        assert f"Renamed {url}" in response.text
+
+    etag = (await client.get("/api/forms/")).headers["etag"]
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    response = await _revalidate(client, "/api/forms/", etag)
+    assert response.status_code == 200
+    assert response.json()["forms"][0]["submission_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_if_modified_since(client):
+    form = await _form(client)
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    url = f"/dashboard/forms/{form['id']}"
+    last_modified = (await client.get(url)).headers["last-modified"]
+
+    response = await client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    earlier = format_datetime(datetime(2000, 1, 1, tzinfo=UTC), usegmt=True)
+    response = await client.get(url, headers={"If-Modified-Since": earlier})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_restoring_spam_touches_the_form(client):
+    form = await _form(client)
+    await client.post(f"/f/{form['uuid']}", json={"n": 1, "_gotcha": "bot"})
+    url = f"/api/forms/{form['id']}/submissions"
+    before = (await client.get(url)).headers
+
+    spam = (await client.get(f"/api/forms/{form['id']}/spam")).json()["submissions"]
+    await client.post(f"/api/forms/{form['id']}/spam/{spam[0]['id']}/restore")
+    after = (await _revalidate(client, url, before["etag"])).headers
+    assert after["etag"] != before["etag"]
+    modified = [parsedate_to_datetime(h["last-modified"]) for h in (before, after)]
+    assert modified[1] >= modified[0]
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_validator_matching():
+    current = Validators('W/"abc"', datetime(2026, 1, 2, 3, 4, 5, 678))
+    assert not_modified(_request(if_none_match='"abc"'), current) is not None
+    assert not_modified(_request(if_none_match='W/"x", W/"abc"'), current) is not None
+    assert not_modified(_request(if_none_match="*"), current) is not None
+    assert not_modified(_request(if_none_match='W/"x"'), current) is None
+    # If-Modified-Since is only a fallback for clients that send no ETag
+    modified = "Fri, 02 Jan 2026 03:04:05 GMT"
+    both = _request(if_none_match='W/"x"', if_modified_since=modified)
+    assert not_modified(both, current) is None
+    assert not_modified(_request(if_modified_since=modified), current) is not None
+    earlier = "Fri, 02 Jan 2026 03:04:04 GMT"
+    assert not_modified(_request(if_modified_since=earlier), current) is None
+    assert not_modified(_request(if_modified_since="yesterday"), current) is None
+    assert not_modified(_request(), current) is None
@@ -0,0 +1,141 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.database import Base, get_db
+from app.idempotency import recent_keys
+from app.main import create_app
+from app.models import Form, Submission, User
+from app.routers import fast_submit
+from app.routers.submissions import clear_rate_limits
+from tests.conftest import TestSessionLocal, engine, override_get_db
+
+FORM_UUID = "0b7d0c52-3c8c-4a43-9a31-6a8f4cbb2d10"
+URL = f"/f/{FORM_UUID}"
+JSON = {"Accept": "application/json"}
+HTML = {"Accept": "text/html"}
+
+# Each scenario is a list of (method, kwargs) sent in order against a fresh database
+SCENARIOS = {
+    "json": [("POST", {"json": {"email": "a@example.com"}, "headers": JSON})],
+    "urlencoded": [("POST", {"data": {"email": "a@example.com", "n": "é & +"}, "headers": JSON})],
+    "multipart": [
+        ("POST", {"data": {"email": "a@example.com"}, "files": {"msg": (None, "hi")}}),
+    ],
+    "untyped_json": [("POST", {"content": b'{"email": "a@example.com"}'})],
+    "untyped_form": [("POST", {"content": b"email=a%40example.com"})],
+    "invalid_json": [
+        ("POST", {"content": b"{nope", "headers": {"Content-Type": "application/json"}}),
+    ],
+    "json_not_object": [("POST", {"json": ["a", "b"]})],
+    "empty_body": [("POST", {"content": b""})],
+    "only_internal_fields": [("POST", {"json": {"_next": "/x"}})],
+    "honeypot": [("POST", {"json": {"email": "bot@example.com", "_gotcha": "x"}})],
+    "thank_you_page": [("POST", {"data": {"email": "a@example.com"}, "headers": HTML})],
+    "html_and_json_accept": [
+        ("POST", {"json": {"a": 1}, "headers": {"Accept": "text/html, application/json"}}),
+    ],
+    "unknown_form": [("POST", {"json": {"a": 1}, "url": "/f/does-not-exist"})],
+    "wrong_method": [("GET", {}), ("PUT", {"json": {"a": 1}})],
+    "preflight": [
+        ("OPTIONS", {"headers": {"Origin": "https://site.example"}}),
+        ("OPTIONS", {"url": "/f/does-not-exist"}),
+    ],
+    "idempotency": [
+        ("POST", {"json": {"a": 1}, "headers": {"Idempotency-Key": "k1"}}),
+        ("POST", {"json": {"a": 1}, "headers": {"Idempotency-Key": "k1"}}),
+        ("POST", {"json": {"a": 2}, "headers": {"Idempotency-Key": "k" * 300}}),
+    ],
+    "body_limits": [
+        ("POST", {"json": {"message": "x" * 100}}),
+        ("POST", {"data": {"a": "1", "b": "2", "c": "3"}}),
+        # Another client, so the rate limit (2/min here) does not answer first
+        ("POST", {"json": {"a": {"b": {"c": {}}}}, "headers": {"X-Forwarded-For": "192.0.2.1"}}),
+    ],
+    "rate_limit": [
+        ("POST", {"json": {"n": i}, "headers": {"X-Forwarded-For": "203.0.113.9, 10.0.0.1"}})
+        for i in range(3)
+    ],
+}
+
+FORM_VARIANTS = {
+    "default": {},
+    "redirect": {"redirect_url": "https://site.example/thanks?from=ff"},
+    "restricted": {"allowed_origins": "https://site.example, https://other.example"},
+    "inactive": {"is_active": False},
+    "limited": {"max_body_bytes": 64, "max_fields": 2, "max_nesting_depth": 2},
+}
+
+
+async def _reset(**form_fields) -> None:
+    clear_rate_limits()
+    recent_keys.clear()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with TestSessionLocal() as session:
+        user = User(email="owner@example.com", hashed_password="x", name="Owner")
+        session.add(user)
+        await session.flush()
+        session.add(Form(uuid=FORM_UUID, name="Contact", owner_id=user.id, **form_fields))
+        await session.commit()
+
+
+async def _run(fast: bool, requests, form_fields) -> list[tuple]:
+    settings.fast_ingest = fast
+    app = create_app("all")
+    app.dependency_overrides[get_db] = override_get_db
+    await _reset(**form_fields)
+    results = []
+    transport = ASGITransport(app=app, client=("198.51.100.7", 1234))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for method, kwargs in requests:
+            kwargs = dict(kwargs)
+            response = await client.request(method, kwargs.pop("url", URL), **kwargs)
+            headers = dict(response.headers)
+            headers.pop("server-timing", None)  # wall-clock, differs run to run
+            # submit_form's 405 only lists OPTIONS (the first partial match); the fast route
+            # lists both methods, in set order
+            if "allow" in headers:
+                headers["allow"] = "OPTIONS" if fast else headers["allow"]
+            results.append((response.status_code, headers, response.content))
+    async with TestSessionLocal() as session:
+        rows = (await session.execute(Submission.__table__.select())).all()
+    results.append(sorted((row.data, row.ip_address, row.idempotency_key) for row in rows))
+    return results
+
+
+@pytest.fixture(autouse=True)
+def _restore_fast_ingest(monkeypatch):
+    monkeypatch.setattr(settings, "fast_ingest", settings.fast_ingest)
+    monkeypatch.setattr(settings, "submissions_per_minute", 2)
+
+
+@pytest.mark.asyncio
+async def test_fast_route_answers_before_submit_form(monkeypatch):
+    handled = []
+    original = fast_submit._handle
+
+    async def spy(*args):
+        handled.append(args[0]["route"])
+        await original(*args)
+
+    monkeypatch.setattr(fast_submit, "_handle", spy)
+    results = await _run(True, SCENARIOS["json"], {})
+    assert results[0][0] == 200
+    assert handled == [fast_submit.fast_route]
+
+    handled.clear()
+    await _run(False, SCENARIOS["json"], {})
+    assert handled == []
+    assert fast_submit.fast_route not in create_app("dashboard").router.routes
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("variant", list(FORM_VARIANTS))
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+async def test_fast_path_matches_fastapi_route(scenario, variant):
+    requests, form_fields = SCENARIOS[scenario], FORM_VARIANTS[variant]
+    expected = await _run(False, requests, form_fields)
+    actual = await _run(True, requests, form_fields)
+    assert actual == expected
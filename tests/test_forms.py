@@ -1,5 +1,7 @@
 import pytest
 
+from tests.conftest import drain
+
 
 async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
     response = await client.post(
@@ -119,8 +121,9 @@ async def test_delete_form(client):
     form_id = create_resp.json()["id"]
 
     response = await client.delete(f"/api/forms/{form_id}")
-    assert response.status_code == 204
+    assert response.status_code == 202
 
+    await drain()
     response = await client.get(f"/api/forms/{form_id}")
     assert response.status_code == 404
 
@@ -0,0 +1,159 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.config import settings
+from app.idempotency import RecentKeys, recent_keys
+from app.routers.submissions import clear_rate_limits
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _create_form(client, **kwargs):
+    resp = await client.post("/api/forms/", json={"name": "Contact Form", **kwargs})
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _total(client, form):
+    return (await client.get(f"/api/forms/{form['id']}/submissions")).json()["total"]
+
+
+def test_recent_keys_evicts_least_recently_used():
+    keys = RecentKeys(maxsize=2)
+    keys.add(("a",))
+    keys.add(("b",))
+    assert keys.seen_since(("a",), 0)
+    keys.add(("c",))
+    assert len(keys) == 2
+    assert not keys.seen_since(("b",), 0)
+    assert keys.seen_since(("a",), 0)
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_without_writing(client):
+    await _register(client)
+    form = await _create_form(client)
+    headers = {"accept": "application/json", "idempotency-key": "order-42"}
+
+    with patch(
+        "app.routers.submissions.send_submission_notification", new_callable=AsyncMock
+    ) as notify:
+        first = await client.post(f"/f/{form['uuid']}", json={"name": "A"}, headers=headers)
+        second = await client.post(f"/f/{form['uuid']}", json={"name": "A"}, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert notify.call_count == 1
+    assert await _total(client, form) == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_enforced_by_unique_index(client):
+    await _register(client)
+    form = await _create_form(client)
+    headers = {"accept": "application/json", "idempotency-key": "retry-1"}
+
+    await client.post(f"/f/{form['uuid']}", json={"name": "A"}, headers=headers)
+    recent_keys.clear()  # e.g. another worker, or after a restart
+    resp = await client.post(f"/f/{form['uuid']}", json={"name": "A"}, headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.headers["idempotent-replayed"] == "true"
+    assert await _total(client, form) == 1
+
+
+@pytest.mark.asyncio
+async def test_replays_skip_the_rate_limit(client, monkeypatch):
+    await _register(client)
+    form = await _create_form(client)
+    monkeypatch.setattr(settings, "submissions_per_minute", 2)
+    clear_rate_limits()
+
+    def post(key):
+        headers = {"accept": "application/json", "idempotency-key": key}
+        return client.post(f"/f/{form['uuid']}", json={"name": key}, headers=headers)
+
+    assert (await post("first")).status_code == 200
+    for _ in range(3):
+        resp = await post("first")
+        assert resp.status_code == 200
+        assert resp.headers["idempotent-replayed"] == "true"
+    # The replays left the quota alone
+    assert (await post("second")).status_code == 200
+    assert (await post("third")).status_code == 429
+    assert (await post("first")).status_code == 200
+    assert await _total(client, form) == 2
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_separate_submissions(client):
+    await _register(client)
+    form = await _create_form(client)
+    for key in ("k1", "k2"):
+        await client.post(
+            f"/f/{form['uuid']}",
+            json={"name": "A"},
+            headers={"accept": "application/json", "idempotency-key": key},
+        )
+    assert await _total(client, form) == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_too_long(client):
+    await _register(client)
+    form = await _create_form(client)
+    resp = await client.post(
+        f"/f/{form['uuid']}",
+        json={"name": "A"},
+        headers={"accept": "application/json", "idempotency-key": "x" * 300},
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_content_hash_dedup_window(client):
+    await _register(client)
+    form = await _create_form(client, dedup_window_seconds=60)
+    assert form["dedup_window_seconds"] == 60
+
+    for _ in range(2):
+        resp = await client.post(
+            f"/f/{form['uuid']}",
+            json={"name": "Double", "email": "click@example.com"},
+            headers={"accept": "application/json"},
+        )
+        assert resp.status_code == 200
+    assert resp.headers["idempotent-replayed"] == "true"
+
+    recent_keys.clear()
+    resp = await client.post(
+        f"/f/{form['uuid']}",
+        json={"email": "click@example.com", "name": "Double"},
+        headers={"accept": "application/json"},
+    )
+    assert resp.headers["idempotent-replayed"] == "true"
+    assert await _total(client, form) == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_submissions_kept_without_dedup_window(client):
+    await _register(client)
+    form = await _create_form(client)
+    for _ in range(2):
+        await client.post(
+            f"/f/{form['uuid']}", json={"name": "Same"}, headers={"accept": "application/json"}
+        )
+    assert await _total(client, form) == 2
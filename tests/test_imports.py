@@ -0,0 +1,278 @@
+import json
+import tracemalloc
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from app import importer
+from app.importer import ImportConflict, InvalidImport, import_file, parse_timestamp
+from app.models import ImportJob, Submission
+from tests.conftest import drain
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _form(client, **fields) -> dict:
+    await _register(client)
+    response = await client.post("/api/forms/", json={"name": "Migrated", **fields})
+    return response.json()
+
+
+async def _rows(session_factory, form) -> list[tuple[dict, datetime]]:
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Submission.data, Submission.created_at)
+            .where(Submission.form_id == form["id"])
+            .order_by(Submission.id)
+        )
+        return [(json.loads(data), created_at) for data, created_at in result.all()]
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2023-04-05T06:07:08") == datetime(2023, 4, 5, 6, 7, 8)
+    assert parse_timestamp("2023-04-05T08:07:08+02:00") == datetime(2023, 4, 5, 6, 7, 8)
+    assert parse_timestamp("2023-04-05T06:07:08Z") == datetime(2023, 4, 5, 6, 7, 8)
+    assert parse_timestamp("1680674828") == datetime(2023, 4, 5, 6, 7, 8)
+    assert parse_timestamp(1680674828000) == datetime(2023, 4, 5, 6, 7, 8)
+    with pytest.raises(ValueError):
+        parse_timestamp("last tuesday")
+    with pytest.raises(TypeError):
+        parse_timestamp(["2023-04-05"])
+
+
+@pytest.mark.asyncio
+async def test_csv_import_maps_columns_and_keeps_timestamps(client, session_factory):
+    form = await _form(client)
+    csv_body = (
+        "﻿Email Address,Message,Internal,Date\r\n"
+        'a@example.com,"Hello, world",x,2023-01-02T03:04:05Z\r\n'
+        'b@example.com,"two\nlines with ""quotes""",,2023-01-03T00:00:00\r\n'
+        "\r\n"
+        "c@example.com,,,\r\n"
+        "too,many,cells,here,really\r\n"
+    ).encode()
+    mapping = json.dumps({"Email Address": "email", "Internal": None})
+    response = await client.post(
+        f"/api/forms/{form['id']}/imports?source=export.csv&timestamp_field=Date&mapping={mapping}",
+        content=csv_body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["source"] == "export.csv"
+    assert (job["records_done"], job["imported"], job["rejected"]) == (4, 3, 1)
+    assert job["errors"] == [{"record": 4, "error": "Expected 4 columns, got 5"}]
+    assert job["bytes_done"] == len(csv_body)
+
+    rows = await _rows(session_factory, form)
+    assert [data for data, _ in rows] == [
+        {"email": "a@example.com", "Message": "Hello, world"},
+        {"email": "b@example.com", "Message": 'two\nlines with "quotes"'},
+        {"email": "c@example.com"},
+    ]
+    assert rows[0][1] == datetime(2023, 1, 2, 3, 4, 5)
+    assert rows[1][1] == datetime(2023, 1, 3)
+    # No timestamp: stamped at import time
+    assert rows[2][1].year >= 2026
+
+    listed = (await client.get(f"/api/forms/{form['id']}/imports")).json()["imports"]
+    assert [j["id"] for j in listed] == [job["id"]]
+    assert (await client.get(f"/api/forms/{form['id']}/imports/{job['id']}")).json() == job
+
+
+@pytest.mark.asyncio
+async def test_own_csv_export_round_trips(client, session_factory):
+    form = await _form(client)
+    for i in range(3):
+        await client.post(f"/f/{form['uuid']}", json={"email": f"u{i}@example.com", "n": str(i)})
+    exported = (await client.get(f"/api/forms/{form['id']}/export/csv")).content
+    before = await _rows(session_factory, form)
+
+    other = (await client.post("/api/forms/", json={"name": "Copy"})).json()
+    if "id" not in other:  # free plan allows one form
+        await client.delete(f"/api/forms/{form['id']}")
+        await drain()
+        other = (await client.post("/api/forms/", json={"name": "Copy"})).json()
+    response = await client.post(
+        f"/api/forms/{other['id']}/imports", content=exported, headers={"Content-Type": "text/csv"}
+    )
+    assert response.json()["imported"] == 3
+    # _id is dropped, _submitted_at becomes created_at
+    after = await _rows(session_factory, other)
+    assert sorted(after, key=lambda r: r[0]["n"]) == sorted(before, key=lambda r: r[0]["n"])
+
+
+@pytest.mark.asyncio
+async def test_ndjson_import_reports_bad_records(client, session_factory):
+    form = await _form(client, max_fields=3)
+    body = b"\n".join(
+        [
+            b'{"email": "a@example.com", "created_at": 1672531200}',
+            b"{oops",
+            b"[1, 2]",
+            b'{"a": 1, "b": 2, "c": 3, "d": 4}',
+            b'{"email": "b@example.com", "created_at": "soon"}',
+            b'{"email": "c@example.com", "tags": ["x"]}',
+        ]
+    )
+    response = await client.post(
+        f"/api/forms/{form['id']}/imports",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    job = response.json()
+    assert (job["imported"], job["rejected"]) == (2, 4)
+    assert [e["record"] for e in job["errors"]] == [2, 3, 4, 5]
+    assert job["errors"][2]["error"] == "Too many fields (limit 3)"
+    rows = await _rows(session_factory, form)
+    assert rows[0] == ({"email": "a@example.com"}, datetime(2023, 1, 1))
+    assert rows[1][0] == {"email": "c@example.com", "tags": ["x"]}
+
+
+@pytest.mark.asyncio
+async def test_import_needs_a_format(client):
+    form = await _form(client)
+    url = f"/api/forms/{form['id']}/imports"
+    response = await client.post(url, content=b"a,b\n1,2\n")
+    assert response.status_code == 400
+    response = await client.post(url + "?format=csv&mapping=[1]", content=b"a,b\n1,2\n")
+    assert response.status_code == 400
+    response = await client.post(url + "?format=csv", content=b"")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "CSV file has no header row"
+    jobs = (await client.get(url)).json()["imports"]
+    assert jobs[0]["status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_failed_import_resumes_without_duplicates(
+    client, session_factory, tmp_path, monkeypatch
+):
+    form = await _form(client)
+    path = tmp_path / "archive.ndjson"
+    path.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(10)))
+
+    calls = 0
+    original = importer.insert_rows
+
+    async def flaky(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise OSError("disk I/O error")
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(importer, "insert_rows", flaky)
+    progress = []
+    with pytest.raises(OSError):
+        await import_file(
+            form["id"],
+            path,
+            batch_size=3,
+            on_progress=lambda job: progress.append(job.records_done),
+            session_factory=session_factory,
+        )
+    assert progress == [3, 6]
+    async with session_factory() as db:
+        job = (await db.execute(select(ImportJob))).scalar_one()
+    assert (job.status, job.records_done, job.error) == ("failed", 6, "disk I/O error")
+    assert len(await _rows(session_factory, form)) == 6
+
+    # Resume over HTTP with the same file
+    response = await client.post(
+        f"/api/forms/{form['id']}/imports/{job.id}/resume", content=path.read_bytes()
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert response.json()["imported"] == 10
+    assert [data["n"] for data, _ in await _rows(session_factory, form)] == list(range(10))
+
+    response = await client.post(f"/api/forms/{form['id']}/imports/{job.id}/resume", content=b"")
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resume_stops(client, session_factory, tmp_path):
+    form = await _form(client)
+    path = tmp_path / "archive.csv"
+    path.write_text("email\n" + "".join(f"u{i}@example.com\n" for i in range(5)))
+    report = await import_file(form["id"], path, session_factory=session_factory)
+    assert report["imported"] == 5
+
+    async with session_factory() as db:
+        await db.execute(
+            update(ImportJob)
+            .values(status="failed", bytes_done=6)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    async def run_other_first(job):
+        # Another run commits progress before this one's first batch
+        async with session_factory() as db:
+            await db.execute(
+                update(ImportJob).values(bytes_done=20).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+    with pytest.raises(ImportConflict):
+        async with session_factory() as db:
+            job = (await db.execute(select(ImportJob))).scalar_one()
+            form_row = await db.get(importer.Form, form["id"])
+            await importer.restart_job(db, job)
+            await run_other_first(job)
+            await importer.run_import(db, form_row, job, importer._file_chunks(path))
+    assert len(await _rows(session_factory, form)) == 5
+
+
+@pytest.mark.asyncio
+async def test_memory_stays_flat(client, session_factory, tmp_path):
+    form = await _form(client)
+    path = tmp_path / "big.ndjson"
+    row = json.dumps({"email": "someone@example.com", "message": "x" * 1000}) + "\n"
+    path.write_text(row * 5000)  # about 5 MB
+
+    tracemalloc.start()
+    try:
+        report = await import_file(
+            form["id"], path, batch_size=200, session_factory=session_factory
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert report["imported"] == 5000
+    assert peak < path.stat().st_size / 2
+
+
+@pytest.mark.asyncio
+async def test_inactive_form_is_refused(client, session_factory, tmp_path):
+    form = await _form(client)
+    path = tmp_path / "late.ndjson"
+    path.write_text(json.dumps({"n": 1}) + "\n")
+    async with session_factory() as db:
+        job = ImportJob(form_id=form["id"], source="late.ndjson", format="ndjson", status="failed")
+        db.add(job)
+        await db.commit()
+    await client.put(f"/api/forms/{form['id']}", json={"is_active": False})
+
+    headers = {"Content-Type": "application/x-ndjson"}
+    url = f"/api/forms/{form['id']}/imports"
+    response = await client.post(url, content=path.read_bytes(), headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (403, "Form is inactive")
+    response = await client.post(f"{url}/{job.id}/resume", content=path.read_bytes())
+    assert (response.status_code, response.json()["detail"]) == (403, "Form is inactive")
+    with pytest.raises(InvalidImport, match="inactive"):
+        await import_file(form["id"], path, session_factory=session_factory)
+    assert await _rows(session_factory, form) == []
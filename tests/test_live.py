@@ -0,0 +1,173 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.live import Subscription, broker, live_dropped_total
+from app.main import app
+from app.models import Form
+from app.routers import live as live_router
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _form(client, **kwargs) -> dict:
+    await _register(client, **kwargs)
+    return (await client.post("/api/forms/", json={"name": "Live"})).json()
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    """(event name, parsed data) for each event frame in an SSE body."""
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+async def _open(client, url: str) -> asyncio.Task:
+    """Start reading a stream; returns once it is subscribed."""
+    subscribed = broker.count()
+    task = asyncio.create_task(client.get(url))
+    while broker.count() == subscribed:
+        assert not task.done(), (await task).text
+        await asyncio.sleep(0.01)
+    return task
+
+
+@pytest.fixture(autouse=True)
+def short_streams(monkeypatch):
+    monkeypatch.setattr(settings, "live_stream_seconds", 0.3)
+
+
+@pytest.mark.asyncio
+async def test_form_stream_receives_new_submissions(client):
+    form = await _form(client)
+    stream = await _open(client, f"/api/forms/{form['id']}/events")
+
+    await client.post(f"/f/{form['uuid']}", json={"email": "a@example.com", "_note": "x"})
+    await client.post(f"/f/{form['uuid']}", json={"email": "bot@example.com", "_gotcha": "x"})
+    await client.post(f"/f/{form['uuid']}", data={"email": "b@example.com"})
+
+    response = await stream
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text.startswith("retry: ")
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["submission", "submission"]
+    assert [data["submission"]["data"] for _, data in events] == [
+        {"email": "a@example.com"},
+        {"email": "b@example.com"},
+    ]
+    assert all(data["form_id"] == form["id"] for _, data in events)
+
+    stored = (await client.get(f"/api/forms/{form['id']}/submissions")).json()["submissions"]
+    assert sorted(s["id"] for s in stored) == [data["submission"]["id"] for _, data in events]
+    assert f"id: {stored[0]['id']}\n" in response.text
+    # The stream ended and unsubscribed
+    assert broker.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_user_stream_covers_only_own_forms(client):
+    form = await _form(client)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as other:
+        other_form = await _form(other, email="other@example.com")
+        stream = await _open(client, "/api/events")
+        await other.post(f"/f/{other_form['uuid']}", json={"n": 1})
+        await client.post(f"/f/{form['uuid']}", json={"n": 2})
+        await client.post(f"/api/forms/{form['id']}/submissions/bulk", json=[{"n": 3}, {"n": 4}])
+
+        events = _events((await stream).text)
+        assert [data["submission"]["data"]["n"] for _, data in events] == [2, 3, 4]
+
+        # Someone else's form can't be watched
+        response = await other.get(f"/api/forms/{form['id']}/events")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_slow_stream_is_dropped(client, monkeypatch):
+    monkeypatch.setattr(settings, "live_buffer_size", 3)
+    form = await _form(client)
+    before = live_dropped_total.value()
+    stream = await _open(client, f"/api/forms/{form['id']}/events")
+
+    # Published without yielding, so the stream can't keep up
+    row = Form(id=form["id"], owner_id=1)
+    for i in range(4):
+        broker.publish(row, i, {"n": i})
+
+    response = await stream
+    assert _events(response.text) == [("dropped", {})]
+    assert live_dropped_total.value() == before + 1
+    assert broker.count() == 0
+
+
+def test_subscription_buffer_is_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "live_buffer_size", 2)
+    subscription = Subscription((("form", 1),))
+    subscription.push(b"a")
+    subscription.push(b"b")
+    assert not subscription.dropped
+    subscription.push(b"c")
+    assert subscription.dropped
+    subscription.push(b"d")
+    assert asyncio.run(subscription.next()) is None
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_sends_keepalives(client, monkeypatch):
+    monkeypatch.setattr(settings, "live_keepalive_seconds", 0.05)
+    await _form(client)
+    response = await client.get("/api/events")
+    assert ": keepalive\n\n" in response.text
+    assert _events(response.text) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_limits(client, monkeypatch):
+    form = await _form(client)
+    monkeypatch.setattr(settings, "live_max_subscribers", 0)
+    response = await client.get(f"/api/forms/{form['id']}/events")
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
+
+    client.cookies.clear()
+    assert (await client.get("/api/events")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_stream_limit_counts_streams_not_yet_started(monkeypatch, session_factory):
+    monkeypatch.setattr(settings, "live_max_subscribers", 1)
+    async with session_factory() as db:
+        first = await live_router._stream(db, ("user", 1))
+        # The first stream holds its slot before its body is ever iterated
+        with pytest.raises(HTTPException) as exc:
+            await live_router._stream(db, ("user", 2))
+    assert exc.value.status_code == 503
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client went away")
+
+    # Sending fails before the body starts; the slot is released anyway
+    with pytest.raises(OSError):
+        await first({"type": "http"}, receive, send)
+    assert broker.count() == 0
@@ -0,0 +1,106 @@
+import copy
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.metrics import Counter, Histogram, db_query_duration, submissions_total
+from tests.conftest import engine
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+def test_histogram_exposition():
+    h = Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1))
+    h.observe(0.05, "/a")
+    h.observe(0.5, "/a")
+    h.observe(5, "/a")
+    lines = h.collect()
+    assert 't_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_escapes_labels():
+    c = Counter("t_total", "Test.", ("form",))
+    c.inc('a"b')
+    assert 't_total{form="a\\"b"} 1' in c.collect()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    await client.get("/health")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    series = (
+        'formforge_http_request_duration_seconds_count{method="GET",route="/health",status="200"}'
+    )
+    assert series in body
+    assert "formforge_rate_limit_entries" in body
+    assert "formforge_background_tasks" in body
+    assert "formforge_db_query_duration_seconds" in body
+
+
+@pytest.mark.asyncio
+async def test_submission_outcomes_counted(client):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Counted"})).json()
+    uuid = form["uuid"]
+    headers = {"accept": "application/json"}
+    outcomes = ("accepted", "spam", "rate_limited")
+    before = {outcome: submissions_total.value(outcome) for outcome in outcomes}
+
+    await client.post(f"/f/{uuid}", json={"name": "Real"}, headers=headers)
+    await client.post(f"/f/{uuid}", json={"name": "Bot", "_gotcha": "x"}, headers=headers)
+
+    original = settings.submissions_per_minute
+    settings.submissions_per_minute = 2
+    try:
+        resp = await client.post(f"/f/{uuid}", json={"name": "Blocked"}, headers=headers)
+        assert resp.status_code == 429
+    finally:
+        settings.submissions_per_minute = original
+
+    for outcome in outcomes:
+        assert submissions_total.value(outcome) == before[outcome] + 1
+    body = (await client.get("/metrics")).text
+    # Totals only: a label per form would grow the series without bound
+    assert 'formforge_submissions_total{outcome="accepted"}' in body
+    assert uuid not in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_failed_statements_leave_nothing_on_the_connection():
+    async with engine.connect() as conn:
+        info = copy.deepcopy(conn.info)
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                await conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert conn.info == info
+
+        before = db_query_duration.count("SELECT")
+        await conn.exec_driver_sql("SELECT 1")
+        assert db_query_duration.count("SELECT") == before + 1
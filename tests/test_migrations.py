@@ -0,0 +1,146 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+)
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import migrations
+from app.config import settings
+from app.database import Base
+
+
+@pytest.fixture
+async def fresh_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def _revision(engine):
+    async with engine.connect() as conn:
+        return await conn.run_sync(migrations._read_revision)
+
+
+def test_schema_revision_is_alembic_head():
+    script = ScriptDirectory.from_config(migrations.alembic_config())
+    assert script.get_current_head() == migrations.SCHEMA_REVISION
+
+
+@pytest.mark.asyncio
+async def test_migrations_build_the_model_schema(fresh_engine):
+    await migrations.ensure_schema(fresh_engine)
+    assert await _revision(fresh_engine) == migrations.SCHEMA_REVISION
+
+    def diff(connection):
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+    async with fresh_engine.connect() as conn:
+        assert await conn.run_sync(diff) == []
+
+
+@pytest.mark.asyncio
+async def test_up_to_date_database_is_left_alone(fresh_engine, monkeypatch):
+    await migrations.ensure_schema(fresh_engine)
+
+    def fail(*args):
+        raise AssertionError("should not migrate")
+
+    monkeypatch.setattr(migrations, "_upgrade", fail)
+    await migrations.ensure_schema(fresh_engine)
+
+
+def _baseline_metadata() -> MetaData:
+    """The models as they were when startup still ran create_all()."""
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("email", String(320), unique=True, nullable=False, index=True),
+        Column("hashed_password", String(128), nullable=False),
+        Column("name", String(100), nullable=False),
+        Column("plan", String(20), nullable=False),
+        Column("is_active", Boolean, nullable=False),
+        Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    )
+    Table(
+        "forms",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("uuid", String(36), unique=True, nullable=False, index=True),
+        Column("name", String(200), nullable=False),
+        Column("owner_id", Integer, ForeignKey("users.id"), nullable=False),
+        Column("allowed_origins", String(500), nullable=False),
+        Column("redirect_url", String(500), nullable=True),
+        Column("email_notifications", Boolean, nullable=False),
+        Column("notification_email", String(320), nullable=True),
+        Column("is_active", Boolean, nullable=False),
+        Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    )
+    Table(
+        "submissions",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("form_id", Integer, ForeignKey("forms.id"), nullable=False),
+        Column("data", Text, nullable=False),
+        Column("ip_address", String(45), nullable=True),
+        Column("is_spam", Boolean, nullable=False),
+        Column("created_at", DateTime, server_default=func.now(), nullable=False),
+    )
+    return metadata
+
+
+@pytest.mark.asyncio
+async def test_pre_alembic_database_is_stamped(fresh_engine):
+    async with fresh_engine.begin() as conn:
+        await conn.run_sync(_baseline_metadata().create_all)
+        await conn.exec_driver_sql(
+            "INSERT INTO users (email, hashed_password, name, plan, is_active) "
+            "VALUES ('old@example.com', 'x', 'Old', 'free', 1)"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO forms (uuid, name, owner_id, allowed_origins, email_notifications, "
+            "is_active) VALUES ('old-form', 'Old', 1, '*', 0, 1)"
+        )
+        await conn.exec_driver_sql(
+            "INSERT INTO submissions (form_id, data, is_spam) "
+            'VALUES (1, \'{"name": "Real"}\', 0), (1, \'{"name": "Old bot"}\', 1)'
+        )
+    assert await _revision(fresh_engine) == "unversioned"
+
+    await migrations.ensure_schema(fresh_engine)
+    assert await _revision(fresh_engine) == migrations.SCHEMA_REVISION
+
+    def diff(connection):
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+    async with fresh_engine.connect() as conn:
+        assert await conn.run_sync(diff) == []
+        # Rows from before the migrations survive the table rebuilds
+        name = await conn.exec_driver_sql("SELECT name FROM forms WHERE uuid = 'old-form'")
+        assert name.scalar() == "Old"
+        # Spam kept in submissions before the quarantine existed is moved into it
+        inbox = await conn.exec_driver_sql("SELECT data FROM submissions")
+        assert [row[0] for row in inbox] == ['{"name": "Real"}']
+        spam = await conn.exec_driver_sql("SELECT form_id, data FROM spam_submissions")
+        assert spam.all() == [(1, '{"name": "Old bot"}')]
+
+
+@pytest.mark.asyncio
+async def test_stale_schema_refuses_to_boot_without_auto_migrate(fresh_engine, monkeypatch):
+    monkeypatch.setattr(settings, "auto_migrate", False)
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        await migrations.ensure_schema(fresh_engine)
+    assert await _revision(fresh_engine) is None
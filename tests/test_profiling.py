@@ -0,0 +1,66 @@
+import pstats
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.profiling import ProfilingMiddleware, make_token, verify_token
+
+
+@pytest.fixture
+async def profiled_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    transport = ASGITransport(app=ProfilingMiddleware(app))
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+def test_token_round_trip(monkeypatch):
+    token = make_token()
+    assert verify_token(token)
+    assert not verify_token(token + "x")
+    assert not verify_token("profile")
+    monkeypatch.setattr(settings, "secret_key", "another-key")
+    assert not verify_token(token)
+
+
+@pytest.mark.asyncio
+async def test_unsigned_request_not_profiled(profiled_client, tmp_path):
+    response = await profiled_client.get("/health")
+    assert response.status_code == 200
+    assert "x-formforge-profile-file" not in response.headers
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_signed_request_writes_pstats(profiled_client, tmp_path):
+    response = await profiled_client.get("/health", headers={"X-FormForge-Profile": make_token()})
+    assert response.status_code == 200
+    name = response.headers["x-formforge-profile-file"]
+    stats = pstats.Stats(str(tmp_path / name))
+    assert any(func[2] == "health_check" for func in stats.stats)
+
+
+@pytest.mark.asyncio
+async def test_sampled_ingest_request(profiled_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_sample_rate", 1.0)
+    response = await profiled_client.post("/f/missing", json={"a": 1})
+    assert response.status_code == 404
+    assert (tmp_path / response.headers["x-formforge-profile-file"]).exists()
+
+
+@pytest.mark.asyncio
+async def test_profile_directory_rotates(profiled_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "profiling_max_files", 2)
+    for _ in range(4):
+        await profiled_client.get("/health")
+    assert len(list(tmp_path.glob("*.pstats"))) == 2
+
+
+@pytest.mark.asyncio
+async def test_html_page_profiled(profiled_client, tmp_path):
+    response = await profiled_client.get("/login", headers={"X-FormForge-Profile": make_token()})
+    assert response.status_code == 200
+    assert (tmp_path / response.headers["x-formforge-profile-file"]).exists()
@@ -85,3 +85,23 @@ async def test_rate_limit_per_form(client):
     finally:
         settings.submissions_per_minute = original_limit
         clear_rate_limits()
+
+
+def test_idle_clients_are_swept(monkeypatch):
+    """Clients with no request inside the window are dropped from the store."""
+    from app.routers import submissions
+
+    clear_rate_limits()
+    clock = [1000.0]
+    monkeypatch.setattr(submissions.time, "time", lambda: clock[0])
+    monkeypatch.setattr(submissions, "_last_sweep", 0.0)
+
+    for i in range(50):
+        assert submissions._check_rate_limit("form-a", f"10.0.0.{i}")
+    assert submissions._rate_limit_entries() == 50
+
+    clock[0] += 61
+    assert submissions._check_rate_limit("form-b", "10.0.1.1")
+    assert submissions._rate_limit_entries() == 1
+    assert "form-a" not in submissions._rate_limit_store
+    clear_rate_limits()
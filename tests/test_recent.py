@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.config import settings
+from app.recent import RecentSubmissions, SubmissionStats, cached_row, recent, recent_cache_total
+from tests.conftest import engine
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _form(client) -> dict:
+    await _register(client)
+    return (await client.post("/api/forms/", json={"name": "Busy"})).json()
+
+
+@pytest.fixture
+def submission_queries():
+    """SQL statements that read the submissions table."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM submissions" in statement:
+            seen.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_first_page_is_served_from_memory(client, submission_queries):
+    form = await _form(client)
+    for i in range(3):
+        await client.post(f"/f/{form['uuid']}", json={"n": i})
+    url = f"/api/forms/{form['id']}/submissions"
+
+    first = (await client.get(url)).json()
+    assert submission_queries
+    submission_queries.clear()
+    hits = recent_cache_total.value("hit")
+
+    assert (await client.get(url)).json() == first
+    page = await client.get(f"/dashboard/forms/{form['id']}")
+    assert page.status_code == 200
+    assert submission_queries == []
+    assert recent_cache_total.value("hit") == hits + 2
+
+    # New submissions are added on ingest, so the next read is still a hit
+    await client.post(f"/f/{form['uuid']}", json={"n": 3})
+    body = (await client.get(url + "?per_page=2")).json()
+    assert submission_queries == []
+    assert body["total"] == 4
+    assert [s["data"]["n"] for s in body["submissions"]] == [3, 2]
+
+    # ...and match what the database says
+    recent.clear()
+    assert (await client.get(url + "?per_page=2")).json() == body
+
+
+@pytest.mark.asyncio
+async def test_search_and_later_pages_use_the_database(client, submission_queries):
+    form = await _form(client)
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    url = f"/api/forms/{form['id']}/submissions"
+    await client.get(url)
+
+    submission_queries.clear()
+    await client.get(url + "?page=2")
+    assert submission_queries
+    submission_queries.clear()
+    await client.get(url + "?search=1")
+    assert submission_queries
+
+
+@pytest.mark.asyncio
+async def test_bulk_and_restores_invalidate(client):
+    form = await _form(client)
+    url = f"/api/forms/{form['id']}/submissions"
+    await client.post(f"/f/{form['uuid']}", json={"n": 0})
+    await client.get(url)
+
+    await client.post(f"/api/forms/{form['id']}/submissions/bulk", json=[{"n": 1}, {"n": 2}])
+    assert (await client.get(url)).json()["total"] == 3
+
+    await client.post(f"/f/{form['uuid']}", json={"n": 3, "_gotcha": "bot"})
+    spam = (await client.get(f"/api/forms/{form['id']}/spam")).json()["submissions"]
+    await client.post(f"/api/forms/{form['id']}/spam/{spam[0]['id']}/restore")
+    assert (await client.get(url)).json()["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_entries_expire(client, submission_queries, monkeypatch):
+    monkeypatch.setattr(settings, "recent_cache_ttl_seconds", 0.05)
+    form = await _form(client)
+    url = f"/api/forms/{form['id']}/submissions"
+    await client.get(url)
+    await asyncio.sleep(0.1)
+    submission_queries.clear()
+    await client.get(url)
+    assert submission_queries
+
+
+def _rows(n: int, size: int = 100) -> list[dict]:
+    return [cached_row(i, {"x": "y" * size}, None, None) for i in range(n)]
+
+
+def _stats(n: int) -> SubmissionStats:
+    return SubmissionStats(n, 0, n - 1, None)
+
+
+def test_least_recently_used_forms_are_evicted(monkeypatch):
+    cache = RecentSubmissions()
+    monkeypatch.setattr(settings, "recent_cache_bytes", 3 * 5 * 600)
+    for form_id in (1, 2, 3):
+        cache.fill(form_id, cache.version(form_id), _rows(5), _stats(5))
+    assert cache.page(1, 20) is not None  # 1 is now the most recent
+    cache.fill(4, cache.version(4), _rows(5), _stats(5))
+    assert cache.page(2, 20) is None
+    assert all(cache.page(form_id, 20) is not None for form_id in (1, 3, 4))
+    assert cache.size() <= settings.recent_cache_bytes
+
+
+def test_entries_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "recent_cache_rows", 3)
+    cache = RecentSubmissions()
+    cache.fill(1, cache.version(1), _rows(10), _stats(10))
+    # Four rows are wanted but only three are kept: a miss
+    assert cache.page(1, 4) is None
+    rows, stats = cache.page(1, 3)
+    assert (len(rows), stats.total) == (3, 10)
+
+    cache.add(1, cached_row(10, {}, None, None))
+    rows, stats = cache.page(1, 3)
+    assert ([r["id"] for r in rows], stats.total, stats.last_id) == ([10, 0, 1], 11, 10)
+
+    # A short form is served whole whatever per_page asks for
+    cache.fill(2, cache.version(2), _rows(2), _stats(2))
+    assert cache.page(2, 20) == (_rows(2), _stats(2))
+
+
+def test_fill_that_raced_a_change_is_not_kept():
+    cache = RecentSubmissions()
+    version = cache.version(1)
+    cache.add(1, cached_row(5, {}, None, None))  # committed while the read's queries ran
+    cache.fill(1, version, _rows(3), _stats(3))
+    assert cache.page(1, 20) is None
@@ -0,0 +1,57 @@
+import logging
+import re
+
+import pytest
+
+from app.config import settings
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+def _parse(header: str) -> tuple[float, int]:
+    match = re.fullmatch(r"db;dur=([\d.]+), queries;desc=(\d+)", header)
+    assert match, header
+    return float(match.group(1)), int(match.group(2))
+
+
+@pytest.mark.asyncio
+async def test_server_timing_without_queries(client):
+    response = await client.get("/health")
+    assert _parse(response.headers["server-timing"]) == (0.0, 0)
+
+
+@pytest.mark.asyncio
+async def test_server_timing_counts_queries(client):
+    await _register(client)
+    await client.post("/api/forms/", json={"name": "A"})
+    response = await client.get("/api/forms/")
+    assert response.status_code == 200
+    _, queries = _parse(response.headers["server-timing"])
+    # user lookup, form list, archive counts, one count per form
+    assert queries >= 4
+
+
+@pytest.mark.asyncio
+async def test_query_heavy_request_logged(client, caplog, monkeypatch):
+    await _register(client)
+    monkeypatch.setattr(settings, "query_count_warn_threshold", 1)
+    with caplog.at_level(logging.WARNING, logger="app.request_stats"):
+        await client.get("/api/forms/")
+    assert any("GET /api/forms/ ran" in r.message for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_server_timing_can_be_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "server_timing", False)
+    response = await client.get("/health")
+    assert "server-timing" not in response.headers
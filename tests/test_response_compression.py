@@ -0,0 +1,160 @@
+import gzip
+import zlib
+
+import pytest
+
+from app.config import settings
+from app.response_compression import CompressionMiddleware, compressible, negotiate
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _busy_form(client) -> dict:
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Big"})).json()
+    rows = [{"message": f"hello number {i} " * 10} for i in range(30)]
+    await client.post(f"/api/forms/{form['id']}/submissions/bulk", json=rows)
+    return form
+
+
+@pytest.mark.asyncio
+async def test_json_html_and_csv_are_gzipped(client):
+    form = await _busy_form(client)
+    for url in (
+        f"/api/forms/{form['id']}/submissions",
+        f"/dashboard/forms/{form['id']}",
+        f"/api/forms/{form['id']}/export/csv",
+    ):
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200, url
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert "hello number 29" in response.text
+
+    plain = await client.get(
+        f"/api/forms/{form['id']}/submissions", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.json()["total"] == 30
+
+
+@pytest.mark.asyncio
+async def test_small_responses_are_not_compressed(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) < settings.response_compression_min_bytes
+
+
+def _app(*chunks: bytes, content_type: bytes = b"text/csv", headers=()):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type), *headers],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": i < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+async def _call(app, accept_encoding: bytes = b"gzip") -> list[dict]:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", accept_encoding)]}
+    await CompressionMiddleware(app)(scope, None, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_streams_are_compressed_chunk_by_chunk():
+    chunks = [b"a,b\n", b"1,2\n" * 500, b"3,4\n"]
+    sent = await _call(_app(*chunks))
+    start, *bodies = sent
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert len(bodies) == len(chunks)
+
+    # Every chunk can be decoded as soon as it arrives
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk, body in zip(chunks, bodies):
+        assert decoder.decompress(body["body"]) == chunk
+    assert bodies[-1]["more_body"] is False
+    assert decoder.eof
+
+
+@pytest.mark.asyncio
+async def test_what_is_left_alone():
+    big = b"x" * 5000
+    # Already compressed types, and live streams
+    for content_type in (b"image/png", b"application/zip", b"text/event-stream"):
+        sent = await _call(_app(big, content_type=content_type))
+        assert b"content-encoding" not in dict(sent[0]["headers"])
+        assert sent[1]["body"] == big
+    # Already encoded
+    sent = await _call(_app(big, headers=[(b"content-encoding", b"br")]))
+    assert sent[1]["body"] == big
+    # Not accepted
+    sent = await _call(_app(big), accept_encoding=b"gzip;q=0, identity")
+    assert sent[1]["body"] == big
+
+
+@pytest.mark.asyncio
+async def test_strong_etags_are_weakened_and_level_is_configurable(monkeypatch):
+    data = b"".join(b"%d," % i for i in range(2000))
+    app = _app(data, headers=[(b"etag", b'"abc"')])
+    monkeypatch.setattr(settings, "response_compression_gzip_level", 1)
+    fast = await _call(app)
+    assert dict(fast[0]["headers"])[b"etag"] == b'W/"abc"'
+    monkeypatch.setattr(settings, "response_compression_gzip_level", 9)
+    small = await _call(app)
+    # The gzip header's XFL byte records fastest (4) or maximum (2) compression
+    assert (fast[1]["body"][8], small[1]["body"][8]) == (4, 2)
+    assert gzip.decompress(small[1]["body"]) == gzip.decompress(fast[1]["body"]) == data
+
+
+@pytest.mark.asyncio
+async def test_brotli_when_installed():
+    brotli = pytest.importorskip("brotli")
+    data = b"hello brotli " * 500
+    sent = await _call(_app(data), accept_encoding=b"gzip, br")
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"br"
+    assert brotli.decompress(sent[1]["body"]) == data
+
+
+def test_negotiation():
+    assert negotiate("gzip, deflate, br", brotli_available=True) == "br"
+    assert negotiate("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert negotiate("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert negotiate("*", brotli_available=False) == "gzip"
+    assert negotiate("*, gzip;q=0", brotli_available=False) is None
+    assert negotiate("identity", brotli_available=True) is None
+    assert negotiate("gzip;q=bogus", brotli_available=False) is None
+
+    assert compressible("application/json")
+    assert compressible("text/html; charset=utf-8")
+    assert compressible("image/svg+xml")
+    assert not compressible("image/webp")
+    assert not compressible("")
@@ -0,0 +1,153 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.models import Form, SpamSubmission, Submission, utcnow
+from app.retention import effective_policy, run_retention
+from tests.conftest import drain
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _submit(client, form, count, **extra):
+    for i in range(count):
+        await client.post(
+            f"/f/{form['uuid']}",
+            json={"name": f"User {i}", **extra},
+            headers={"accept": "application/json"},
+        )
+
+
+async def _count(session_factory, form_id):
+    async with session_factory() as db:
+        result = await db.execute(
+            select(func.count(Submission.id)).where(Submission.form_id == form_id)
+        )
+        return result.scalar()
+
+
+@pytest.fixture(autouse=True)
+def small_chunks():
+    original = settings.retention_chunk_size, settings.retention_chunk_pause_ms
+    settings.retention_chunk_size, settings.retention_chunk_pause_ms = 2, 0
+    yield
+    settings.retention_chunk_size, settings.retention_chunk_pause_ms = original
+
+
+def test_plans_keep_everything_unless_configured():
+    form = Form(retention_days=None, retention_max_rows=None, spam_retention_days=None)
+    assert effective_policy(form, "free") == {
+        "retention_days": None,
+        "retention_max_rows": None,
+        "spam_retention_days": None,
+    }
+
+
+def test_form_policy_only_tightens_plan_default(monkeypatch):
+    monkeypatch.setattr(
+        settings,
+        "retention_plan_limits",
+        {"free": {"retention_days": 90, "spam_retention_days": 7}},
+    )
+    form = Form(retention_days=30, retention_max_rows=None, spam_retention_days=60)
+    policy = effective_policy(form, "free")
+    assert policy["retention_days"] == 30
+    assert policy["retention_max_rows"] is None
+    assert policy["spam_retention_days"] == 7
+    assert effective_policy(form, "pro")["spam_retention_days"] == 60
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_purged_by_default(client, session_factory):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Keep"})).json()
+    await _submit(client, form, 2)
+    await _submit(client, form, 1, _gotcha="bot")
+
+    async with session_factory() as db:
+        years_ago = utcnow() - timedelta(days=3650)
+        await db.execute(update(Submission).values(created_at=years_ago))
+        await db.execute(update(SpamSubmission).values(created_at=years_ago))
+        await db.commit()
+
+    assert await run_retention(session_factory) == {"expired": 0, "overflow": 0, "spam": 0}
+    assert await _count(session_factory, form["id"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_retention_days_purges_old_submissions(client, session_factory):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Old", "retention_days": 10})).json()
+    assert form["retention_days"] == 10
+    await _submit(client, form, 5)
+
+    async with session_factory() as db:
+        old = utcnow() - timedelta(days=30)
+        await db.execute(
+            update(Submission)
+            .where(Submission.form_id == form["id"], Submission.id <= 3)
+            .values(created_at=old)
+        )
+        await db.commit()
+
+    totals = await run_retention(session_factory)
+    assert totals["expired"] == 3
+    assert await _count(session_factory, form["id"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_retention_max_rows_keeps_newest(client, session_factory):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Capped"})).json()
+    await client.put(f"/api/forms/{form['id']}", json={"retention_max_rows": 3})
+    await _submit(client, form, 7)
+
+    totals = await run_retention(session_factory)
+    assert totals["overflow"] == 4
+
+    resp = await client.get(f"/api/forms/{form['id']}/submissions")
+    names = [s["data"]["name"] for s in resp.json()["submissions"]]
+    assert sorted(names) == ["User 4", "User 5", "User 6"]
+
+
+@pytest.mark.asyncio
+async def test_retention_purges_expired_spam(client, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "retention_plan_limits", {"free": {"spam_retention_days": 7}})
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Spammy"})).json()
+    await _submit(client, form, 3, _gotcha="bot")
+    await _submit(client, form, 2)
+
+    async with session_factory() as db:
+        await db.execute(update(SpamSubmission).values(created_at=utcnow() - timedelta(days=8)))
+        await db.commit()
+
+    totals = await run_retention(session_factory)
+    assert totals["spam"] == 3
+    assert totals["expired"] == 0
+    assert await _count(session_factory, form["id"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_form_removes_submissions_in_chunks(client, session_factory):
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Big"})).json()
+    await _submit(client, form, 5)
+
+    resp = await client.delete(f"/api/forms/{form['id']}")
+    assert resp.status_code == 202
+    await drain()
+    assert await _count(session_factory, form["id"]) == 0
+    assert (await client.get(f"/api/forms/{form['id']}")).status_code == 404
@@ -0,0 +1,131 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.database import get_db
+from app.main import create_app
+from app.models import Form, User
+from tests.conftest import TestSessionLocal, override_get_db
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+@pytest.fixture
+async def ingest_client():
+    app = create_app("ingest")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+async def _make_form() -> Form:
+    async with TestSessionLocal() as session:
+        user = User(email="owner@example.com", hashed_password="x", name="Owner")
+        session.add(user)
+        await session.flush()
+        form = Form(name="Contact", owner_id=user.id)
+        session.add(form)
+        await session.commit()
+        return form
+
+
+@pytest.mark.asyncio
+async def test_ingest_role_accepts_submissions(ingest_client):
+    form = await _make_form()
+    response = await ingest_client.post(
+        f"/f/{form.uuid}",
+        json={"email": "visitor@example.com"},
+        headers={"Accept": "application/json"},
+    )
+    assert response.status_code == 200
+    health = await ingest_client.get("/health")
+    assert health.json()["role"] == "ingest"
+    # Public replicas keep metrics to themselves unless a token protects them
+    assert (await ingest_client.get("/metrics")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ingest_role_serves_metrics_with_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    app = create_app("ingest")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        assert (await ac.get("/metrics")).status_code == 401
+        response = await ac.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ingest_role_serves_nothing_else(ingest_client):
+    for path in ["/", "/dashboard", "/api/forms/", "/api/auth/me", "/docs"]:
+        assert (await ingest_client.get(path)).status_code == 404, path
+    response = await ingest_client.post(
+        "/api/auth/register",
+        json={"name": "X", "email": "x@example.com", "password": "securepass123"},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_dashboard_role_has_no_ingest_endpoint():
+    app = create_app("dashboard")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        form = await _make_form()
+        assert (await client.post(f"/f/{form.uuid}", json={"a": 1})).status_code == 404
+        assert (await client.get("/login")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_dashboard_role_has_no_live_streams():
+    # Submissions are published in the ingest process, so a dashboard stream stays empty
+    app = create_app("dashboard")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        form = await _make_form()
+        assert (await client.get(f"/api/forms/{form.id}/events")).status_code == 404
+        assert (await client.get("/api/events")).status_code == 404
+
+
+def test_unknown_role_rejected():
+    with pytest.raises(ValueError, match="Unknown role"):
+        create_app("worker")
+
+
+def test_ingest_role_skips_dashboard_modules(tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(SRC), FORMFORGE_ROLE="ingest")
+    code = (
+        "import json, sys; import app.main; "
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith(('app.', 'jinja2', "
+        "'jose', 'passlib', 'apscheduler', 'itsdangerous')))))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=tmp_path,
+        check=True,
+    )
+    loaded = set(json.loads(proc.stdout))
+    assert "app.routers.submissions" in loaded
+    unexpected = {
+        "app.auth",
+        "app.routers.pages",
+        "app.routers.export",
+        "app.routers.forms",
+        "app.routers.admin",
+        "app.scheduler",
+        "app.archive",
+        "app.retention",
+        "jinja2",
+        "jose",
+        "passlib",
+        "apscheduler",
+    }
+    assert not loaded & unexpected
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.models import SchedulerLease, utcnow
+from app.scheduler import Lease, _leased, create_scheduler
+
+
+@pytest.mark.asyncio
+async def test_one_process_holds_the_lease(session_factory):
+    first = Lease("jobs", session_factory, holder="a")
+    second = Lease("jobs", session_factory, holder="b")
+    assert await first.renew()
+    assert not await second.renew()
+    assert first.held and not second.held
+
+    # Renewing keeps it; another name is a separate lease
+    assert await first.renew()
+    assert not await second.renew()
+    assert await Lease("other", session_factory, holder="b").renew()
+
+    # Once released, the next process takes over at once
+    await first.release()
+    assert not first.held
+    assert await second.renew()
+    assert not await first.renew()
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_moves_on(session_factory):
+    first = Lease("jobs", session_factory, holder="a")
+    second = Lease("jobs", session_factory, holder="b")
+    assert await first.renew()
+
+    # The holder stopped renewing
+    async with session_factory() as db:
+        await db.execute(update(SchedulerLease).values(expires_at=utcnow()))
+        await db.commit()
+    assert await second.renew()
+    assert not await first.renew()
+    assert not first.held
+
+
+@pytest.mark.asyncio
+async def test_jobs_only_run_while_the_lease_is_held(session_factory, monkeypatch):
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    lease = Lease("jobs", session_factory, holder="a")
+    run = _leased(lease, job)
+    await run()
+    assert runs == []
+
+    assert await lease.renew()
+    await run()
+    assert runs == [1]
+
+    # Held only as long as the lease lasts without a renewal
+    monkeypatch.setattr(time, "monotonic", lambda: lease._valid_until + 1)
+    await run()
+    assert runs == [1]
+
+
+def test_lease_is_renewed_only_when_there_are_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "retention_enabled", False)
+    monkeypatch.setattr(settings, "archive_after_days", 0)
+    assert create_scheduler(Lease("jobs")).get_jobs() == []
+
+    monkeypatch.setattr(settings, "retention_enabled", True)
+    jobs = {job.id for job in create_scheduler(Lease("jobs")).get_jobs()}
+    assert jobs == {"retention", "lease"}
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from app import slow_queries
+from app.config import settings
+from tests.conftest import drain
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+@pytest.fixture
+async def log_everything(tmp_path, monkeypatch):
+    log_file = tmp_path / "slow.log"
+    monkeypatch.setattr(settings, "slow_query_ms", 1e-9)
+    monkeypatch.setattr(settings, "slow_query_log_file", str(log_file))
+    slow_queries.recent.clear()
+    yield log_file
+    await drain()
+    slow_queries.recent.clear()
+
+
+def test_redact_parameters():
+    assert slow_queries.redact_parameters(("a@b.c", 1, None)) == ["str", "int", "NoneType"]
+    assert slow_queries.redact_parameters({"email": "a@b.c"}) == {"email": "str"}
+    assert slow_queries.redact_parameters(None) is None
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_with_plan(client, log_everything):
+    await _register(client)
+    response = await client.get("/api/forms/")
+    assert response.status_code == 200
+    await drain()
+
+    entries = [json.loads(line) for line in log_everything.read_text().splitlines()]
+    selects = [e for e in entries if e["route"] == "GET /api/forms/" and e["plan"]]
+    assert selects
+    assert all(isinstance(e["duration_ms"], float) for e in selects)
+    assert any("forms" in " ".join(e["plan"]) for e in selects)
+    # Parameter values are never written
+    assert "test@example.com" not in log_everything.read_text()
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoint_requires_admin(client, log_everything):
+    await _register(client)
+    response = await client.get("/api/admin/slow-queries")
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoint_lists_recent(client, log_everything, monkeypatch):
+    monkeypatch.setattr(settings, "admin_emails", "ops@example.com, Test@Example.com")
+    await _register(client)
+    await client.get("/api/forms/")
+    await drain()
+
+    response = await client.get("/api/admin/slow-queries?limit=5")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["entries"]) == 5
+    assert body["entries"][0]["statement"]
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_disabled(client, log_everything, monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+    await client.get("/health")
+    await _register(client)
+    assert not slow_queries.recent
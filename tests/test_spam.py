@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models import Submission
+from app.quarantine import trim_quarantine
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+async def _create_form(client, name="Contact Form"):
+    resp = await client.post("/api/forms/", json={"name": name})
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _submit_spam(client, form, count=1):
+    for i in range(count):
+        resp = await client.post(
+            f"/f/{form['uuid']}",
+            json={"name": f"Bot {i}", "_gotcha": "filled"},
+            headers={"accept": "application/json"},
+        )
+        assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_spam_goes_to_quarantine(client, session_factory):
+    await _register(client)
+    form = await _create_form(client)
+    await _submit_spam(client, form, 2)
+
+    async with session_factory() as db:
+        hot = await db.execute(select(func.count(Submission.id)))
+        assert hot.scalar() == 0
+
+    resp = await client.get(f"/api/forms/{form['id']}/spam")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 2
+    assert data["submissions"][0]["data"]["name"] == "Bot 1"
+
+
+@pytest.mark.asyncio
+async def test_restore_spam_to_inbox(client):
+    await _register(client)
+    form = await _create_form(client)
+    await _submit_spam(client, form)
+
+    spam = (await client.get(f"/api/forms/{form['id']}/spam")).json()["submissions"][0]
+    resp = await client.post(f"/api/forms/{form['id']}/spam/{spam['id']}/restore")
+    assert resp.status_code == 200
+    assert resp.json()["data"]["name"] == "Bot 0"
+
+    subs = (await client.get(f"/api/forms/{form['id']}/submissions")).json()
+    assert subs["total"] == 1
+    assert (await client.get(f"/api/forms/{form['id']}/spam")).json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_restore_other_users_spam(client):
+    await _register(client)
+    form = await _create_form(client)
+    await _submit_spam(client, form)
+    spam = (await client.get(f"/api/forms/{form['id']}/spam")).json()["submissions"][0]
+
+    client.cookies.clear()
+    await _register(client, email="other@example.com")
+    resp = await client.post(f"/api/forms/{form['id']}/spam/{spam['id']}/restore")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_empty_spam(client):
+    await _register(client)
+    form = await _create_form(client)
+    await _submit_spam(client, form, 3)
+
+    resp = await client.delete(f"/api/forms/{form['id']}/spam")
+    assert resp.status_code == 204
+    assert (await client.get(f"/api/forms/{form['id']}/spam")).json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_spam_sampling(client):
+    await _register(client)
+    form = await _create_form(client)
+    original = settings.spam_sample_rate
+    settings.spam_sample_rate = 0.0
+    try:
+        await _submit_spam(client, form, 3)
+    finally:
+        settings.spam_sample_rate = original
+
+    assert (await client.get(f"/api/forms/{form['id']}/spam")).json()["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_quarantine_cap(client, session_factory):
+    await _register(client)
+    form = await _create_form(client)
+    await _submit_spam(client, form, 5)
+
+    original = settings.spam_quarantine_max_rows
+    settings.spam_quarantine_max_rows = 2
+    try:
+        async with session_factory() as db:
+            assert await trim_quarantine(db, form["id"]) == 3
+    finally:
+        settings.spam_quarantine_max_rows = original
+
+    names = [
+        s["data"]["name"]
+        for s in (await client.get(f"/api/forms/{form['id']}/spam")).json()["submissions"]
+    ]
+    assert names == ["Bot 4", "Bot 3"]
@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Generous enough for a loaded CI runner; a cold start was about 0.8s on one vCPU.
+# Run ``python -m benchmarks.startup`` for the breakdown when this fails.
+STARTUP_BUDGET_S = 3.0
+
+# Loaded on first use instead of at import time
+LAZY_MODULES = ["jose", "passlib", "bcrypt", "jinja2", "apscheduler", "aiosmtplib", "alembic"]
+
+_BOOT = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+from app.database import engine
+from app.migrations import ensure_schema
+imported = time.perf_counter() - start
+asyncio.run(ensure_schema(engine))
+print(json.dumps({
+    "import_s": imported,
+    "boot_s": time.perf_counter() - start,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def _boot(tmp_path) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(SRC)
+    env["FORMFORGE_DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp_path / 'startup.db'}"
+    proc = subprocess.run(
+        [sys.executable, "-c", _BOOT % LAZY_MODULES],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=tmp_path,
+        check=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def test_first_boot_migrates_the_database(tmp_path):
+    result = _boot(tmp_path)
+    assert "alembic" in result["loaded"]
+
+
+def test_warm_boot_is_lazy_and_within_budget(tmp_path):
+    _boot(tmp_path)
+    # Best of three, so one noisy run does not fail the suite
+    runs = [_boot(tmp_path) for _ in range(3)]
+    assert all(run["loaded"] == [] for run in runs), runs
+    assert min(run["boot_s"] for run in runs) < STARTUP_BUDGET_S, runs
@@ -0,0 +1,347 @@
+import asyncio
+import ipaddress
+import json
+import socket
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+
+from app import webhooks
+from app.config import settings
+from app.database import get_db
+from app.main import create_app
+from app.models import Form, Webhook
+from app.webhooks import (
+    dispatcher,
+    sign,
+    webhook_circuit_opened_total,
+    webhook_deliveries_total,
+    webhook_events_dropped_total,
+)
+from tests.conftest import override_get_db
+
+
+async def _register(client, name="Test User", email="test@example.com", password="securepass123"):
+    response = await client.post(
+        "/api/auth/register",
+        json={"name": name, "email": email, "password": password},
+    )
+    if response.status_code == 201 and "set-cookie" in response.headers:
+        for h in response.headers.get_list("set-cookie"):
+            if h.startswith("access_token="):
+                client.cookies.set("access_token", h.split(";")[0].split("=", 1)[1])
+    return response
+
+
+class Receiver:
+    """Stands in for the customer's endpoint."""
+
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+        self.statuses: list[int] = []  # answered in order, then 200
+        self.gate: asyncio.Event | None = None  # when set, requests wait for it
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.gate is not None:
+            await self.gate.wait()
+        self.requests.append(request)
+        return httpx.Response(self.statuses.pop(0) if self.statuses else 200)
+
+    def bodies(self) -> list[dict]:
+        return [json.loads(request.content) for request in self.requests]
+
+
+# Stands in for DNS, which tests cannot reach
+DNS = {
+    "hooks.example.com": ["93.184.216.34"],
+    "x.io": ["93.184.216.35", "2606:2800:220:1::1"],
+    "localhost": ["127.0.0.1", "::1"],
+    "intranet.example.com": ["93.184.216.36", "10.0.0.7"],
+}
+
+
+@pytest.fixture(autouse=True)
+def dns(monkeypatch):
+    table = dict(DNS)
+
+    async def addresses(host, port):
+        try:
+            return [str(ipaddress.ip_address(host))]
+        except ValueError:
+            pass
+        if host not in table:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return table[host]
+
+    monkeypatch.setattr(webhooks, "_addresses", addresses)
+    return table
+
+
+@pytest.fixture
+async def receiver(session_factory, monkeypatch):
+    receiver = Receiver()
+    monkeypatch.setattr(dispatcher, "session_factory", session_factory)
+    monkeypatch.setattr(dispatcher, "transport", httpx.MockTransport(receiver))
+    monkeypatch.setattr(settings, "webhook_backoff_base", 0.001)
+    yield receiver
+    await dispatcher.close()
+
+
+@pytest.fixture(params=[True, False], ids=["fast", "fastapi"])
+async def ingest(request, monkeypatch):
+    monkeypatch.setattr(settings, "fast_ingest", request.param)
+    app = create_app("ingest")
+    app.dependency_overrides[get_db] = override_get_db
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _until(condition, timeout: float = 3.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _form_with_webhook(client, **webhook) -> tuple[dict, dict]:
+    await _register(client)
+    form = (await client.post("/api/forms/", json={"name": "Hooked"})).json()
+    response = await client.post(
+        f"/api/forms/{form['id']}/webhooks",
+        json={"url": "https://hooks.example.com/in", "batch_wait_ms": 0, **webhook},
+    )
+    assert response.status_code == 201
+    return form, response.json()
+
+
+@pytest.mark.asyncio
+async def test_webhook_crud(client):
+    form, hook = await _form_with_webhook(client, batch_size=10)
+    assert len(hook["secret"]) == 64
+    assert (hook["batch_size"], hook["is_active"]) == (10, True)
+    base = f"/api/forms/{form['id']}/webhooks"
+    assert (await client.get(f"/api/forms/{form['id']}")).json()["has_webhooks"] is True
+    assert (await client.get(base)).json()["webhooks"] == [hook]
+
+    response = await client.put(f"{base}/{hook['id']}", json={"is_active": False})
+    assert response.json()["is_active"] is False
+    assert (await client.get(f"/api/forms/{form['id']}")).json()["has_webhooks"] is False
+
+    assert (await client.post(base, json={"url": "ftp://example.com"})).status_code == 422
+    response = await client.post(base, json={"url": "https://x.io", "batch_size": 0})
+    assert response.status_code == 422
+    assert (await client.delete(f"{base}/{hook['id']}")).status_code == 204
+    assert (await client.delete(f"{base}/{hook['id']}")).status_code == 404
+    assert (await client.get(base)).json()["webhooks"] == []
+
+    for _ in range(5):
+        await client.post(base, json={"url": "https://hooks.example.com/in"})
+    assert (await client.post(base, json={"url": "https://x.io"})).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_internal_addresses_are_refused(client, monkeypatch):
+    form, hook = await _form_with_webhook(client)
+    base = f"/api/forms/{form['id']}/webhooks"
+    for url in (
+        "http://127.0.0.1:8000/api/admin",
+        "http://localhost/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://10.1.2.3/",
+        "http://[::1]/",
+        "http://[::ffff:192.168.0.1]/",
+        "http://0.0.0.0/",
+        "https://intranet.example.com/",
+        "https://nowhere.example.com/",
+        "http://[::1/",
+    ):
+        response = await client.post(base, json={"url": url})
+        assert response.status_code == 422, url
+        response = await client.put(f"{base}/{hook['id']}", json={"url": url})
+        assert response.status_code == 422, url
+    assert (await client.get(base)).json()["webhooks"] == [hook]
+
+    monkeypatch.setattr(settings, "webhook_allow_private", True)
+    assert (await client.post(base, json={"url": "http://localhost:9000/"})).status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_addresses_are_checked_again_before_sending(client, receiver, dns):
+    form, _ = await _form_with_webhook(client)
+    failed = webhook_deliveries_total.value("failed")
+    # The host now points inside the network
+    dns["hooks.example.com"] = ["169.254.169.254"]
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    await _until(lambda: webhook_deliveries_total.value("failed") == failed + 1)
+    assert receiver.requests == []
+
+
+@pytest.mark.asyncio
+async def test_malformed_url_fails_without_stopping_the_endpoint(
+    client, receiver, session_factory, monkeypatch
+):
+    monkeypatch.setattr(settings, "webhook_allow_private", True)
+    form, hook = await _form_with_webhook(client)
+    async with session_factory() as db:
+        await db.execute(
+            update(Webhook).where(Webhook.id == hook["id"]).values(url="http://ex\x00ample.com/")
+        )
+        await db.commit()
+    failed = webhook_deliveries_total.value("failed")
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    await client.post(f"/f/{form['uuid']}", json={"n": 2})
+    await _until(lambda: webhook_deliveries_total.value("failed") == failed + 2)
+    assert receiver.requests == []
+
+
+@pytest.mark.asyncio
+async def test_deleted_webhooks_drop_their_endpoints(client, receiver):
+    form, hook = await _form_with_webhook(client)
+    base = f"/api/forms/{form['id']}/webhooks"
+    other = (await client.post(base, json={"url": "https://x.io/in", "batch_wait_ms": 0})).json()
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    await _until(lambda: len(receiver.requests) == 2)
+    assert set(dispatcher.endpoints) == {hook["id"], other["id"]}
+
+    await client.put(f"{base}/{other['id']}", json={"is_active": False})
+    assert set(dispatcher.endpoints) == {hook["id"]}
+    await client.delete(f"{base}/{hook['id']}")
+    assert dispatcher.endpoints == {}
+
+
+@pytest.mark.asyncio
+async def test_submission_is_delivered_signed(client, ingest, receiver):
+    form, hook = await _form_with_webhook(client)
+    response = await ingest.post(
+        f"/f/{form['uuid']}", json={"email": "a@example.com", "_gotcha": ""}
+    )
+    assert response.status_code == 200
+    await _until(lambda: receiver.requests)
+
+    request = receiver.requests[0]
+    assert str(request.url) == hook["url"]
+    body = json.loads(request.content)
+    assert body["event"] == "submission.created"
+    assert body["form"] == {"id": form["id"], "uuid": form["uuid"], "name": "Hooked"}
+    [submission] = body["submissions"]
+    assert submission["data"] == {"email": "a@example.com"}
+    stored = (await client.get(f"/api/forms/{form['id']}/submissions")).json()["submissions"]
+    assert submission["id"] == stored[0]["id"]
+
+    signature = request.headers["X-FormForge-Signature"]
+    timestamp = int(signature.split(",")[0].removeprefix("t="))
+    assert signature == sign(hook["secret"], request.content, timestamp)
+
+
+@pytest.mark.asyncio
+async def test_spam_and_forms_without_webhooks_are_not_sent(client, receiver):
+    form, hook = await _form_with_webhook(client)
+    await client.post(f"/f/{form['uuid']}", json={"email": "bot@example.com", "_gotcha": "x"})
+    await client.put(f"/api/forms/{form['id']}/webhooks/{hook['id']}", json={"is_active": False})
+    await client.post(f"/f/{form['uuid']}", json={"email": "a@example.com"})
+    await asyncio.sleep(0.05)
+    assert receiver.requests == []
+
+
+@pytest.mark.asyncio
+async def test_submissions_are_batched(client, receiver):
+    form, _ = await _form_with_webhook(client, batch_size=3, batch_wait_ms=300)
+    for i in range(4):
+        await client.post(f"/f/{form['uuid']}", json={"n": i})
+    await _until(lambda: len(receiver.requests) == 1)
+    # The fourth waits for company until batch_wait_ms runs out
+    await asyncio.sleep(0.1)
+    assert len(receiver.requests) == 1
+    await _until(lambda: len(receiver.requests) == 2)
+    batches = [[s["data"]["n"] for s in body["submissions"]] for body in receiver.bodies()]
+    assert batches == [[0, 1, 2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_retried(client, receiver):
+    form, _ = await _form_with_webhook(client)
+    delivered = webhook_deliveries_total.value("delivered")
+    failed = webhook_deliveries_total.value("failed")
+
+    receiver.statuses = [500, 503]
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    await _until(lambda: webhook_deliveries_total.value("delivered") == delivered + 1)
+    assert len(receiver.requests) == 3
+
+    # A 4xx other than 408/429 is the receiver refusing the payload: not retried
+    receiver.statuses = [400]
+    await client.post(f"/f/{form['uuid']}", json={"n": 2})
+    await _until(lambda: webhook_deliveries_total.value("failed") == failed + 1)
+    assert len(receiver.requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_pauses_a_failing_endpoint(client, receiver, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_breaker_threshold", 2)
+    monkeypatch.setattr(settings, "webhook_breaker_cooldown", 0.3)
+    form, _ = await _form_with_webhook(client)
+    opened = webhook_circuit_opened_total.value()
+
+    receiver.statuses = [500, 500]
+    await client.post(f"/f/{form['uuid']}", json={"n": 1})
+    await _until(lambda: webhook_circuit_opened_total.value() == opened + 1)
+    await client.post(f"/f/{form['uuid']}", json={"n": 2})
+    await asyncio.sleep(0.1)
+    assert len(receiver.requests) == 2  # nothing sent while open
+
+    # After the cooldown a trial POST succeeds and the backlog drains in order
+    await _until(lambda: len(receiver.requests) == 4)
+    assert [body["submissions"][0]["data"]["n"] for body in receiver.bodies()] == [1, 1, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_slow_endpoint_never_blocks_ingest(client, receiver, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_max_pending", 2)
+    form, _ = await _form_with_webhook(client)
+    dropped = webhook_events_dropped_total.value("backlog")
+    receiver.gate = asyncio.Event()
+
+    for i in range(5):
+        response = await asyncio.wait_for(client.post(f"/f/{form['uuid']}", json={"n": i}), 2)
+        assert response.status_code == 200
+    await _until(lambda: webhook_events_dropped_total.value("backlog") == dropped + 2)
+
+    # One POST was in flight, the two oldest waiting were dropped
+    receiver.gate.set()
+    await _until(lambda: len(receiver.requests) == 3)
+    assert [body["submissions"][0]["data"]["n"] for body in receiver.bodies()] == [0, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_events(receiver, monkeypatch):
+    monkeypatch.setattr(settings, "webhook_queue_size", 3)
+    dropped = webhook_events_dropped_total.value("queue_full")
+    form = Form(id=1, uuid="x", name="Busy")
+    for i in range(5):
+        dispatcher.enqueue(form, i, {})
+    assert webhook_events_dropped_total.value("queue_full") == dropped + 2
+    assert dispatcher.queued() == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_respects_notify(client, receiver):
+    form, _ = await _form_with_webhook(client, batch_size=10, batch_wait_ms=50)
+    url = f"/api/forms/{form['id']}/submissions/bulk"
+    await client.post(url + "?notify=false", json=[{"a": 1}])
+    await client.post(url, json=[{"a": 2}, {"a": 3}])
+    await _until(lambda: receiver.requests)
+    await asyncio.sleep(0.1)
+    assert [[s["data"] for s in body["submissions"]] for body in receiver.bodies()] == [
+        [{"a": 2}, {"a": 3}]
+    ]
+
+
+def test_backoff_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "webhook_backoff_base", 1.0)
+    monkeypatch.setattr(settings, "webhook_backoff_max", 5.0)
+    assert 0.5 <= webhooks._backoff(1) <= 1.0
+    assert 2.0 <= webhooks._backoff(3) <= 4.0
+    assert webhooks._backoff(10) <= 5.0